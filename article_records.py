@@ -0,0 +1,150 @@
+# ARTICLE RECORDS - Kompakte Ergebnisse pro Artikel für beide Analyzer
+# ArticleRecord: ein Artikel als __slots__-Objekt (ohne Texte, Keyword- oder Linklisten)
+# ArticleStore: spaltenweise Ablage in typisierten Arrays, Kategorien als Codes
+# Export als .npz ohne Kopie der Spalten (numpy-Views auf die Array-Puffer)
+
+import os
+import sys
+import json
+from array import array
+
+NAN = float('nan')
+
+class ArticleRecord:
+    """Ergebnis eines Artikels; fehlende Float-Werte sind NaN, fehlende Zählwerte 0"""
+
+    __slots__ = ('url', 'sitemap', 'status', 'word_count', 'complexity', 'hix', 'flesch',
+                 'content_type', 'intent', 'link_count', 'score')
+
+    def __init__(self, url, sitemap='', status='ok', word_count=0, complexity=0, hix=NAN, flesch=NAN,
+                 content_type='', intent='', link_count=0, score=NAN):
+        self.url = url
+        self.sitemap = sys.intern(sitemap)
+        self.status = sys.intern(status)
+        self.word_count = word_count
+        self.complexity = complexity
+        self.hix = hix
+        self.flesch = flesch
+        self.content_type = sys.intern(content_type)
+        self.intent = sys.intern(intent)
+        self.link_count = link_count
+        self.score = score
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"ArticleRecord({self.url!r}, {self.status!r}, words={self.word_count}, hix={self.hix:.1f})"
+
+class Categories:
+    """Interning-Tabelle: Text ↔ kleiner Integer-Code"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(sys.intern(value))
+        return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+# Spalten: Name → Typecode (array-Modul); Kategorien werden als 'H'-Codes abgelegt
+NUMERIC_COLUMNS = {
+    'word_count': 'I',
+    'complexity': 'B',
+    'hix': 'f',
+    'flesch': 'f',
+    'link_count': 'I',
+    'score': 'f'
+}
+CATEGORY_COLUMNS = ('sitemap', 'status', 'content_type', 'intent')
+
+class ArticleStore:
+    """Spaltenweise Ablage vieler ArticleRecords (struct of arrays)"""
+
+    def __init__(self):
+        self.url_data = bytearray()
+        self.url_offsets = array('Q', [0])
+        self.numeric = {name: array(typecode) for name, typecode in NUMERIC_COLUMNS.items()}
+        self.category_codes = {name: array('H') for name in CATEGORY_COLUMNS}
+        self.categories = {name: Categories() for name in CATEGORY_COLUMNS}
+
+    def append(self, record):
+        self.url_data += record.url.encode('utf-8')
+        self.url_offsets.append(len(self.url_data))
+        for name, column in self.numeric.items():
+            column.append(getattr(record, name))
+        for name, column in self.category_codes.items():
+            column.append(self.categories[name].code(getattr(record, name)))
+
+    def __len__(self):
+        return len(self.url_offsets) - 1
+
+    def url(self, index):
+        return self.url_data[self.url_offsets[index]:self.url_offsets[index + 1]].decode('utf-8')
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        fields = {name: column[index] for name, column in self.numeric.items()}
+        for name, column in self.category_codes.items():
+            fields[name] = self.categories[name][column[index]]
+        return ArticleRecord(self.url(index), **fields)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def nbytes(self):
+        columns = [self.url_offsets, *self.numeric.values(), *self.category_codes.values()]
+        return len(self.url_data) + sum(column.itemsize * len(column) for column in columns)
+
+    def columns(self):
+        """{Spalte: memoryview} ohne Kopie; Kategorien als Codes, URLs als UTF-8-Puffer + Offsets"""
+        views = {'url_data': memoryview(self.url_data), 'url_offsets': memoryview(self.url_offsets)}
+        views.update({name: memoryview(column) for name, column in self.numeric.items()})
+        views.update({name: memoryview(column) for name, column in self.category_codes.items()})
+        return views
+
+    def save(self, path):
+        """Speichert alle Spalten als .npz; numpy-Arrays sind Views auf die Puffer (keine Kopie)"""
+        import numpy as np
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        arrays = {name: np.frombuffer(view, dtype=view.format) for name, view in self.columns().items() if len(view)}
+        categories = {name: table.values for name, table in self.categories.items()}
+        arrays['categories'] = np.frombuffer(json.dumps(categories, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+        np.savez(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+        store = cls()
+        with np.load(path) as data:
+            categories = json.loads(data['categories'].tobytes().decode('utf-8'))
+            for name, values in categories.items():
+                store.categories[name] = Categories(values)
+            if 'url_data' in data:
+                store.url_data = bytearray(data['url_data'].tobytes())
+            store.url_offsets = array('Q', data['url_offsets'].tobytes())
+            for name, typecode in NUMERIC_COLUMNS.items():
+                if name in data:
+                    store.numeric[name] = array(typecode, data[name].tobytes())
+            for name in CATEGORY_COLUMNS:
+                if name in data:
+                    store.category_codes[name] = array('H', data[name].tobytes())
+        return store
@@ -2,29 +2,60 @@
 # Mit wissenschaftlich korrektem HIX, Content-Typen, Keywords, Verlinkungen
 # Für Migrations-Aufwandsschätzung: civic-innovation.de + ki-observatorium.de → denkfabrik-bmas.de
 
+import os
 import re
-import requests
+import glob
 from bs4 import BeautifulSoup
-import time
-from collections import Counter
+from collections import Counter, defaultdict
 from urllib.parse import urlparse
 
 print("🚀 Installiere benötigte Bibliotheken...")
 import sys
 import subprocess
-subprocess.run([sys.executable, "-m", "pip", "install", "spacy", "pyphen", "--quiet"], check=True)
-subprocess.run([sys.executable, "-m", "spacy", "download", "de_core_news_sm", "--quiet"], check=True)
+subprocess.run([sys.executable, "-m", "pip", "install", "pyphen", "numpy", "scipy", "--quiet"], check=True)
 
-import spacy
 from pyphen import Pyphen
 import numpy as np
+from content_extraction import ContentExtractor, DEFAULT_CACHE_PATH
+from site_scheduler import CrawlScheduler, ProgressTracker
+from site_stats import SiteAggregator
+from structured_data import extract_structured_data, SchemaInventory, save_inventory
+from link_checker import LinkRegistry, LinkChecker, print_link_report, save_link_report
+from run_store import RunStore, print_run_diff
+from article_records import ArticleRecord, ArticleStore
+from render_detection import RenderDetector, DeferredQueue, DEFAULT_QUEUE_PATH
+from shard_queue import ShardQueue, run_worker, default_worker_id
+from sitemap_watch import SitemapWatcher, DEFAULT_EVENTS_PATH
+from content_index import IndexBuilder, ContentIndex, DEFAULT_INDEX_PATH
+from fetch_policy import FetchPolicy, print_fetch_report
+from overlap_engine import OverlapCorpus, compute_overlap, print_overlap_report, save_overlap_report
+from readability_backends import FastBackend, SpacyBackend, make_syllable_counter, text_parameters, calibration_stats
 
 print("✅ Setup abgeschlossen\n")
 
-# Lade Sprachmodell
-nlp = spacy.load('de_core_news_sm')
+# Sprachmodell wird nur im HIX-Modus 'genau' geladen (siehe load_nlp)
+nlp = None
 pyphen_de = Pyphen(lang='de_DE')
 
+# Hauptinhalt-Extraktion mit gelerntem Selektor pro Host
+EXTRACTOR = ContentExtractor(cache_path=DEFAULT_CACHE_PATH)
+
+# Alle Links aller analysierten Seiten (dedupliziert) für die Link-Prüfung
+LINKS = LinkRegistry()
+
+# Kompakte Ergebnisse pro Artikel (spaltenweise, Export nach ergebnisse/artikel.npz)
+ARTICLES = ArticleStore()
+
+# Erkennung clientseitig gerenderter Seiten (nur bei zu wenig Hauptinhalt)
+RENDER = RenderDetector(min_text=100)
+DEFERRED = DeferredQueue(DEFAULT_QUEUE_PATH)
+
+# Invertierter Index über Hauptinhalt, Keywords und Entitäten (python content_index.py ...)
+INDEX = IndexBuilder()
+
+# Abrufe mit adaptivem Timeout, Wiederholungen und Circuit Breaker pro Host
+FETCH = FetchPolicy()
+
 # ============================================================
 # KONFIGURATION
 # ============================================================
@@ -35,6 +66,52 @@ SITEMAP_FILES = {
     'Denkfabrik BMAS': 'sitemaps/denkfabrik-sitemap.xml'
 }
 
+# Mindestabstand zwischen zwei Requests an denselben Host (Sekunden)
+REQUEST_DELAY = 0.5
+
+# Anzahl Hosts, die gleichzeitig abgerufen werden
+MAX_PARALLEL_HOSTS = 8
+
+# Alle gefundenen Links (intern + extern) nach der Analyse auf Erreichbarkeit prüfen
+LINK_CHECK = True
+
+# Seiten mit zu wenig Text auf JavaScript-Rendering prüfen: Text aus eingebettetem
+# JSON-State übernehmen, sonst in ergebnisse/js_warteschlange.jsonl zurückstellen
+JS_ERKENNUNG = True
+
+# Suchindex über alle analysierten Texte speichern (None = aus)
+INHALTSINDEX = DEFAULT_INDEX_PATH
+
+# Personen, Orte und Organisationen (spaCy-NER) mit indexieren – lädt spaCy, deutlich langsamer
+INDEX_ENTITAETEN = False
+
+# Ausführungsmodus (Umgebungsvariable ANALYSE_MODUS):
+#   'lokal'      – alles in diesem Prozess (Standard)
+#   'verteilen'  – Sitemaps einlesen und URLs per Host-Hash in die Warteschlange legen
+#   'worker'     – Shards aus der Warteschlange leasen und analysieren (beliebig viele Prozesse)
+#   'reduzieren' – Teilergebnisse aller Worker zum Bericht zusammenführen
+#   'beobachten' – Sitemaps zyklisch abfragen, nur neue/geänderte Seiten analysieren
+ANALYSE_MODUS = os.environ.get('ANALYSE_MODUS', 'lokal')
+WARTESCHLANGE = os.environ.get('ANALYSE_WARTESCHLANGE', 'ergebnisse/warteschlange.sqlite')
+SHARDS = 16
+
+# Abfrageintervall im Modus 'beobachten' (Sekunden); SITEMAP_FILES darf dort auch URLs enthalten
+BEOBACHTUNG_INTERVALL = 300
+if ANALYSE_MODUS not in ('lokal', 'verteilen', 'worker', 'reduzieren', 'beobachten'):
+    raise ValueError(f"Unbekannter ANALYSE_MODUS: {ANALYSE_MODUS}")
+
+# Ergebnisse jedes Laufs für Vergleiche speichern (None = aus)
+# Vergleich beliebiger Läufe: python run_store.py diff RUN_A RUN_B
+RUN_STORE = 'ergebnisse/runs.sqlite'
+
+# HIX-Textparameter: 'schnell' (regelbasierte Satzerkennung, ohne Sprachmodell)
+# oder 'genau' (spaCy de_core_news_sm, deutlich langsamer)
+HIX_MODUS = 'schnell'
+
+# Zusätzlich beide Modi auf einer Stichprobe vergleichen (lädt spaCy)
+HIX_KALIBRIERUNG = False
+KALIBRIERUNG_STICHPROBE = 200
+
 GERMAN_STOPWORDS = set([
     'der', 'die', 'das', 'und', 'in', 'zu', 'den', 'für', 'von', 'mit', 'ist',
     'im', 'des', 'sich', 'auf', 'eine', 'auch', 'werden', 'an', 'wie', 'oder',
@@ -57,35 +134,37 @@ GERMAN_STOPWORDS = set([
     'projekt', 'beschäftigten', 'arbeit', 'unternehmen'
 ])
 
+# Termvektoren aller Artikel für die Cross-Site-Überschneidungen (TF-IDF, dünnbesetzt)
+OVERLAP = OverlapCorpus(stopwords=GERMAN_STOPWORDS)
+
 # ============================================================
 # HIX-FUNKTIONEN (Wissenschaftlich korrekt)
 # ============================================================
 
-def count_syllables_accurate(word):
-    return len(pyphen_de.inserted(word).split('-'))
+count_syllables_accurate = make_syllable_counter(pyphen_de)
 
-def extract_text_parameters(text):
-    doc = nlp(text)
-    sentences = list(doc.sents)
-    num_sentences = len(sentences)
-    if num_sentences == 0:
-        return None
-    words = [token.text for token in doc if token.is_alpha]
-    num_words = len(words)
-    if num_words == 0:
-        return None
-    asl = num_words / num_sentences
-    syllable_counts = [count_syllables_accurate(word) for word in words]
-    total_syllables = sum(syllable_counts)
-    asw = total_syllables / num_words
-    long_words = [w for w in words if len(w) > 6]
-    iw = (len(long_words) / num_words) * 100
-    polysyllabic = [w for w in words if count_syllables_accurate(w) >= 3]
-    ms = (len(polysyllabic) / num_words) * 100
-    monosyllabic = [w for w in words if count_syllables_accurate(w) == 1]
-    es = (len(monosyllabic) / num_words) * 100
-    polysyllables_per_30 = (len(polysyllabic) / num_sentences) * 30 if num_sentences > 0 else 0
-    return {'asl': asl, 'asw': asw, 'iw': iw, 'ms': ms, 'es': es, 'polysyllables_per_30': polysyllables_per_30}
+def load_nlp():
+    global nlp
+    if nlp is None:
+        print("📦 Lade spaCy-Sprachmodell (HIX-Modus 'genau')...")
+        subprocess.run([sys.executable, "-m", "pip", "install", "spacy", "--quiet"], check=True)
+        subprocess.run([sys.executable, "-m", "spacy", "download", "de_core_news_sm", "--quiet"], check=True)
+        import spacy
+        nlp = spacy.load('de_core_news_sm')
+    return nlp
+
+READABILITY_BACKENDS = {}
+HIX_CALIBRATION = []
+
+def readability_backend(mode=None):
+    mode = mode or HIX_MODUS
+    if mode not in READABILITY_BACKENDS:
+        READABILITY_BACKENDS[mode] = SpacyBackend(load_nlp()) if mode == 'genau' else FastBackend()
+    return READABILITY_BACKENDS[mode]
+
+def extract_text_parameters(text, mode=None):
+    num_sentences, words = readability_backend(mode).tokenize(text)
+    return text_parameters(num_sentences, words, count_syllables_accurate)
 
 def calculate_amstad(params):
     return 180 - params['asl'] - (58.5 * params['asw'])
@@ -115,8 +194,8 @@ def scale_to_0_10(value, min_easy, max_hard, inverse=False):
         else:
             return ((value - max_hard) / (min_easy - max_hard)) * 10.0
 
-def calculate_hix_scientific(text):
-    params = extract_text_parameters(text)
+def calculate_hix_scientific(text, mode=None):
+    params = extract_text_parameters(text, mode)
     if params is None:
         return 0
     amstad = calculate_amstad(params)
@@ -142,6 +221,27 @@ def interpret_hix(hix_value):
     else:
         return "Wissenschaftlich, expertenlastig"
 
+def calibrate_hix(text, hix):
+    """Merkt sich (schnell, genau)-Paare für den Kalibrierungsreport"""
+    if not HIX_KALIBRIERUNG or len(HIX_CALIBRATION) >= KALIBRIERUNG_STICHPROBE:
+        return
+    other = calculate_hix_scientific(text, 'genau' if HIX_MODUS == 'schnell' else 'schnell')
+    HIX_CALIBRATION.append((hix, other) if HIX_MODUS == 'schnell' else (other, hix))
+
+def print_hix_calibration():
+    stats = calibration_stats(HIX_CALIBRATION)
+    if stats is None:
+        return
+    same_band = sum(1 for fast, accurate in HIX_CALIBRATION if interpret_hix(fast) == interpret_hix(accurate))
+    print(f"\n" + "="*70)
+    print(f"📐 HIX-KALIBRIERUNG (schnell vs. genau, {stats['n']} Artikel)")
+    print("="*70)
+    print(f"   Ø HIX schnell: {stats['mean_fast']:.2f} / genau: {stats['mean_accurate']:.2f}")
+    print(f"   Ø Abweichung: {stats['mean_diff']:+.2f} (Ø absolut {stats['mean_abs_diff']:.2f}, P90 {stats['p90_abs_diff']:.2f}, max {stats['max_abs_diff']:.2f})")
+    if stats['correlation'] is not None:
+        print(f"   Korrelation: {stats['correlation']:.3f}")
+    print(f"   Gleiche Verständlichkeitsstufe: {same_band}/{stats['n']} ({same_band / stats['n'] * 100:.1f}%)")
+
 # ============================================================
 # CONTENT-ANALYSE FUNKTIONEN
 # ============================================================
@@ -178,33 +278,19 @@ def filter_article_urls(urls):
         article_urls.append(url)
     return article_urls
 
-def fetch_article_content(url, timeout=10):
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-        return response.text
-    except:
-        return None
+def fetch_article_content(url):
+    """FetchResult: .text bei Erfolg, sonst .error (timeout, nicht_gefunden, host_pausiert, …)"""
+    return FETCH.fetch(url)
+
+def extract_text_from_html(html_content, url=None):
+    return EXTRACTOR.extract(html_content, url)
+
+def count_page_media(soup):
+    images = len(soup.find_all('img'))
+    downloads = len(soup.find_all('a', href=re.compile(r'\.(pdf|docx?|xlsx?|pptx?)$', re.I)))
+    return images, downloads
 
-def extract_text_from_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'form']):
-        tag.decompose()
-    main_content = None
-    for selector in ['article', 'main', '.content', '.post', '.entry-content', '#content']:
-        main_content = soup.select_one(selector)
-        if main_content:
-            break
-    if not main_content:
-        main_content = soup.body
-    if not main_content:
-        return ""
-    text = main_content.get_text(separator=' ', strip=True)
-    text = re.sub(r'\s+', ' ', text)
-    return text
-
-def detect_content_type(url, html_content, text):
+def detect_content_type(url, media, text):
     url_lower = url.lower()
     if any(keyword in url_lower for keyword in ['projekt', 'project', 'fallstudie', 'case']):
         return 'Projekt/Fallstudie'
@@ -212,9 +298,7 @@ def detect_content_type(url, html_content, text):
         return 'News/Presse'
     elif any(keyword in url_lower for keyword in ['publikation', 'download', 'studie', 'bericht']):
         return 'Publikation'
-    soup = BeautifulSoup(html_content, 'html.parser')
-    images = len(soup.find_all('img'))
-    downloads = len(soup.find_all('a', href=re.compile(r'\.(pdf|docx?|xlsx?|pptx?)$', re.I)))
+    images, downloads = media
     word_count = len(re.findall(r'\b\w+\b', text))
     if downloads > 2:
         return 'Publikation'
@@ -256,11 +340,12 @@ def extract_keywords_combined(text, top_k=15):
             combined.append((word, count, 'term'))
     return combined[:top_k]
 
-def extract_internal_links(html_content, base_domain):
-    soup = BeautifulSoup(html_content, 'html.parser')
+def collect_hrefs(soup):
+    return [link['href'] for link in soup.find_all('a', href=True)]
+
+def extract_internal_links(hrefs, base_domain):
     internal_links = []
-    for link in soup.find_all('a', href=True):
-        href = link['href']
+    for href in hrefs:
         if base_domain in href or href.startswith('/'):
             if href.startswith('/'):
                 href = f"https://{base_domain}{href}"
@@ -313,7 +398,16 @@ def count_words(text):
 # HAUPTANALYSE
 # ============================================================
 
-def analyze_sitemap(filepath, sitemap_name):
+def new_site(sitemap_name, article_urls, base_domain):
+    return {
+        'sitemap_name': sitemap_name,
+        'article_urls': article_urls,
+        'base_domain': base_domain,
+        'stats': SiteAggregator(sitemap_name, len(article_urls)),
+        'schema': SchemaInventory()
+    }
+
+def load_sitemap(filepath, sitemap_name):
     print(f"\n{'='*70}")
     print(f"📊 Analysiere: {sitemap_name}")
     print(f"{'='*70}")
@@ -328,79 +422,280 @@ def analyze_sitemap(filepath, sitemap_name):
         base_domain = urlparse(article_urls[0]).netloc
     else:
         base_domain = ""
-    print(f"\n⏳ Lade Artikel herunter und analysiere...")
-    print(f"   (Geschätzte Dauer: ~{len(article_urls) * 0.5 / 60:.1f} Minuten)\n")
-    word_counts, complexities, hix_scores, content_types, all_keywords, internal_links_data, failed_count = [], [], [], [], [], [], 0
-    for i, url in enumerate(article_urls, 1):
-        if i % 5 == 0 or i == 1:
-            print(f"   📝 {i}/{len(article_urls)} Artikel analysiert... ({i/len(article_urls)*100:.1f}%)")
-        html = fetch_article_content(url)
-        if not html:
-            failed_count += 1
-            continue
-        text = extract_text_from_html(html)
-        if len(text) < 100:
-            failed_count += 1
-            continue
-        word_count = count_words(text)
-        complexity = calculate_complexity(text)
-        hix = calculate_hix_scientific(text)
-        content_type = detect_content_type(url, html, text)
-        keywords = extract_keywords_combined(text, top_k=15)
-        internal_links = extract_internal_links(html, base_domain)
-        word_counts.append(word_count)
-        complexities.append(complexity)
-        hix_scores.append(hix)
-        content_types.append(content_type)
-        all_keywords.extend([kw for kw, count, kw_type in keywords])
-        internal_links_data.append({'url': url, 'link_count': len(internal_links), 'links': internal_links})
-        time.sleep(0.5)
-    print(f"   ✓ Fertig: {len(word_counts)}/{len(article_urls)} Artikel erfolgreich analysiert")
-    if failed_count > 0:
-        print(f"   ⚠️  {failed_count} Artikel konnten nicht geladen werden\n")
-    else:
-        print()
-    keyword_freq = Counter(all_keywords)
-    top_themes = keyword_freq.most_common(15)
-    results = {
-        'sitemap_name': sitemap_name,
-        'total_articles': len(article_urls),
-        'successful_analyses': len(word_counts),
-        'failed_urls': failed_count,
-        'avg_word_count': sum(word_counts) / len(word_counts) if word_counts else 0,
-        'avg_complexity': sum(complexities) / len(complexities) if complexities else 0,
-        'avg_hix': sum(hix_scores) / len(hix_scores) if hix_scores else 0,
-        'complexity_distribution': {1: complexities.count(1), 2: complexities.count(2), 3: complexities.count(3)},
-        'hix_scores': hix_scores,
-        'content_types': Counter(content_types),
-        'top_themes': top_themes,
-        'internal_links': internal_links_data,
-        'avg_internal_links': sum(item['link_count'] for item in internal_links_data) / len(internal_links_data) if internal_links_data else 0
+    return new_site(sitemap_name, article_urls, base_domain)
+
+def analyze_article(url, html, base_domain, sitemap_name=''):
+    """(ArticleRecord, Seitendetails) oder None; die Details werden nur aggregiert, nicht gespeichert"""
+    # Einmal parsen: Links, Medien und Structured Data vor dem Entfernen von Nav/Script lesen
+    soup = BeautifulSoup(html, 'html.parser')
+    schema_errors = Counter()
+    schema_entities = extract_structured_data(soup, schema_errors)
+    hrefs = collect_hrefs(soup)
+    internal_links = extract_internal_links(hrefs, base_domain)
+    media = count_page_media(soup)
+    text = EXTRACTOR.extract_from_soup(soup, url)
+    if len(text) < 100:
+        if not JS_ERKENNUNG:
+            return None
+        render = RENDER.check(html, text)
+        if render['recovered']:
+            text = render['text']
+        elif render['client_rendered']:
+            return ArticleRecord(url, sitemap_name, status='zurückgestellt', link_count=len(internal_links)), {'render': render}
+        else:
+            return None
+    keywords = extract_keywords_combined(text, top_k=15)
+    hix = calculate_hix_scientific(text)
+    calibrate_hix(text, hix)
+    record = ArticleRecord(
+        url, sitemap_name,
+        word_count=count_words(text),
+        complexity=calculate_complexity(text),
+        hix=hix,
+        content_type=detect_content_type(url, media, text),
+        link_count=len(internal_links)
+    )
+    details = {
+        'keywords': [kw for kw, count, kw_type in keywords],
+        'hrefs': hrefs,
+        'schema_entities': schema_entities,
+        'schema_errors': schema_errors,
+        'text': text
+    }
+    return record, details
+
+def extract_entities(text):
+    """(Name, Label) aller Personen, Orte und Organisationen (spaCy-NER)"""
+    doc = load_nlp()(text[:100000])
+    return [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in ('PER', 'LOC', 'ORG')]
+
+def record_article(site, record, details):
+    site['stats'].add_article(
+        record.url, record.word_count, record.complexity, record.hix,
+        record.content_type, details['keywords'], record.link_count
+    )
+    site['schema'].add_page(details['schema_entities'])
+    site['schema'].stats.update(details['schema_errors'])
+    ARTICLES.append(record)
+    OVERLAP.add_document(site['sitemap_name'], record.url, details['text'], details['keywords'])
+    if INHALTSINDEX:
+        entities = extract_entities(details['text']) if INDEX_ENTITAETEN else ()
+        INDEX.add_document(record.url, details['text'], details['keywords'], entities)
+
+def record_failure(site, url, reason, store=None, run_id=None):
+    record = ArticleRecord(url, site['sitemap_name'], status='fehlgeschlagen')
+    site['stats'].add_failure(reason)
+    ARTICLES.append(record)
+    if store:
+        store.add_record(run_id, record)
+
+def record_deferred(site, record, render, store=None, run_id=None):
+    site['stats'].add_deferred()
+    DEFERRED.add(record.url, record.sitemap, render)
+    ARTICLES.append(record)
+    if store:
+        store.add_record(run_id, record)
+
+def summarize_site(site):
+    results = site['stats'].summary()
+    results['schema_inventory'] = site['schema']
+    print(f"   ✓ {results['sitemap_name']}: {results['successful_analyses']}/{results['total_articles']} Artikel erfolgreich analysiert")
+    if results['failed_urls'] > 0:
+        reasons = ', '.join(f"{reason}: {count}" for reason, count in results['failure_reasons'].most_common())
+        print(f"   ⚠️  {results['failed_urls']} Artikel fehlgeschlagen ({reasons})")
+    if results['deferred_urls'] > 0:
+        print(f"   ⏸️  {results['deferred_urls']} Artikel clientseitig gerendert (zurückgestellt)")
+    return results
+
+def process_page(site, url, fetched, store=None, run_id=None):
+    """Analysiert eine abgerufene Seite und verbucht sie, liefert den Status"""
+    if fetched is None or not fetched.ok:
+        record_failure(site, url, fetched.error if fetched else 'abgebrochen', store, run_id)
+        return 'fehlgeschlagen'
+    try:
+        analyzed = analyze_article(url, fetched.text, site['base_domain'], site['sitemap_name'])
+    except Exception as e:
+        print(f"   ⚠️  Analyse fehlgeschlagen für {url}: {e}")
+        analyzed = None
+    if analyzed is None:
+        record_failure(site, url, 'analyse', store, run_id)
+        return 'fehlgeschlagen'
+    record, details = analyzed
+    if record.status == 'zurückgestellt':
+        record_deferred(site, record, details['render'], store, run_id)
+        return record.status
+    record_article(site, record, details)
+    if store:
+        store.add_record(run_id, record)
+    if LINK_CHECK:
+        LINKS.add_page(url, details['hrefs'])
+    return record.status
+
+def crawl_sites(sites, store=None, run_id=None):
+    """Lädt und analysiert alle URLs verschränkt (fair über Hosts), liefert (URL, Status)"""
+    scheduler = CrawlScheduler(fetch_article_content, host_delay=REQUEST_DELAY, max_workers=MAX_PARALLEL_HOSTS)
+    for site in sites:
+        for url in site['article_urls']:
+            scheduler.add(site['sitemap_name'], url)
+    by_name = {site['sitemap_name']: site for site in sites}
+    progress = ProgressTracker(scheduler.total())
+    print(f"\n⏳ Lade {progress.total} Artikel aus {len(sites)} Sitemap(s) parallel herunter und analysiere...\n")
+    # Erste Seiten je Host zurückhalten, bis die Template-Fingerprints aktiv sind,
+    # damit alle Seiten eines Hosts mit denselben Blöcken bereinigt werden
+    held = defaultdict(list)
+    for sitemap_name, url, fetched in scheduler.run():
+        host = urlparse(url).netloc
+        pages = [(sitemap_name, url, fetched)]
+        if fetched is not None and fetched.ok and EXTRACTOR.needs_warm_up(url):
+            EXTRACTOR.warm_up(fetched.text, url)
+            held[host].append((sitemap_name, url, fetched))
+            if EXTRACTOR.needs_warm_up(url):
+                continue
+            pages = held.pop(host)
+        for name, page_url, page in pages:
+            progress.tick()
+            if progress.done % 5 == 0 or progress.done == 1:
+                print(f"   📝 {progress.format()}")
+            yield page_url, process_page(by_name[name], page_url, page, store, run_id)
+    # Hosts mit weniger Seiten, als für die Fingerprints nötig sind
+    for pages in held.values():
+        for name, page_url, page in pages:
+            progress.tick()
+            yield page_url, process_page(by_name[name], page_url, page, store, run_id)
+    print()
+
+def analyze_sites(sites, store=None, run_id=None):
+    """Arbeitet alle Sitemaps verschränkt ab (fair über Hosts, je Host REQUEST_DELAY Abstand)"""
+    for url, status in crawl_sites(sites, store, run_id):
+        pass
+    results = [summarize_site(site) for site in sites]
+    if store:
+        for result in results:
+            store.add_site(run_id, result)
+        store.flush()
+    print()
+    return results
+
+def analyze_sitemap(filepath, sitemap_name):
+    return analyze_sites([load_sitemap(filepath, sitemap_name)])[0]
+
+# ============================================================
+# BEOBACHTUNG (Änderungen während des Migrations-Freeze)
+# ============================================================
+
+def analyze_changed_page(sitemap_name, url, html):
+    """Kennzahlen einer neuen oder geänderten Seite für das Änderungsereignis"""
+    analyzed = analyze_article(url, html, urlparse(url).netloc, sitemap_name)
+    if analyzed is None:
+        return None
+    record, details = analyzed
+    if not record.ok:
+        return {'status': record.status}
+    return {
+        'word_count': record.word_count,
+        'complexity': record.complexity,
+        'hix': round(record.hix, 2),
+        'content_type': record.content_type,
+        'link_count': record.link_count,
+        'keywords': details['keywords'][:10]
     }
+
+def print_change_events(events):
+    for event in events:
+        target = event.get('url') or event.get('sitemap')
+        line = f"   [{event['zeit']}] {event['ereignis']}: {target}"
+        metrics = event.get('kennzahlen')
+        if metrics and 'hix' in metrics:
+            line += f" (HIX {metrics['hix']:.1f}, {metrics['word_count']} Wörter)"
+        elif event.get('fehler'):
+            line += f" ⚠️  {event['fehler']}"
+        print(line)
+
+def watch_sitemaps():
+    watcher = SitemapWatcher(
+        SITEMAP_FILES, analyze_changed_page, url_filter=filter_article_urls,
+        interval=BEOBACHTUNG_INTERVALL, host_delay=REQUEST_DELAY, max_workers=MAX_PARALLEL_HOSTS,
+        fetch_policy=FETCH
+    )
+    print(f"👀 Beobachte {len(SITEMAP_FILES)} Sitemap(s) alle {BEOBACHTUNG_INTERVALL} s, Ereignisse: {DEFAULT_EVENTS_PATH}")
+    watcher.run(on_events=print_change_events)
+
+# ============================================================
+# VERTEILTE ANALYSE (Shards)
+# ============================================================
+
+def distribute_sites(sites, queue):
+    for site in sites:
+        total = queue.enqueue(site['sitemap_name'], site['base_domain'], site['article_urls'])
+        print(f"   📥 {site['sitemap_name']}: {total} URLs in der Warteschlange")
+    sizes = queue.shard_sizes()
+    print(f"   🧩 {len(sizes)} Shards belegt, größter Shard: {max(sizes.values(), default=0)} URLs")
+    print(f"\n   Worker starten: ANALYSE_MODUS=worker (beliebig viele Prozesse/Rechner)")
+    print(f"   Danach: ANALYSE_MODUS=reduzieren")
+
+def analyze_batch(items):
+    """Ein geleaster Batch → ([(URL, Status)], {Sitemap: Teilergebnis als dict}, Seiten, Datensätze)"""
+    global LINKS, OVERLAP
+    # Links und Termvektoren nur für diesen Batch sammeln; sie landen in der Warteschlange
+    LINKS = LinkRegistry()
+    OVERLAP = OverlapCorpus(stopwords=GERMAN_STOPWORDS)
+    urls = {}
+    for url, sitemap_name, base_domain in items:
+        urls.setdefault((sitemap_name, base_domain), []).append(url)
+    batch_sites = [new_site(name, article_urls, base_domain) for (name, base_domain), article_urls in urls.items()]
+    start = len(ARTICLES)
+    outcomes = list(crawl_sites(batch_sites))
+    deltas = {site['sitemap_name']: {'stats': site['stats'].to_dict(), 'schema': site['schema'].to_dict()} for site in batch_sites}
+    links = dict(LINKS.page_links())
+    pages = [(url, name, links.get(url, []), terms) for name, url, terms in OVERLAP.documents()]
+    records = [ARTICLES[i].to_dict() for i in range(start, len(ARTICLES))]
+    return outcomes, deltas, pages, records
+
+def reduce_shards(queue, store=None, run_id=None):
+    """Führt die Teilergebnisse aller Worker zu den Ergebnissen pro Sitemap zusammen"""
+    progress = queue.progress()
+    print(f"   Status der Warteschlange: {', '.join(f'{k}: {v}' for k, v in sorted(progress.items()))}")
+    if progress.get('offen') or progress.get('in_arbeit'):
+        print(f"   ⚠️  Noch nicht alle URLs bearbeitet – Bericht ist vorläufig")
+    # Suchindizes der Worker zu einem Index zusammenführen (URLs nur einmal)
+    if INHALTSINDEX:
+        seen = set()
+        for path in sorted(glob.glob(INHALTSINDEX.replace('.bin', '_*.bin'))):
+            index = ContentIndex(path)
+            INDEX.add_index(index, seen)
+            index.close()
+    # Linkziele und Termvektoren aller Worker für Link-Prüfung und Überschneidungen
+    for url, name, links, terms in queue.pages():
+        if LINK_CHECK:
+            LINKS.add_page(url, links)
+        OVERLAP.add_counts(name, url, terms)
+    # Datensätze aller Worker für Artikel-Export und Lauf-Vergleich
+    for fields in queue.records():
+        record = ArticleRecord(**fields)
+        ARTICLES.append(record)
+        if store:
+            store.add_record(run_id, record)
+    results = [summarize_site({'stats': stats, 'schema': schema}) for stats, schema in queue.reduce().values()]
+    if store:
+        for result in results:
+            store.add_site(run_id, result)
+        store.flush()
     return results
 
 def analyze_thematic_overlap(all_results):
     print("\n" + "="*70)
     print("🔍 THEMATISCHE ÜBERSCHNEIDUNGEN (Cross-Site)")
     print("="*70)
-    site_themes = {}
-    for result in all_results:
-        site_name = result['sitemap_name']
-        themes = set([theme for theme, count in result['top_themes']])
-        site_themes[site_name] = themes
-    site_names = list(site_themes.keys())
-    if len(site_names) >= 2:
-        print("\n📊 Gemeinsame Themen zwischen Sitemaps:")
-        for i in range(len(site_names)):
-            for j in range(i+1, len(site_names)):
-                site1, site2 = site_names[i], site_names[j]
-                overlap = site_themes[site1] & site_themes[site2]
-                if overlap:
-                    print(f"\n   {site1} ↔ {site2}:")
-                    print(f"   Gemeinsame Keywords: {len(overlap)}")
-                    print(f"   Beispiele: {', '.join(list(overlap)[:5])}")
-                else:
-                    print(f"\n   {site1} ↔ {site2}: Keine signifikanten Überschneidungen")
+    if len(all_results) < 2:
+        return
+    if len(OVERLAP):
+        report = compute_overlap(OVERLAP)
+    else:
+        # Keine Termvektoren vorhanden (z. B. Warteschlange ohne Seitendaten): nur die Top-Themen pro Sitemap
+        corpus = OverlapCorpus.from_site_terms({r['sitemap_name']: r['top_themes'] for r in all_results})
+        report = compute_overlap(corpus, max_df_share=1.0)
+    print_overlap_report(report)
+    print(f"\n   Matrix und Paare gespeichert: {save_overlap_report(report)}")
 
 # ============================================================
 # HAUPTPROGRAMM
@@ -410,17 +705,51 @@ print("🚀 SITEMAP CONTENT ANALYZER - FINALE VERSION")
 print("="*70)
 print("\n✅ Wissenschaftlich korrekter HIX (0-20 Skala)")
 print("✅ Verbesserte Keywords (Bi-Gramme + Fachbegriffe)")
-print("\nGeschätzte Dauer: 10-15 Minuten\n")
+print("✅ Alle Sitemaps parallel (fair verteilt über Hosts)\n")
 
+sites = []
 all_results = []
-for name, filename in SITEMAP_FILES.items():
-    try:
-        result = analyze_sitemap(filename, name)
-        all_results.append(result)
-    except FileNotFoundError:
-        print(f"❌ FEHLER: Datei '{filename}' nicht gefunden!\n")
-    except Exception as e:
-        print(f"❌ FEHLER bei {name}: {e}\n")
+internal_hosts = set()
+runs = run_id = None
+if ANALYSE_MODUS == 'beobachten':
+    watch_sitemaps()
+elif ANALYSE_MODUS == 'worker':
+    worker_id = default_worker_id()
+    print(f"👷 Worker {worker_id} an Warteschlange {WARTESCHLANGE}")
+    processed = run_worker(ShardQueue(WARTESCHLANGE, SHARDS), analyze_batch, worker_id)
+    print(f"\n✅ Worker {worker_id}: {processed} URLs bearbeitet")
+    print_fetch_report(FETCH)
+    if len(ARTICLES):
+        print(f"📦 Artikel-Datensätze: {ARTICLES.save(f'ergebnisse/artikel_{worker_id}.npz')}")
+    if INHALTSINDEX and len(INDEX):
+        print(f"🔎 Suchindex: {INDEX.save(INHALTSINDEX.replace('.bin', f'_{worker_id}.bin'))}")
+elif ANALYSE_MODUS == 'reduzieren':
+    print(f"🧮 Führe Teilergebnisse aus {WARTESCHLANGE} zusammen...\n")
+    queue = ShardQueue(WARTESCHLANGE, SHARDS)
+    runs = RunStore(RUN_STORE) if RUN_STORE else None
+    run_id = runs.start_run(f"reduzieren: {WARTESCHLANGE}") if runs else None
+    all_results = reduce_shards(queue, runs, run_id)
+    internal_hosts = queue.base_domains()
+else:
+    for name, filename in SITEMAP_FILES.items():
+        try:
+            sites.append(load_sitemap(filename, name))
+        except FileNotFoundError:
+            print(f"❌ FEHLER: Datei '{filename}' nicht gefunden!\n")
+        except Exception as e:
+            print(f"❌ FEHLER bei {name}: {e}\n")
+    if ANALYSE_MODUS == 'verteilen':
+        print(f"\n📤 Verteile URLs auf {SHARDS} Shards: {WARTESCHLANGE}")
+        distribute_sites(sites, ShardQueue(WARTESCHLANGE, SHARDS))
+    else:
+        runs = RunStore(RUN_STORE) if RUN_STORE and sites else None
+        run_id = runs.start_run(', '.join(site['sitemap_name'] for site in sites)) if runs else None
+        all_results = analyze_sites(sites, runs, run_id) if sites else []
+        internal_hosts = {site['base_domain'] for site in sites}
+DEFERRED.close()
+EXTRACTOR.save()
+if EXTRACTOR.stats['blocks_removed']:
+    print(f"🧹 {EXTRACTOR.stats['blocks_removed']} wiederkehrende Template-Blöcke vor der Textanalyse entfernt")
 
 if all_results:
     print("\n" + "="*70)
@@ -428,10 +757,18 @@ if all_results:
     print("="*70)
     total_articles = sum(r['total_articles'] for r in all_results)
     total_analyzed = sum(r['successful_analyses'] for r in all_results)
+    total_deferred = sum(r['deferred_urls'] for r in all_results)
     print(f"\n🔢 GESAMTSTATISTIK:")
     print(f"   Gesamtanzahl Artikel: {total_articles}")
     print(f"   Erfolgreich analysiert: {total_analyzed}")
-    print(f"   Fehlgeschlagen: {total_articles - total_analyzed}")
+    print(f"   Fehlgeschlagen: {total_articles - total_analyzed - total_deferred}")
+    if RENDER.stats['aus_json_state']:
+        print(f"   Davon Text aus JSON-State (JavaScript-Seiten): {RENDER.stats['aus_json_state']}")
+    if total_deferred:
+        print(f"   Zurückgestellt (JavaScript-Rendering nötig): {total_deferred} → {DEFERRED.path}")
+    # Beim Reduzieren wurde nichts abgerufen; die Abruf-Fehler stehen in den Worker-Ausgaben
+    if ANALYSE_MODUS != 'reduzieren':
+        print_fetch_report(FETCH)
     for result in all_results:
         print(f"\n" + "="*70)
         print(f"📁 {result['sitemap_name']}")
@@ -440,15 +777,19 @@ if all_results:
             print(f"\n   📊 BASIS-METRIKEN:")
             print(f"      Artikel gesamt: {result['total_articles']}")
             print(f"      Ø Wortanzahl: {result['avg_word_count']:.0f} Wörter")
+            print(f"         Median: {result['word_count_percentiles']['p50']:.0f} / P90: {result['word_count_percentiles']['p90']:.0f} Wörter")
             print(f"      Ø Komplexität: {result['avg_complexity']:.2f}/3")
             print(f"      Ø HIX-Score: {result['avg_hix']:.1f}/20 ({interpret_hix(result['avg_hix'])})")
+            print(f"         Median: {result['hix_percentiles']['p50']:.1f} / P90: {result['hix_percentiles']['p90']:.1f}")
             print(f"\n   📝 CONTENT-TYPEN:")
             for content_type, count in result['content_types'].most_common():
                 percentage = (count / result['successful_analyses']) * 100
                 print(f"      {content_type}: {count} Artikel ({percentage:.1f}%)")
             print(f"\n   🏷️  TOP-THEMEN (Bi-Gramme + Fachbegriffe):")
             for theme, count in result['top_themes'][:10]:
-                print(f"      {theme}: {count}x")
+                error = result['theme_errors'].get(theme, 0)
+                # Nicht exakt gezählt (Sketch voll): Bereich statt Zahl ausgeben
+                print(f"      {theme}: {count}x" if not error else f"      {theme}: {count - error}–{count}x")
             print(f"\n   🔗 INTERNE VERLINKUNGEN:")
             print(f"      Ø Links pro Artikel: {result['avg_internal_links']:.1f}")
             top_linked = sorted(result['internal_links'], key=lambda x: x['link_count'], reverse=True)[:3]
@@ -457,9 +798,38 @@ if all_results:
                 for item in top_linked:
                     if item['link_count'] > 0:
                         print(f"         {item['link_count']} Links: {item['url'][:60]}...")
+            inventory = result['schema_inventory']
+            print(f"\n   🧩 STRUCTURED DATA (Schema-Inventar):")
+            print(f"      Seiten mit Structured Data: {inventory.pages_with_data}/{inventory.pages}")
+            for schema_type, count in inventory.type_counts.most_common(8):
+                top_props = ', '.join(prop for prop, _ in inventory.properties[schema_type].most_common(5))
+                print(f"      {schema_type}: {count}x auf {inventory.type_pages[schema_type]} Seiten ({top_props})")
+            if inventory.stats['invalid_jsonld']:
+                print(f"      ⚠️  {inventory.stats['invalid_jsonld']} ungültige JSON-LD-Blöcke")
         else:
             print(f"   ⚠️  Keine Artikel konnten analysiert werden")
     analyze_thematic_overlap(all_results)
+    print_hix_calibration()
+    inventory_path = save_inventory({r['sitemap_name']: r['schema_inventory'] for r in all_results})
+    print(f"\n🧩 Schema-Inventar gespeichert: {inventory_path}")
+    if INHALTSINDEX and len(INDEX):
+        print(f"🔎 Suchindex über {len(INDEX)} Artikel gespeichert: {INDEX.save(INHALTSINDEX)}")
+        print(f"   Abfrage: python content_index.py suche|phrase|entitaet|keyword \"Begriff\"")
+    if len(ARTICLES):
+        print(f"📦 {len(ARTICLES)} Artikel-Datensätze ({ARTICLES.nbytes() / 1024:.0f} KB) gespeichert: {ARTICLES.save('ergebnisse/artikel.npz')}")
+    if runs:
+        previous = [r for r in runs.latest_runs(2) if r != run_id]
+        if previous:
+            print_run_diff(runs.diff(previous[0], run_id))
+        print(f"\n🗂️  Lauf {run_id} gespeichert: {RUN_STORE}")
+        runs.close()
+    if LINK_CHECK and len(LINKS):
+        print(f"\n⏳ Prüfe {len(LINKS)} eindeutige Linkziele...")
+        checker = LinkChecker()
+        link_report = checker.check(LINKS, internal_hosts=internal_hosts)
+        checker.close()
+        print_link_report(link_report)
+        print(f"\n   Details gespeichert: {save_link_report(link_report)}")
     if total_analyzed > 0:
         total_words = sum(r['avg_word_count'] * r['successful_analyses'] for r in all_results)
         total_hix = sum(r['avg_hix'] * r['successful_analyses'] for r in all_results)
@@ -484,5 +854,5 @@ if all_results:
         else:
             print(f"   → Überschaubare Redirects")
     print("\n✅ Analyse erfolgreich abgeschlossen!")
-else:
+elif ANALYSE_MODUS in ('lokal', 'reduzieren'):
     print("\n❌ Keine Sitemaps konnten analysiert werden.")
@@ -0,0 +1,344 @@
+# CONTENT EXTRACTION - Gemeinsame Hauptinhalt-Extraktion
+# Wird von colab_sitemap_analyzer_FINAL.py und seo_geo_analyzer.py genutzt
+# Lernt pro Host den besten Selektor (TYPO3-Templates) + Textdichte-Fallback
+# + Fingerprints wiederkehrender Template-Blöcke (Header, Sidebar, Teaser)
+
+import os
+import re
+import json
+import time
+import hashlib
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+
+# ============================================================
+# KONFIGURATION
+# ============================================================
+
+# Tags, die nie zum Hauptinhalt gehören
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'footer', 'header', 'aside', 'form']
+
+# Kandidaten für den Hauptinhalt (Vereinigung beider Analyzer, Reihenfolge = Priorität)
+CANDIDATE_SELECTORS = [
+    'main', 'article', '[role="main"]', '#content', '.content',
+    'div[class*="content"]', '.post', '.entry-content'
+]
+
+# Pseudo-Selektor: Hauptinhalt über Textdichte bestimmen
+DENSITY_FALLBACK = 'textdichte'
+
+# Anzahl Seiten pro Host, aus denen der beste Selektor gelernt wird
+LEARN_PAGES = 5
+
+# Unterhalb dieser Zeichenzahl gilt ein Treffer als leer
+MIN_MAIN_TEXT = 200
+
+# Block-Elemente, deren Text als Fingerprint gehasht wird (nur innerste Blöcke)
+BLOCK_TAGS = ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'section',
+              'td', 'dd', 'dt', 'blockquote', 'figcaption']
+
+# Ab diesem Seitenanteil gilt ein Block als Template-Bestandteil
+BOILERPLATE_SHARE = 0.5
+
+# Mindestanzahl beobachteter Seiten, bevor Fingerprints aktiv werden
+FINGERPRINT_MIN_PAGES = 5
+
+# Nach so vielen Seiten pro Host wird nicht mehr weiter gelernt (Speicher)
+FINGERPRINT_MAX_PAGES = 50
+
+# Gespeicherte Fingerprints gelten so lange; danach wird der Host neu gelernt
+FINGERPRINT_MAX_AGE = 30 * 24 * 3600
+
+# So viele Seiten in Folge ohne bekannten Block → Template geändert, neu lernen
+FINGERPRINT_MAX_MISSES = 10
+
+# So viele Seiten in Folge, auf denen der gelernte Selektor nichts findet → neu lernen
+SELECTOR_MAX_MISSES = 5
+
+MIN_BLOCK_CHARS = 15
+
+DEFAULT_CACHE_PATH = 'ergebnisse/cache/extraction_cache.json'
+
+# ============================================================
+# HILFSFUNKTIONEN
+# ============================================================
+
+def normalize_whitespace(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+def link_density(node):
+    """Anteil des Link-Texts am Gesamttext eines Knotens"""
+    text_len = len(node.get_text(strip=True))
+    if text_len == 0:
+        return 1.0
+    link_len = sum(len(a.get_text(strip=True)) for a in node.find_all('a'))
+    return min(link_len / text_len, 1.0)
+
+def score_node(node):
+    """Textmenge, abgewertet um Navigations-/Teaser-Links"""
+    text_len = len(node.get_text(strip=True))
+    return text_len * (1 - link_density(node))
+
+def find_densest_block(soup, min_paragraph=25):
+    """Boilerplate-Entfernung über Textdichte (Absatz-Scores an Eltern vererben)"""
+    scores = {}
+    nodes = {}
+    for p in soup.find_all('p'):
+        text_len = len(p.get_text(strip=True))
+        if text_len < min_paragraph:
+            continue
+        parent = p.parent
+        grandparent = parent.parent if parent is not None else None
+        for node, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if node is None or node.name in ('[document]', 'html'):
+                continue
+            key = id(node)
+            nodes[key] = node
+            scores[key] = scores.get(key, 0) + text_len * weight
+    best, best_score = None, 0
+    for key, score in scores.items():
+        node = nodes[key]
+        score *= 1 - link_density(node)
+        if score > best_score:
+            best, best_score = node, score
+    return best
+
+# ============================================================
+# TEMPLATE-FINGERPRINTS
+# ============================================================
+
+def block_fingerprint(text):
+    normalized = re.sub(r'\d+', '0', normalize_whitespace(text).lower())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+def iter_text_blocks(node, min_chars=MIN_BLOCK_CHARS):
+    """Liefert (Element, Fingerprint) für alle innersten Textblöcke"""
+    for element in node.find_all(BLOCK_TAGS):
+        if element.find(BLOCK_TAGS) is not None:
+            continue
+        text = element.get_text(' ', strip=True)
+        if len(text) < min_chars:
+            continue
+        yield element, block_fingerprint(text)
+
+class BoilerplateFingerprinter:
+    """Lernt pro Host, welche Textblöcke auf den meisten Seiten vorkommen"""
+
+    def __init__(self, share=BOILERPLATE_SHARE, min_pages=FINGERPRINT_MIN_PAGES, max_pages=FINGERPRINT_MAX_PAGES,
+                 max_age=FINGERPRINT_MAX_AGE, max_misses=FINGERPRINT_MAX_MISSES):
+        self.share = share
+        self.min_pages = min_pages
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.max_misses = max_misses
+        self.boilerplate = {}
+        self.learned_at = {}
+        self.misses = Counter()
+        self.page_counts = Counter()
+        self.block_counts = defaultdict(Counter)
+
+    def observe(self, host, fingerprints):
+        if self.page_counts[host] >= self.max_pages:
+            return
+        self.page_counts[host] += 1
+        self.block_counts[host].update(set(fingerprints))
+        pages = self.page_counts[host]
+        if pages >= self.min_pages:
+            self.boilerplate[host] = {
+                fp for fp, count in self.block_counts[host].items() if count / pages >= self.share
+            }
+            self.learned_at[host] = time.time()
+        if pages >= self.max_pages:
+            del self.block_counts[host]
+
+    def warming_up(self, host):
+        """True, solange für den Host noch keine Fingerprints aktiv sind"""
+        return host not in self.boilerplate and self.page_counts[host] < self.min_pages
+
+    def forget(self, host):
+        """Fingerprints eines Hosts verwerfen, er wird ab der nächsten Seite neu gelernt"""
+        self.boilerplate.pop(host, None)
+        self.learned_at.pop(host, None)
+        self.block_counts.pop(host, None)
+        self.page_counts[host] = 0
+        self.misses[host] = 0
+
+    def strip(self, node, host, observe=True):
+        """Entfernt bekannte Template-Blöcke aus dem Knoten, liefert Anzahl entfernter Blöcke"""
+        known = self.boilerplate.get(host, ())
+        learning = observe and self.page_counts[host] < self.max_pages
+        if not known and not learning:
+            return 0
+        blocks = list(iter_text_blocks(node))
+        if learning:
+            self.observe(host, [fp for element, fp in blocks])
+        matches = [element for element, fp in blocks if fp in known]
+        if known and not learning and blocks:
+            # Kein bekannter Block mehr auf vielen Seiten in Folge: Template hat sich geändert
+            self.misses[host] = 0 if matches else self.misses[host] + 1
+            if self.misses[host] >= self.max_misses:
+                self.forget(host)
+                return 0
+        # Seiten, die nur aus bekannten Blöcken bestehen (Dubletten), nicht leeren
+        if len(matches) == len(blocks):
+            return 0
+        for element in matches:
+            element.decompose()
+        return len(matches)
+
+    def to_dict(self):
+        return {host: {'fingerprints': sorted(fps), 'learned_at': self.learned_at.get(host, 0)}
+                for host, fps in self.boilerplate.items()}
+
+    def load_dict(self, data):
+        now = time.time()
+        for host, entry in data.items():
+            # Ältere Caches (nur Liste, ohne Zeitstempel) und abgelaufene Einträge neu lernen
+            if not isinstance(entry, dict) or now - entry.get('learned_at', 0) > self.max_age:
+                continue
+            self.boilerplate[host] = set(entry['fingerprints'])
+            self.learned_at[host] = entry['learned_at']
+            # Bereits gelernte Hosts nicht erneut beobachten (bis Ablauf oder zu vielen Fehlgriffen)
+            self.page_counts[host] = self.max_pages
+
+# ============================================================
+# EXTRAKTIONS-ENGINE
+# ============================================================
+
+class ContentExtractor:
+    """Hauptinhalt-Extraktion mit Selektor-Cache pro Host"""
+
+    def __init__(self, learn_pages=LEARN_PAGES, min_text=MIN_MAIN_TEXT, cache_path=None):
+        self.learn_pages = learn_pages
+        self.min_text = min_text
+        self.cache_path = cache_path
+        self.host_selectors = {}
+        self.selector_misses = Counter()
+        self.learning = defaultdict(Counter)
+        self.stats = Counter()
+        self.fingerprints = BoilerplateFingerprinter()
+        self.observed_urls = set()
+        if cache_path and os.path.exists(cache_path):
+            self.load()
+
+    # --- Persistenz ---
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # Unlesbarer Cache (z. B. abgebrochener Schreibvorgang): neu lernen statt abbrechen
+            print(f"⚠️  Extraktions-Cache {self.cache_path} unlesbar ({e}) – wird neu gelernt")
+            return
+        self.host_selectors.update(data.get('selectors', {}))
+        self.fingerprints.load_dict(data.get('fingerprints', {}))
+
+    def cache_data(self):
+        return {'selectors': self.host_selectors, 'fingerprints': self.fingerprints.to_dict()}
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        # Atomar ersetzen: mehrere Worker-Prozesse schreiben dieselbe Datei
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache_data(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    # --- Extraktion ---
+
+    def parse(self, html_content):
+        return BeautifulSoup(html_content, 'html.parser')
+
+    def strip_boilerplate(self, soup):
+        for tag in soup(BOILERPLATE_TAGS):
+            tag.decompose()
+
+    def select(self, soup, selector):
+        if selector == DENSITY_FALLBACK:
+            return find_densest_block(soup)
+        return soup.select_one(selector)
+
+    def evaluate_candidates(self, soup):
+        """Bewertet alle Selektoren, liefert (Selektor, Knoten) mit bestem Score"""
+        best_selector, best_node, best_score = None, None, 0
+        for selector in CANDIDATE_SELECTORS:
+            node = soup.select_one(selector)
+            if node is None:
+                continue
+            score = score_node(node)
+            if score > best_score:
+                best_selector, best_node, best_score = selector, node, score
+        if best_node is None or best_score < self.min_text:
+            node = find_densest_block(soup)
+            if node is not None and score_node(node) > best_score:
+                return DENSITY_FALLBACK, node
+        return best_selector, best_node
+
+    def learn(self, host, selector):
+        counter = self.learning[host]
+        counter[selector] += 1
+        if sum(counter.values()) >= self.learn_pages:
+            self.host_selectors[host] = counter.most_common(1)[0][0]
+            del self.learning[host]
+
+    def find_main(self, soup, host, learn=True):
+        """Findet den Hauptinhalt-Knoten (direkter Pfad, sobald der Host gelernt ist)"""
+        cached = self.host_selectors.get(host)
+        if cached:
+            node = self.select(soup, cached)
+            if node is not None and len(node.get_text(strip=True)) >= self.min_text:
+                self.stats['cache_hit'] += 1
+                self.selector_misses[host] = 0
+                return node
+            self.stats['cache_miss'] += 1
+            self.selector_misses[host] += 1
+            # Gelernter Selektor passt nicht mehr (Template geändert): Host neu lernen
+            if self.selector_misses[host] >= SELECTOR_MAX_MISSES:
+                del self.host_selectors[host]
+                self.selector_misses[host] = 0
+                self.stats['relearned'] += 1
+                cached = None
+        selector, node = self.evaluate_candidates(soup)
+        if selector and not cached and learn:
+            self.learn(host, selector)
+        self.stats['evaluated'] += 1
+        return node
+
+    def extract_from_soup(self, soup, url=None):
+        """Entfernt Boilerplate (in-place) und liefert den Hauptinhalt als Text"""
+        host = urlparse(url).netloc if url else ''
+        self.strip_boilerplate(soup)
+        main = self.find_main(soup, host)
+        if main is None:
+            self.stats['body_fallback'] += 1
+            main = soup.body or soup
+        # In der Aufwärmphase beobachtete Seiten nicht doppelt zählen
+        observe = url not in self.observed_urls
+        self.observed_urls.discard(url)
+        self.stats['blocks_removed'] += self.fingerprints.strip(main, host, observe)
+        return normalize_whitespace(main.get_text(separator=' ', strip=True))
+
+    # --- Aufwärmphase ---
+
+    def needs_warm_up(self, url):
+        return self.fingerprints.warming_up(urlparse(url).netloc)
+
+    def warm_up(self, html_content, url):
+        """Nur Template-Blöcke einer Seite beobachten, ohne zu extrahieren
+
+        Seiten eines Hosts zurückhalten, bis needs_warm_up False ist, und erst dann
+        extrahieren – sonst behalten die ersten Seiten ihre Template-Blöcke.
+        """
+        host = urlparse(url).netloc
+        soup = self.parse(html_content)
+        self.strip_boilerplate(soup)
+        main = self.find_main(soup, host, learn=False) or soup.body or soup
+        self.fingerprints.observe(host, [fp for element, fp in iter_text_blocks(main)])
+        self.observed_urls.add(url)
+
+    def extract(self, html_content, url=None):
+        return self.extract_from_soup(self.parse(html_content), url)
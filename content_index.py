@@ -0,0 +1,310 @@
+# CONTENT INDEX - Invertierter Index über Hauptinhalt, Keywords und Entitäten
+# Beantwortet "welche Artikel erwähnen X" ohne erneutes Crawlen
+# Eine Datei pro Index: Postings als Varints (Dokument-Delta, Häufigkeit,
+# Positions-Deltas), Lexikon und Dokumentliste als JSON; Postings per mmap
+#
+# Verwendung auf der Kommandozeile:
+#   python content_index.py suche "künstliche intelligenz"
+#   python content_index.py phrase "zukunft der arbeit"
+#   python content_index.py entitaet "Bundesministerium für Arbeit und Soziales"
+#   python content_index.py keyword "ki-verordnung"
+#   python content_index.py zusammenfuehren "ergebnisse/content_index_*.bin"   (Worker-Indizes → --index)
+
+import os
+import re
+import glob
+import math
+import mmap
+import json
+import struct
+import argparse
+from collections import Counter, defaultdict
+
+DEFAULT_INDEX_PATH = 'ergebnisse/content_index.bin'
+
+MAGIC = b'CIDX0001'
+HEADER = struct.Struct('<8sQQQQ')
+
+# Präfixe für Feld-Terme im gemeinsamen Lexikon (Texttokens ohne Präfix)
+KEYWORD_PREFIX = 'kw:'
+ENTITY_PREFIX = 'ent:'
+
+# BM25-Parameter und Bonus für Treffer in den Keywords eines Artikels
+BM25_K1 = 1.2
+BM25_B = 0.75
+KEYWORD_BOOST = 2.0
+
+TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+def normalize_term(text):
+    return ' '.join(tokenize(text))
+
+# ============================================================
+# VARINT-KODIERUNG
+# ============================================================
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_postings(buffer, has_positions, keep_positions=False):
+    """Liefert (doc_id, Häufigkeit, Positionen) aus einem Posting-Puffer"""
+    pos = 0
+    end = len(buffer)
+    doc_id = 0
+
+    def read():
+        nonlocal pos
+        value = shift = 0
+        while True:
+            byte = buffer[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    while pos < end:
+        doc_id += read()
+        tf = read()
+        positions = None
+        if has_positions:
+            current = 0
+            if keep_positions:
+                positions = []
+                for _ in range(tf):
+                    current += read()
+                    positions.append(current)
+            else:
+                for _ in range(tf):
+                    read()
+        yield doc_id, tf, positions
+
+# ============================================================
+# AUFBAU
+# ============================================================
+
+class IndexBuilder:
+    """Sammelt Postings komprimiert im Speicher und schreibt sie in eine Datei"""
+
+    def __init__(self):
+        self.docs = []
+        self.postings = defaultdict(bytearray)
+        self.last_doc = {}
+        self.df = Counter()
+
+    def _append(self, term, doc_id, positions=None, tf=None):
+        out = self.postings[term]
+        encode_varint(doc_id - self.last_doc.get(term, 0), out)
+        self.last_doc[term] = doc_id
+        self.df[term] += 1
+        if positions is None:
+            encode_varint(tf, out)
+            return
+        encode_varint(len(positions), out)
+        previous = 0
+        for position in positions:
+            encode_varint(position - previous, out)
+            previous = position
+
+    def add_document(self, url, text, keywords=(), entities=()):
+        """entities: Namen oder (Name, Label)-Paare, Mehrfachnennungen zählen als Häufigkeit"""
+        doc_id = len(self.docs)
+        tokens = tokenize(text)
+        self.docs.append([url, len(tokens)])
+        positions = defaultdict(list)
+        for position, token in enumerate(tokens):
+            positions[token].append(position)
+        for token, token_positions in positions.items():
+            self._append(token, doc_id, token_positions)
+        for keyword in set(normalize_term(k) for k in keywords):
+            if keyword:
+                self._append(KEYWORD_PREFIX + keyword, doc_id, tf=1)
+        names = Counter(normalize_term(e[0] if isinstance(e, (tuple, list)) else e) for e in entities)
+        for name, count in names.items():
+            if name:
+                self._append(ENTITY_PREFIX + name, doc_id, tf=count)
+        return doc_id
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_index(self, index, skip_urls=None):
+        """Hängt einen gespeicherten ContentIndex an; Dokument-IDs werden neu vergeben
+
+        URLs in skip_urls (z. B. von mehreren Workern bearbeitet) werden übersprungen
+        und die übrigen ergänzt.
+        """
+        doc_ids = []
+        for url, length in zip(index.urls, index.lengths):
+            if skip_urls is not None and url in skip_urls:
+                doc_ids.append(None)
+                continue
+            doc_ids.append(len(self.docs))
+            self.docs.append([url, length])
+            if skip_urls is not None:
+                skip_urls.add(url)
+        for term in sorted(index.lexicon):
+            field_term = term.startswith((KEYWORD_PREFIX, ENTITY_PREFIX))
+            for doc_id, tf, positions in index._postings(term, with_positions=not field_term):
+                new_id = doc_ids[doc_id]
+                if new_id is not None:
+                    self._append(term, new_id, positions, tf)
+        return len(doc_ids) - doc_ids.count(None)
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        lexicon = {}
+        with open(path, 'wb') as f:
+            f.write(b'\0' * HEADER.size)
+            offset = HEADER.size
+            for term in sorted(self.postings):
+                data = self.postings[term]
+                f.write(data)
+                lexicon[term] = [offset, len(data), self.df[term]]
+                offset += len(data)
+            lexicon_offset = offset
+            lexicon_bytes = json.dumps(lexicon, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            f.write(lexicon_bytes)
+            docs_offset = lexicon_offset + len(lexicon_bytes)
+            f.write(json.dumps(self.docs, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, len(self.docs), lexicon_offset, docs_offset, offset - HEADER.size))
+        return path
+
+# ============================================================
+# ABFRAGE
+# ============================================================
+
+class ContentIndex:
+    """Liest einen gespeicherten Index; Postings bleiben im memory-mapped Bereich"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, num_docs, lexicon_offset, docs_offset, postings_bytes = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} ist kein Content-Index")
+        self.lexicon = json.loads(self.data[lexicon_offset:docs_offset].decode('utf-8'))
+        docs = json.loads(self.data[docs_offset:].decode('utf-8'))
+        self.urls = [url for url, length in docs]
+        self.lengths = [length for url, length in docs]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        self.postings_bytes = postings_bytes
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __len__(self):
+        return len(self.urls)
+
+    def _postings(self, term, with_positions=False):
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return
+        offset, length, df = entry
+        # Nur Texttokens haben Positionen, Feld-Terme (Keywords, Entitäten) nur die Häufigkeit
+        has_positions = not term.startswith((KEYWORD_PREFIX, ENTITY_PREFIX))
+        yield from decode_postings(self.data[offset:offset + length], has_positions, with_positions)
+
+    def idf(self, term):
+        entry = self.lexicon.get(term)
+        df = entry[2] if entry else 0
+        return math.log(1 + (len(self.urls) - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, tf, doc_id):
+        norm = 1 - BM25_B + BM25_B * self.lengths[doc_id] / (self.avg_length or 1)
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+    def _ranked(self, scores, limit):
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self.urls[doc_id], round(score, 4)) for doc_id, score in ranked]
+
+    def search(self, query, limit=20):
+        """BM25 über alle Suchbegriffe, Bonus wenn die Anfrage ein Keyword des Artikels ist"""
+        scores = Counter()
+        for term in set(tokenize(query)):
+            idf = self.idf(term)
+            for doc_id, tf, _ in self._postings(term):
+                scores[doc_id] += idf * self._bm25(tf, doc_id)
+        keyword = KEYWORD_PREFIX + normalize_term(query)
+        idf = self.idf(keyword)
+        for doc_id, tf, _ in self._postings(keyword):
+            scores[doc_id] += KEYWORD_BOOST * idf
+        return self._ranked(scores, limit)
+
+    def phrase(self, text, limit=20):
+        """Artikel mit der exakten Wortfolge, bewertet nach Häufigkeit der Phrase (BM25)"""
+        terms = tokenize(text)
+        if not terms:
+            return []
+        # Seltensten Begriff zuerst: kleinste Kandidatenmenge
+        order = sorted(range(len(terms)), key=lambda i: self.lexicon.get(terms[i], [0, 0, 0])[2])
+        candidates = None
+        for i in order:
+            term_docs = {doc_id: {p - i for p in positions} for doc_id, tf, positions in self._postings(terms[i], True)}
+            if candidates is None:
+                candidates = term_docs
+            else:
+                candidates = {doc_id: starts & term_docs[doc_id] for doc_id, starts in candidates.items() if doc_id in term_docs}
+                candidates = {doc_id: starts for doc_id, starts in candidates.items() if starts}
+            if not candidates:
+                return []
+        idf = sum(self.idf(term) for term in set(terms))
+        scores = {doc_id: idf * self._bm25(len(starts), doc_id) for doc_id, starts in candidates.items()}
+        return self._ranked(scores, limit)
+
+    def entity(self, name, limit=20):
+        """Artikel, die eine Entität (Person, Ort, Organisation) nennen; Score = Nennungen × IDF"""
+        term = ENTITY_PREFIX + normalize_term(name)
+        idf = self.idf(term)
+        return self._ranked({doc_id: tf * idf for doc_id, tf, _ in self._postings(term)}, limit)
+
+    def keyword(self, keyword, limit=20):
+        term = KEYWORD_PREFIX + normalize_term(keyword)
+        idf = self.idf(term)
+        return self._ranked({doc_id: idf * self._bm25(1, doc_id) for doc_id, tf, _ in self._postings(term)}, limit)
+
+    def terms(self, prefix=''):
+        """Alle Terme mit Präfix (z. B. ENTITY_PREFIX), nach Dokumentfrequenz sortiert"""
+        matches = [(term, entry[2]) for term, entry in self.lexicon.items() if term.startswith(prefix)]
+        return sorted(matches, key=lambda item: item[1], reverse=True)
+
+def merge_indexes(paths, path=DEFAULT_INDEX_PATH):
+    """Führt mehrere Index-Dateien (z. B. eine pro Worker) zu einer zusammen"""
+    builder = IndexBuilder()
+    seen = set()
+    for source in paths:
+        index = ContentIndex(source)
+        builder.add_index(index, seen)
+        index.close()
+    return builder.save(path), len(builder)
+
+def main():
+    parser = argparse.ArgumentParser(description='Analysierte Inhalte durchsuchen')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('modus', choices=['suche', 'phrase', 'entitaet', 'keyword', 'zusammenfuehren'])
+    parser.add_argument('anfrage')
+    args = parser.parse_args()
+    if args.modus == 'zusammenfuehren':
+        sources = sorted(path for path in glob.glob(args.anfrage) if os.path.abspath(path) != os.path.abspath(args.index))
+        path, count = merge_indexes(sources, args.index)
+        print(f"{len(sources)} Indizes mit {count} Artikeln zusammengeführt: {path}")
+        return
+    index = ContentIndex(args.index)
+    lookup = {'suche': index.search, 'phrase': index.phrase, 'entitaet': index.entity, 'keyword': index.keyword}[args.modus]
+    results = lookup(args.anfrage, limit=args.limit)
+    print(f"{len(results)} Treffer in {len(index)} Artikeln")
+    for url, score in results:
+        print(f"   {score:8.3f}  {url}")
+    index.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+# FETCH POLICY - Timeouts, Wiederholungen und Circuit Breaker pro Host
+# Timeout passt sich der gemessenen Antwortzeit des Hosts an, vorübergehende
+# Fehler werden mit exponentiellem Backoff + Jitter wiederholt, und ein Host mit
+# wiederholten Fehlern wird pausiert: seine URLs warten (retry_at), nach der Pause
+# prüft genau ein Probe-Request, ob er wieder antwortet (halb offen).
+# Jeder Fehlschlag wird einer Fehlerart zugeordnet.
+
+import time
+import random
+import threading
+from collections import Counter, deque
+from urllib.parse import urlparse
+import requests
+from http_probe import USER_AGENT
+
+# ============================================================
+# KONFIGURATION
+# ============================================================
+
+# Timeout-Grenzen (Sekunden); dazwischen: Faktor × P95 der letzten Antwortzeiten
+MIN_TIMEOUT = 3.0
+MAX_TIMEOUT = 20.0
+DEFAULT_TIMEOUT = 10.0
+TIMEOUT_FACTOR = 4.0
+LATENCY_WINDOW = 50
+
+# Wiederholungen bei vorübergehenden Fehlern
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Circuit Breaker: nach so vielen Fehlern in Folge wird der Host pausiert;
+# scheitern so viele Probe-Requests nacheinander, wird der Host aufgegeben
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+BREAKER_MAX_PROBES = 3
+
+# HTTP-Status, die wiederholt werden (Überlast, Gateway-Fehler)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Fehlerarten
+TIMEOUT = 'timeout'
+CONNECTION = 'verbindung'
+NOT_FOUND = 'nicht_gefunden'
+GONE = 'entfernt'
+FORBIDDEN = 'verboten'
+RATE_LIMITED = 'rate_limit'
+SERVER_ERROR = 'serverfehler'
+CLIENT_ERROR = 'clientfehler'
+HOST_PAUSED = 'host_pausiert'
+HOST_GIVEN_UP = 'host_aufgegeben'
+OTHER = 'sonstiges'
+
+# Fehler einzelner URLs, die nichts über den Zustand des Hosts aussagen
+URL_ERRORS = (NOT_FOUND, GONE, FORBIDDEN, CLIENT_ERROR)
+
+def classify_status(status):
+    if status == 404:
+        return NOT_FOUND
+    if status == 410:
+        return GONE
+    if status in (401, 403):
+        return FORBIDDEN
+    if status == 429:
+        return RATE_LIMITED
+    if status >= 500:
+        return SERVER_ERROR
+    return CLIENT_ERROR
+
+def classify_exception(error):
+    if isinstance(error, requests.Timeout):
+        return TIMEOUT
+    if isinstance(error, requests.ConnectionError):
+        return CONNECTION
+    return OTHER
+
+# ============================================================
+# ZUSTAND PRO HOST
+# ============================================================
+
+class HostState:
+    """Antwortzeiten und Circuit-Breaker-Zustand eines Hosts"""
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.failed_probes = 0
+        self.given_up = False
+        self.retry_after = 0.0
+
+    def timeout(self):
+        if len(self.latencies) < 5:
+            return DEFAULT_TIMEOUT
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_FACTOR))
+
+class FetchResult:
+    """Ergebnis eines Abrufs: Antwort oder Fehlerart (error), dazu Status und Versuche
+
+    retry_at (monotonic) ist gesetzt, wenn der Host pausiert ist: kein Fehlschlag,
+    die URL soll zu diesem Zeitpunkt erneut versucht werden.
+    """
+
+    __slots__ = ('url', 'response', 'status', 'error', 'attempts', 'elapsed', 'retry_at')
+
+    def __init__(self, url, response=None, status=None, error=None, attempts=0, elapsed=0.0, retry_at=None):
+        self.url = url
+        self.response = response
+        self.status = status
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.retry_at = retry_at
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def text(self):
+        return self.response.text if self.response is not None else None
+
+# ============================================================
+# POLICY
+# ============================================================
+
+class FetchPolicy:
+    """Thread-sicherer Abruf mit adaptivem Timeout, Backoff und Circuit Breaker pro Host"""
+
+    def __init__(self, max_retries=MAX_RETRIES, breaker_threshold=BREAKER_THRESHOLD,
+                 breaker_cooldown=BREAKER_COOLDOWN, max_probes=BREAKER_MAX_PROBES, headers=None):
+        self.max_retries = max_retries
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.max_probes = max_probes
+        self.headers = headers or {'User-Agent': USER_AGENT}
+        self.hosts = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.failures = Counter()
+        self.failures_by_host = Counter()
+        self.retries = 0
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self.local.session = session
+        return session
+
+    def _host(self, host):
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = HostState()
+            return state
+
+    def _admit(self, state):
+        """(erlaubt, Probe): geschlossen → ja; offen → nein; Pause vorbei → genau ein Probe-Request"""
+        with self.lock:
+            if state.given_up:
+                return False, False
+            if not state.open_until:
+                return True, False
+            if state.probing or time.monotonic() < state.open_until:
+                return False, False
+            state.probing = True
+            return True, True
+
+    def _close(self, state):
+        state.consecutive_failures = 0
+        state.open_until = 0.0
+        state.probing = False
+        state.failed_probes = 0
+
+    def _record_success(self, state, elapsed):
+        with self.lock:
+            state.latencies.append(elapsed)
+            self._close(state)
+
+    def _record_failure(self, state, host, error, probe):
+        with self.lock:
+            if error in URL_ERRORS:
+                # Der Host antwortet – ein Probe-Request schließt den Breaker trotzdem
+                if probe:
+                    self._close(state)
+            else:
+                state.consecutive_failures += 1
+                if probe:
+                    state.probing = False
+                    state.failed_probes += 1
+                # Pause nur beim Öffnen oder nach gescheitertem Probe-Request setzen
+                if probe or (not state.open_until and state.consecutive_failures >= self.breaker_threshold):
+                    if state.failed_probes >= self.max_probes:
+                        state.given_up = True
+                    else:
+                        state.open_until = time.monotonic() + self.breaker_cooldown
+            self.failures[error] += 1
+            self.failures_by_host[(host, error)] += 1
+
+    def backoff(self, attempt):
+        """Exponentieller Backoff mit vollem Jitter"""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def fetch(self, url, wait=False, headers=None):
+        """FetchResult für eine URL; wirft keine Ausnahmen
+
+        wait=True wartet eine Pause des Hosts ab, statt retry_at zurückzugeben.
+        headers ergänzt die Session-Header (z. B. If-None-Match für bedingte Abrufe).
+        """
+        result = self._fetch(url, headers)
+        while wait and result.retry_at is not None:
+            time.sleep(max(0.0, result.retry_at - time.monotonic()))
+            result = self._fetch(url, headers)
+        return result
+
+    def _fetch(self, url, headers=None):
+        host = urlparse(url).netloc
+        state = self._host(host)
+        started = time.monotonic()
+        result = FetchResult(url)
+        allowed, probe = self._admit(state)
+        if not allowed:
+            if state.given_up:
+                result.error = HOST_GIVEN_UP
+                with self.lock:
+                    self.failures[HOST_GIVEN_UP] += 1
+                    self.failures_by_host[(host, HOST_GIVEN_UP)] += 1
+            else:
+                # Pausiert oder Probe-Request läuft: kein Fehlschlag, später erneut versuchen
+                result.error = HOST_PAUSED
+                result.retry_at = max(state.open_until, time.monotonic() + 0.1)
+            return result
+        # Probe-Request ohne Wiederholungen: eine Antwort genügt für die Entscheidung
+        attempts = 1 if probe else self.max_retries + 1
+        for attempt in range(attempts):
+            now = time.monotonic()
+            if now < state.retry_after:
+                time.sleep(state.retry_after - now)
+            result.attempts = attempt + 1
+            timeout = state.timeout()
+            request_started = time.monotonic()
+            try:
+                response = self._session().get(url, headers=headers, timeout=(min(timeout, 5.0), timeout))
+            except requests.RequestException as e:
+                result.error = classify_exception(e)
+                result.status = None
+            else:
+                result.status = response.status_code
+                if response.ok:
+                    self._record_success(state, time.monotonic() - request_started)
+                    result.response = response
+                    result.error = None
+                    break
+                result.error = classify_status(response.status_code)
+                retry_after = response.headers.get('Retry-After', '')
+                if response.status_code == 429 and retry_after.isdigit():
+                    state.retry_after = time.monotonic() + min(float(retry_after), BACKOFF_MAX)
+                if response.status_code not in RETRY_STATUS:
+                    break
+            if attempt < attempts - 1:
+                with self.lock:
+                    self.retries += 1
+                time.sleep(self.backoff(attempt))
+        result.elapsed = time.monotonic() - started
+        if result.error:
+            self._record_failure(state, host, result.error, probe)
+        return result
+
+    def paused_hosts(self):
+        now = time.monotonic()
+        with self.lock:
+            return [host for host, state in self.hosts.items() if state.open_until > now and not state.given_up]
+
+    def report(self):
+        return {
+            'failures': dict(self.failures),
+            'failures_by_host': {f"{host} ({error})": count for (host, error), count in self.failures_by_host.most_common()},
+            'retries': self.retries,
+            'timeouts': {host: round(state.timeout(), 1) for host, state in self.hosts.items()}
+        }
+
+def print_fetch_report(policy, limit=10):
+    report = policy.report()
+    if not report['failures'] and not report['retries']:
+        return
+    print("\n" + "="*70)
+    print("🌐 ABRUF-FEHLER NACH ART")
+    print("="*70)
+    for error, count in sorted(report['failures'].items(), key=lambda item: item[1], reverse=True):
+        print(f"   {error}: {count}")
+    print(f"   Wiederholungen: {report['retries']}")
+    if report['failures_by_host']:
+        print(f"\n   Nach Host:")
+        for key, count in list(report['failures_by_host'].items())[:limit]:
+            print(f"      {key}: {count}")
+    print(f"\n   Timeout pro Host (adaptiv): {', '.join(f'{h} {t:.1f}s' for h, t in report['timeouts'].items())}")
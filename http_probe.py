@@ -0,0 +1,129 @@
+# HTTP PROBE - Parallele HEAD-Requests mit Cache und Limit pro Host
+# Gemeinsame Basis für Ressourcen-Inventar (Seitengewicht) und Link-Prüfung
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Status-Codes, bei denen ein Server HEAD ablehnt und GET trotzdem funktionieren kann
+HEAD_REJECTED = {403, 405, 501}
+
+# Obergrenze für das Mitzählen per GET, wenn kein Content-Length geliefert wird
+MAX_COUNT_BYTES = 20 * 1024 * 1024
+
+class HostLimiter:
+    """Begrenzt gleichzeitige Requests pro Host"""
+
+    def __init__(self, per_host=4):
+        self.per_host = per_host
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self.semaphores[host]
+
+class HeadCache:
+    """HEAD-Ergebnisse pro URL, einmal abgefragt und über alle Seiten geteilt"""
+
+    def __init__(self, max_workers=16, per_host=4, timeout=10, need_size=False):
+        self.max_workers = max_workers
+        self.limiter = HostLimiter(per_host)
+        self.timeout = timeout
+        self.need_size = need_size
+        self.results = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.executor = None
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            self.local.session = session
+        return session
+
+    def _result(self, url, response, method):
+        length = response.headers.get('Content-Length')
+        return {
+            'url': url,
+            'status': response.status_code,
+            'final_url': response.url,
+            'redirects': [(r.status_code, r.headers.get('Location', '')) for r in response.history],
+            'bytes': int(length) if length and length.isdigit() else None,
+            'content_type': response.headers.get('Content-Type', '').split(';')[0].strip(),
+            'method': method,
+            'error': None
+        }
+
+    def _get(self, url, count_bytes):
+        with self._session().get(url, timeout=self.timeout, allow_redirects=True, stream=True) as response:
+            result = self._result(url, response, 'GET')
+            if count_bytes and result['bytes'] is None and response.ok:
+                total = 0
+                for chunk in response.iter_content(64 * 1024):
+                    total += len(chunk)
+                    if total > MAX_COUNT_BYTES:
+                        break
+                result['bytes'] = total
+            return result
+
+    def _error_result(self, url, error):
+        return {'url': url, 'status': None, 'final_url': url, 'redirects': [], 'bytes': None,
+                'content_type': '', 'method': 'HEAD', 'error': type(error).__name__}
+
+    def _probe(self, url):
+        result = None
+        try:
+            with self.limiter(url):
+                try:
+                    response = self._session().head(url, timeout=self.timeout, allow_redirects=True)
+                    result = self._result(url, response, 'HEAD')
+                    if result['status'] in HEAD_REJECTED or (self.need_size and result['bytes'] is None and response.ok):
+                        result = self._get(url, self.need_size)
+                except requests.RequestException as e:
+                    try:
+                        result = self._get(url, self.need_size)
+                    except Exception:
+                        result = self._error_result(url, e)
+        except Exception as e:
+            # Ungültige URLs (UnicodeError, LocationParseError, ValueError bei Weiterleitungen)
+            # sind ein Ergebnis dieser URL und brechen den Batch nicht ab
+            result = self._error_result(url, e)
+        finally:
+            with self.lock:
+                if result is not None:
+                    self.results[url] = result
+                self.pending.pop(url, None)
+        return result
+
+    def submit(self, url):
+        """Startet die Abfrage (falls noch nicht gecacht) und liefert ein Future oder das Ergebnis"""
+        with self.lock:
+            if url in self.results:
+                return self.results[url]
+            if url in self.pending:
+                return self.pending[url]
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            future = self.executor.submit(self._probe, url)
+            self.pending[url] = future
+            return future
+
+    def probe_many(self, urls):
+        """{url: Ergebnis} für alle URLs, parallel und ohne doppelte Requests"""
+        handles = {url: self.submit(url) for url in dict.fromkeys(urls)}
+        return {url: handle.result() if isinstance(handle, Future) else handle for url, handle in handles.items()}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
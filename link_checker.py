@@ -0,0 +1,180 @@
+# LINK CHECKER - Defekte und umgeleitete Links vor der Migration finden
+# Alle Links aller analysierten Seiten werden dedupliziert, jedes Ziel wird
+# genau einmal geprüft (HEAD, GET-Fallback, Limit pro Host, Cache)
+
+import os
+import json
+from array import array
+from collections import Counter
+from urllib.parse import urljoin, urldefrag, urlparse
+from http_probe import HeadCache
+
+SKIP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', '#')
+
+# Ziele pro Prüf-Batch (begrenzt offene Futures bei großen Sites)
+CHECK_BATCH = 1000
+
+# ============================================================
+# LINK-REGISTER
+# ============================================================
+
+def normalize_link(page_url, href):
+    href = href.strip()
+    if not href or href.lower().startswith(SKIP_SCHEMES):
+        return None
+    try:
+        url, _ = urldefrag(urljoin(page_url, href))
+    except ValueError:
+        # Ungültiger Link (z. B. 'http://[kaputt/'): unverändert prüfen, damit er als Fehler erscheint
+        url = href
+    if not url.startswith(('http://', 'https://')):
+        return None
+    return url
+
+class LinkRegistry:
+    """Eindeutige Linkziele mit kompakter Liste der verlinkenden Seiten (Seiten-IDs)"""
+
+    def __init__(self):
+        self.pages = []
+        self.targets = {}
+        self.target_urls = []
+        self.sources = []
+        self.occurrences = 0
+
+    def add_page(self, page_url, hrefs):
+        page_id = len(self.pages)
+        self.pages.append(page_url)
+        seen = set()
+        for href in hrefs:
+            url = normalize_link(page_url, href)
+            if url is None:
+                continue
+            self.occurrences += 1
+            if url in seen:
+                continue
+            seen.add(url)
+            index = self.targets.get(url)
+            if index is None:
+                index = len(self.target_urls)
+                self.targets[url] = index
+                self.target_urls.append(url)
+                self.sources.append(array('I'))
+            self.sources[index].append(page_id)
+
+    def source_pages(self, url):
+        index = self.targets.get(url)
+        if index is None:
+            return []
+        return [self.pages[page_id] for page_id in self.sources[index]]
+
+    def page_links(self):
+        """(Seite, [Linkziele]) für jede Seite, z. B. zum Zusammenführen verteilter Läufe"""
+        links = [[] for _ in self.pages]
+        for index, page_ids in enumerate(self.sources):
+            for page_id in page_ids:
+                links[page_id].append(self.target_urls[index])
+        return zip(self.pages, links)
+
+    def __len__(self):
+        return len(self.target_urls)
+
+# ============================================================
+# PRÜFUNG
+# ============================================================
+
+def link_host(url):
+    try:
+        return urlparse(url).netloc
+    except ValueError:
+        return ''
+
+def classify_link(result):
+    if result['error']:
+        return 'fehler'
+    if result['status'] >= 400:
+        return 'defekt'
+    if result['redirects']:
+        return 'weiterleitung'
+    return 'ok'
+
+class LinkChecker:
+    """Prüft alle Ziele eines LinkRegistry parallel mit Limit pro Host"""
+
+    def __init__(self, max_workers=32, per_host=2, timeout=10):
+        self.cache = HeadCache(max_workers=max_workers, per_host=per_host, timeout=timeout)
+
+    def check(self, registry, internal_hosts=(), progress=True):
+        internal_hosts = set(internal_hosts)
+        report = {
+            'pages': len(registry.pages),
+            'occurrences': registry.occurrences,
+            'unique_targets': len(registry),
+            'status': Counter(),
+            'broken': [],
+            'redirects': [],
+            'errors': Counter()
+        }
+        urls = registry.target_urls
+        for start in range(0, len(urls), CHECK_BATCH):
+            batch = urls[start:start + CHECK_BATCH]
+            results = self.cache.probe_many(batch)
+            for url in batch:
+                result = results[url]
+                category = classify_link(result)
+                scope = 'intern' if link_host(url) in internal_hosts else 'extern'
+                report['status'][f"{scope}_{category}"] += 1
+                if category in ('defekt', 'fehler'):
+                    if result['error']:
+                        report['errors'][result['error']] += 1
+                    report['broken'].append({
+                        'url': url,
+                        'scope': scope,
+                        'status': result['status'],
+                        'error': result['error'],
+                        'sources': registry.source_pages(url)
+                    })
+                elif category == 'weiterleitung':
+                    report['redirects'].append({
+                        'url': url,
+                        'scope': scope,
+                        'chain': result['redirects'],
+                        'final_url': result['final_url'],
+                        'sources': registry.source_pages(url)
+                    })
+            if progress:
+                done = min(start + CHECK_BATCH, len(urls))
+                print(f"   🔗 {done}/{len(urls)} Linkziele geprüft")
+        report['broken'].sort(key=lambda item: len(item['sources']), reverse=True)
+        report['redirects'].sort(key=lambda item: len(item['sources']), reverse=True)
+        return report
+
+    def close(self):
+        self.cache.close()
+
+def save_link_report(report, path='ergebnisse/link_check.json'):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+def print_link_report(report, limit=10):
+    print("\n" + "="*70)
+    print("🔗 LINK-PRÜFUNG (intern + extern)")
+    print("="*70)
+    print(f"\n   Seiten: {report['pages']}, Link-Vorkommen: {report['occurrences']}, eindeutige Ziele: {report['unique_targets']}")
+    for key, count in sorted(report['status'].items()):
+        print(f"   {key}: {count}")
+    if report['errors']:
+        print(f"   Fehlerarten: {', '.join(f'{k} ({v})' for k, v in report['errors'].most_common())}")
+    if report['broken']:
+        print(f"\n   ❌ Defekte Ziele (nach Anzahl verlinkender Seiten):")
+        for item in report['broken'][:limit]:
+            status = item['status'] or item['error']
+            print(f"      [{status}] {item['url'][:70]} ← {len(item['sources'])} Seite(n)")
+            for source in item['sources'][:2]:
+                print(f"         z. B. {source[:70]}")
+    if report['redirects']:
+        print(f"\n   ↪️  Weiterleitungen: {len(report['redirects'])} Ziele")
+        for item in report['redirects'][:limit]:
+            chain = ' → '.join(str(status) for status, location in item['chain'])
+            print(f"      {item['url'][:50]} ({chain}) → {item['final_url'][:50]} ← {len(item['sources'])} Seite(n)")
@@ -0,0 +1,272 @@
+# OVERLAP ENGINE - Thematische Überschneidungen als dünnbesetzte TF-IDF-Vektoren
+# Jeder Artikel wird zu einem Termvektor (sublineare TF × IDF, L2-normiert),
+# jede Site zum Mittelwert ihrer Artikelvektoren. Site×Site-Kosinus per
+# Matrixprodukt, Artikel×Artikel blockweise (nur Paare über Site-Grenzen hinweg
+# oberhalb einer Schwelle), dazu die gemeinsamen Terme mit dem größten Beitrag.
+
+import os
+import re
+import json
+import heapq
+from array import array
+import numpy as np
+from scipy import sparse
+
+DEFAULT_REPORT_PATH = 'ergebnisse/ueberschneidungen.json'
+
+# Terme in weniger Artikeln tragen nichts zur Ähnlichkeit bei, Terme in mehr
+# als diesem Anteil der Artikel sind Navigation/Boilerplate
+MIN_DF = 2
+MAX_DF_SHARE = 0.5
+
+# Artikel×Artikel: Zellen pro Block (Zeilen × Artikel, ~16 MB float32 falls dicht),
+# Mindest-Kosinus, gemeldete Paare
+MAX_BLOCK_CELLS = 4_000_000
+MIN_ARTICLE_SIMILARITY = 0.5
+TOP_ARTICLE_PAIRS = 20
+
+# Gemeinsame Terme pro Paar
+TOP_SHARED_TERMS = 8
+
+# Schattierung der Heatmap in der Konsole (0 … 1)
+HEAT_LEVELS = ' ░▒▓█'
+
+WORD_RE = re.compile(r'\b\w+\b')
+
+# ============================================================
+# KORPUS
+# ============================================================
+
+class OverlapCorpus:
+    """Sammelt Termhäufigkeiten pro Artikel direkt im CSR-Format (Vokabular als dict)"""
+
+    def __init__(self, stopwords=(), min_length=4):
+        self.stopwords = set(stopwords)
+        self.min_length = min_length
+        self.vocabulary = {}
+        self.sites = []
+        self.site_index = {}
+        self.urls = []
+        self.doc_sites = array('H')
+        self.indptr = array('Q', [0])
+        self.indices = array('I')
+        self.counts = array('f')
+
+    def __len__(self):
+        return len(self.urls)
+
+    def terms(self, text, keywords=()):
+        words = [w for w in WORD_RE.findall(text.lower())
+                 if len(w) >= self.min_length and w not in self.stopwords and not w.isdigit()]
+        # Mehrwort-Keywords (Bigramme) als eigene Terme
+        return words + [k.lower() for k in keywords if ' ' in k]
+
+    def add_document(self, site, url, text, keywords=()):
+        counts = {}
+        for term in self.terms(text, keywords):
+            term_id = self.vocabulary.setdefault(term, len(self.vocabulary))
+            counts[term_id] = counts.get(term_id, 0) + 1
+        self.add_counts(site, url, counts)
+
+    def add_counts(self, site, url, counts):
+        """counts: {Term-ID: Häufigkeit} oder {Term: Häufigkeit}"""
+        if site not in self.site_index:
+            self.site_index[site] = len(self.sites)
+            self.sites.append(site)
+        for key, count in counts.items():
+            term_id = key if isinstance(key, int) else self.vocabulary.setdefault(key, len(self.vocabulary))
+            self.indices.append(term_id)
+            self.counts.append(count)
+        self.urls.append(url)
+        self.doc_sites.append(self.site_index[site])
+        self.indptr.append(len(self.indices))
+
+    def term_list(self):
+        """Terme nach Term-ID"""
+        terms = [None] * len(self.vocabulary)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+        return terms
+
+    def documents(self):
+        """(Site, URL, {Term: Anzahl}) pro Artikel, z. B. zum Speichern in der Warteschlange"""
+        terms = self.term_list()
+        for i, url in enumerate(self.urls):
+            start, end = self.indptr[i], self.indptr[i + 1]
+            counts = {terms[self.indices[k]]: int(self.counts[k]) for k in range(start, end)}
+            yield self.sites[self.doc_sites[i]], url, counts
+
+    def count_matrix(self):
+        return sparse.csr_matrix(
+            (np.frombuffer(self.counts, dtype=np.float32),
+             np.frombuffer(self.indices, dtype=np.uint32),
+             np.frombuffer(self.indptr, dtype=np.uint64)),
+            shape=(len(self.urls), len(self.vocabulary))
+        )
+
+    @classmethod
+    def from_site_terms(cls, site_terms):
+        """Ein Pseudo-Artikel pro Site aus {Site: [(Term, Anzahl)]}, z. B. top_themes des Reducers"""
+        corpus = cls()
+        for site, terms in site_terms.items():
+            corpus.add_counts(site, site, dict(terms))
+        return corpus
+
+# ============================================================
+# VEKTOREN
+# ============================================================
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+def tfidf(counts, min_df=MIN_DF, max_df_share=MAX_DF_SHARE):
+    """(L2-normierte TF-IDF-Matrix, behaltene Term-IDs)"""
+    counts = counts.tocsr()
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    keep = (df >= min(min_df, n_docs)) & (df <= max(1, max_df_share * n_docs))
+    term_ids = np.flatnonzero(keep)
+    matrix = counts[:, term_ids].tocsr()
+    matrix.data = 1.0 + np.log(matrix.data)
+    idf = np.log((1 + n_docs) / (1 + df[term_ids])).astype(np.float32) + 1.0
+    return normalize_rows(matrix @ sparse.diags(idf)).tocsr().astype(np.float32), term_ids
+
+def site_vectors(articles, doc_sites, n_sites):
+    """Mittelwert der Artikelvektoren pro Site (jeder Artikel zählt gleich), L2-normiert"""
+    membership = sparse.csr_matrix(
+        (np.ones(len(doc_sites), dtype=np.float32), (doc_sites, np.arange(len(doc_sites)))),
+        shape=(n_sites, len(doc_sites))
+    )
+    return normalize_rows(membership @ articles).tocsr()
+
+def shared_terms(a, b, terms, limit=TOP_SHARED_TERMS):
+    """Terme mit dem größten Beitrag zum Kosinus zweier Zeilenvektoren"""
+    product = a.multiply(b).tocoo()
+    if product.nnz == 0:
+        return []
+    top = np.argsort(product.data)[::-1][:limit]
+    return [(terms[product.col[i]], round(float(product.data[i]), 4)) for i in top]
+
+# ============================================================
+# ARTIKEL×ARTIKEL (BLOCKWEISE)
+# ============================================================
+
+def block_rows(n_articles, max_cells=MAX_BLOCK_CELLS):
+    """Zeilen pro Block, sodass ein Block höchstens max_cells Zellen umfasst"""
+    return max(1, max_cells // max(1, n_articles))
+
+def article_pairs(articles, doc_sites, n_sites, min_similarity=MIN_ARTICLE_SIMILARITY,
+                  block_size=None, limit=TOP_ARTICLE_PAIRS):
+    """Ähnliche Artikelpaare verschiedener Sites; nie mehr als block_size Zeilen gleichzeitig
+
+    Ohne block_size richtet sich die Blockhöhe nach der Artikelanzahl (block_rows).
+
+    Liefert ([(Kosinus, i, j)] absteigend, Paaranzahl pro Site-Paar als Matrix).
+    """
+    doc_sites = np.asarray(doc_sites, dtype=np.int64)
+    block_size = block_size or block_rows(articles.shape[0])
+    transposed = articles.T.tocsr()
+    pair_counts = np.zeros((n_sites, n_sites), dtype=np.int64)
+    best = []
+    for start in range(0, articles.shape[0], block_size):
+        # Nur das obere Dreieck: Spalten ab dem ersten Artikel des Blocks
+        block = (articles[start:start + block_size] @ transposed[:, start:]).tocsr()
+        rows = np.repeat(np.arange(start, start + block.shape[0]), np.diff(block.indptr))
+        cols = block.indices + start
+        # Jedes Paar nur einmal (j > i), nur über Site-Grenzen, nur oberhalb der Schwelle
+        mask = (cols > rows) & (doc_sites[cols] != doc_sites[rows]) & (block.data >= min_similarity)
+        rows, cols, values = rows[mask], cols[mask], block.data[mask]
+        np.add.at(pair_counts, (doc_sites[rows], doc_sites[cols]), 1)
+        for k in np.argsort(values)[::-1][:limit]:
+            item = (float(values[k]), int(rows[k]), int(cols[k]))
+            if len(best) < limit:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+            else:
+                break
+    pair_counts = pair_counts + pair_counts.T
+    return sorted(best, reverse=True), pair_counts
+
+# ============================================================
+# BERICHT
+# ============================================================
+
+def compute_overlap(corpus, min_similarity=MIN_ARTICLE_SIMILARITY, block_size=None,
+                    max_df_share=MAX_DF_SHARE):
+    """Site×Site-Matrix, gemeinsame Terme pro Site-Paar und ähnlichste Artikelpaare"""
+    vocabulary = corpus.term_list()
+    articles, term_ids = tfidf(corpus.count_matrix(), max_df_share=max_df_share)
+    terms = [vocabulary[t] for t in term_ids]
+    n_sites = len(corpus.sites)
+    doc_sites = np.frombuffer(corpus.doc_sites, dtype=np.uint16)
+    sites = site_vectors(articles, doc_sites, n_sites)
+    matrix = (sites @ sites.T).toarray()
+    report = {
+        'sites': list(corpus.sites),
+        'articles': len(corpus),
+        'terms': len(terms),
+        'matrix': np.round(matrix, 4).tolist(),
+        'pairs': []
+    }
+    pair_counts = None
+    if len(corpus) > n_sites:
+        best, pair_counts = article_pairs(articles, doc_sites, n_sites, min_similarity, block_size)
+        report['min_article_similarity'] = min_similarity
+        report['article_pairs'] = [
+            {
+                'similarity': round(value, 4),
+                'a': corpus.urls[i],
+                'b': corpus.urls[j],
+                'shared_terms': [term for term, _ in shared_terms(articles[i], articles[j], terms)]
+            }
+            for value, i, j in best
+        ]
+    for i in range(n_sites):
+        for j in range(i + 1, n_sites):
+            pair = {
+                'a': corpus.sites[i],
+                'b': corpus.sites[j],
+                'similarity': round(float(matrix[i, j]), 4),
+                'shared_terms': shared_terms(sites[i], sites[j], terms)
+            }
+            if pair_counts is not None:
+                pair['similar_articles'] = int(pair_counts[i, j])
+            report['pairs'].append(pair)
+    report['pairs'].sort(key=lambda pair: pair['similarity'], reverse=True)
+    return report
+
+def print_overlap_report(report, limit=10):
+    sites = report['sites']
+    print(f"\n📊 Kosinus-Ähnlichkeit (TF-IDF) zwischen Sitemaps – {report['articles']} Artikel, {report['terms']} Terme:\n")
+    # Spalten nummeriert, damit die Matrix auch bei vielen Sites in die Zeile passt
+    print("   " + " " * 34 + "".join(f"{f'[{i + 1}]':>7}" for i in range(len(sites))))
+    for i, (name, row) in enumerate(zip(sites, report['matrix'])):
+        cells = []
+        for value in row:
+            shade = HEAT_LEVELS[min(len(HEAT_LEVELS) - 1, int(value * (len(HEAT_LEVELS) - 1) + 0.5))]
+            cells.append(f"{shade} {value:.2f}")
+        label = f"[{i + 1}] {name}"
+        print(f"   {label[:33]:<33} " + "".join(f"{cell:>7}" for cell in cells))
+    for pair in report['pairs'][:limit]:
+        print(f"\n   {pair['a']} ↔ {pair['b']}: {pair['similarity']:.2f}")
+        if 'similar_articles' in pair:
+            print(f"   Ähnliche Artikel (≥ {report['min_article_similarity']:.2f}): {pair['similar_articles']}")
+        if pair['shared_terms']:
+            print(f"   Gemeinsame Terme: {', '.join(term for term, _ in pair['shared_terms'])}")
+        else:
+            print(f"   Keine signifikanten Überschneidungen")
+    if report.get('article_pairs'):
+        print(f"\n📑 Ähnlichste Artikel über Sitemap-Grenzen hinweg:")
+        for pair in report['article_pairs'][:limit]:
+            print(f"   {pair['similarity']:.2f}  {pair['a']}")
+            print(f"         {pair['b']}")
+            print(f"         ({', '.join(pair['shared_terms'][:5])})")
+
+def save_overlap_report(report, path=DEFAULT_REPORT_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,200 @@
+# READABILITY - Austauschbare Backends für die HIX-Textparameter
+# 'schnell': regelbasierte deutsche Satzsegmentierung (abkürzungsfest) ohne Sprachmodell
+# 'genau':   spaCy (de_core_news_sm), wie bisher
+# Beide liefern Satzanzahl + alphabetische Wörter; Silben kommen aus dem Pyphen-Cache
+
+import re
+import math
+from functools import lru_cache
+
+# ============================================================
+# SATZSEGMENTIERUNG (regelbasiert)
+# ============================================================
+
+# Abkürzungen, nach deren Punkt kein Satz endet (klein geschrieben, ohne Punkt);
+# einzelne Buchstaben ("z. B.", "A. Merkel", "Vitamin A.") behandelt is_sentence_boundary
+ABBREVIATIONS = {
+    'dr', 'prof', 'dipl', 'ing', 'hr', 'fr', 'bzw', 'ca', 'usw', 'etc', 'vgl', 'ggf',
+    'inkl', 'exkl', 'bspw', 'evtl', 'insg', 'nr', 'mio', 'mrd', 'jh', 'jhd', 'st', 'str',
+    'abs', 'art', 'abb', 'tab', 'kap', 'bd', 'hrsg', 'max', 'min', 'mind', 'sog',
+    'ebd', 'zzgl', 'insb', 'tel', 'gem', 'allg', 'jan', 'feb', 'apr', 'aug', 'sept',
+    'okt', 'nov', 'dez', 'mr', 'mrs', 'co', 'vs', 'ev', 'gmbh', 'bzgl', 'lt', 'u.a',
+    'z.b', 'd.h', 'u.u', 'o.ä', 'i.d.r', 's.o', 's.u'
+}
+
+# Bezeichnungen, hinter denen ein Großbuchstabe keine Initiale ist ("Vitamin A.", "Typ B.")
+DESIGNATIONS = {
+    'vitamin', 'typ', 'teil', 'anlage', 'anhang', 'gruppe', 'plan', 'klasse', 'stufe',
+    'kategorie', 'variante', 'option', 'abschnitt', 'punkt', 'spalte', 'reihe', 'block',
+    'haus', 'gebäude', 'halle', 'tor', 'gleis', 'modell', 'version', 'szenario', 'fall',
+    'phase', 'ebene', 'zone', 'note', 'buchstabe', 'besoldungsgruppe', 'hepatitis'
+}
+
+MONTHS = {
+    'januar', 'februar', 'märz', 'april', 'mai', 'juni', 'juli', 'august',
+    'september', 'oktober', 'november', 'dezember'
+}
+
+# Kandidat für ein Satzende: Satzzeichen, optional schließende Anführung/Klammer, Leerraum
+BOUNDARY_RE = re.compile(r'[.!?]+["\'»«“”)\]]*\s+')
+WORD_RE = re.compile(r'[^\W\d_]+')
+SINGLE_LETTER_RE = re.compile(r'[^\W\d_]\.')
+OPENING_CHARS = '"„»“\'('
+LEADING_PUNCT = '("\'„»'
+
+def is_sentence_boundary(text, match):
+    """Prüft, ob an einem Satzzeichen-Kandidaten tatsächlich ein Satz endet"""
+    end = match.end()
+    if end >= len(text):
+        return True
+    first = text[end]
+    # Neuer Satz beginnt im Deutschen groß, mit Ziffer oder Anführungszeichen
+    if not (first.isupper() or first.isdigit() or first in OPENING_CHARS):
+        return False
+    start = match.start()
+    if text[start] != '.':
+        return True
+    token = text[text.rfind(' ', 0, start) + 1:start].lstrip(LEADING_PUNCT)
+    if not token:
+        return True
+    if token.lower() in ABBREVIATIONS:
+        return False
+    # Einzelner Buchstabe vor Großschreibung: Teil einer mehrteiligen Abkürzung
+    # ("z. B. Berlin") oder Initiale vor einem Namen ("A. Merkel sagte") ist kein
+    # Satzende; nur hinter Bezeichnungen ("Vitamin A. Danach") endet der Satz
+    if len(token) == 1 and token.isalpha():
+        if SINGLE_LETTER_RE.match(text, end):
+            return False
+        previous = text[:start - 1].rstrip()
+        if (len(previous) >= 2 and previous[-1] == '.' and previous[-2].isalpha()
+                and (len(previous) == 2 or not previous[-3].isalnum())):
+            return False
+        if token.isupper():
+            words = previous.split()
+            return bool(words) and words[-1].strip(LEADING_PUNCT).lower() in DESIGNATIONS
+        return True
+    # Ordinalzahlen vor Monaten ("3. Oktober") und Abkürzungen ("20. Jh.")
+    if token.isdigit():
+        next_word = WORD_RE.match(text, end)
+        if next_word:
+            word = next_word.group().lower()
+            if word in MONTHS:
+                return False
+            if word in ABBREVIATIONS and text.startswith('.', next_word.end()):
+                return False
+    return True
+
+def split_sentences(text):
+    sentences = []
+    start = 0
+    for match in BOUNDARY_RE.finditer(text):
+        if is_sentence_boundary(text, match):
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+    rest = text[start:].strip()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+def count_sentences(text):
+    """Wie len(split_sentences(text)), ohne Teilstrings zu erzeugen"""
+    text = text.strip()
+    if not text:
+        return 0
+    count = 0
+    last_end = 0
+    for match in BOUNDARY_RE.finditer(text):
+        if is_sentence_boundary(text, match):
+            count += 1
+            last_end = match.end()
+    return count + (1 if last_end < len(text) else 0)
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class FastBackend:
+    """Regelbasiert, ohne Sprachmodell"""
+    name = 'schnell'
+
+    def tokenize(self, text):
+        return count_sentences(text), WORD_RE.findall(text)
+
+class SpacyBackend:
+    """spaCy-Satzgrenzen und Tokenisierung (genauer, deutlich langsamer)"""
+    name = 'genau'
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+
+    def tokenize(self, text):
+        doc = self.nlp(text)
+        return len(list(doc.sents)), [token.text for token in doc if token.is_alpha]
+
+# ============================================================
+# TEXTPARAMETER
+# ============================================================
+
+def make_syllable_counter(pyphen_dict, cache_size=200000):
+    """Silbenzählung mit Cache (Wörter wiederholen sich über alle Artikel)"""
+    @lru_cache(maxsize=cache_size)
+    def count_syllables(word):
+        return len(pyphen_dict.inserted(word).split('-'))
+    return count_syllables
+
+def text_parameters(num_sentences, words, count_syllables):
+    """ASL, ASW, IW, MS, ES und Mehrsilber pro 30 Sätze für die HIX-Formeln"""
+    if num_sentences == 0:
+        return None
+    num_words = len(words)
+    if num_words == 0:
+        return None
+    total_syllables = 0
+    long_words = polysyllabic = monosyllabic = 0
+    for word in words:
+        syllables = count_syllables(word)
+        total_syllables += syllables
+        if len(word) > 6:
+            long_words += 1
+        if syllables >= 3:
+            polysyllabic += 1
+        elif syllables == 1:
+            monosyllabic += 1
+    return {
+        'asl': num_words / num_sentences,
+        'asw': total_syllables / num_words,
+        'iw': long_words / num_words * 100,
+        'ms': polysyllabic / num_words * 100,
+        'es': monosyllabic / num_words * 100,
+        'polysyllables_per_30': polysyllabic / num_sentences * 30
+    }
+
+# ============================================================
+# KALIBRIERUNG
+# ============================================================
+
+def calibration_stats(pairs):
+    """Vergleicht (schnell, genau)-Wertepaare: Abweichung und Korrelation"""
+    if not pairs:
+        return None
+    n = len(pairs)
+    diffs = [fast - accurate for fast, accurate in pairs]
+    mean_fast = sum(fast for fast, _ in pairs) / n
+    mean_accurate = sum(accurate for _, accurate in pairs) / n
+    cov = sum((fast - mean_fast) * (accurate - mean_accurate) for fast, accurate in pairs)
+    var_fast = sum((fast - mean_fast) ** 2 for fast, _ in pairs)
+    var_accurate = sum((accurate - mean_accurate) ** 2 for _, accurate in pairs)
+    correlation = cov / math.sqrt(var_fast * var_accurate) if var_fast and var_accurate else None
+    abs_diffs = sorted(abs(d) for d in diffs)
+    return {
+        'n': n,
+        'mean_fast': mean_fast,
+        'mean_accurate': mean_accurate,
+        'mean_diff': sum(diffs) / n,
+        'mean_abs_diff': sum(abs_diffs) / n,
+        'p90_abs_diff': abs_diffs[min(n - 1, int(n * 0.9))],
+        'max_abs_diff': abs_diffs[-1],
+        'correlation': correlation
+    }
@@ -0,0 +1,222 @@
+# RENDER DETECTION - Clientseitig gerenderte Seiten ohne Browser erkennen
+# Läuft nur für Seiten, deren Hauptinhalt zu kurz ist (kein Aufwand im Normalfall)
+# Signale: Framework-Marker, leere Mount-Container, große Inline-JSON-States
+# Nur Marker oder leere Mount-Container entscheiden; State und <noscript> stützen nur
+# Text wird wenn möglich aus dem eingebetteten State gewonnen, der Rest zurückgestellt
+
+import os
+import re
+import json
+import html as html_lib
+from collections import Counter
+from datetime import datetime
+from bs4 import BeautifulSoup
+
+# ============================================================
+# KONFIGURATION
+# ============================================================
+
+# Framework-Marker im rohen HTML (günstige Regex-Suche ohne Parsen)
+FRAMEWORK_MARKERS = {
+    'next.js': re.compile(r'id=["\']__NEXT_DATA__["\']|id=["\']__next["\']|/_next/static/'),
+    'nuxt': re.compile(r'window\.__NUXT__|id=["\']__nuxt["\']|/_nuxt/'),
+    'gatsby': re.compile(r'id=["\']___gatsby["\']'),
+    'react': re.compile(r'data-reactroot|react-dom(?:\.production)?(?:\.min)?\.js'),
+    'vue': re.compile(r'data-v-app|data-server-rendered|vue(?:\.runtime)?(?:\.global)?(?:\.prod)?(?:\.min)?\.js'),
+    'angular': re.compile(r'ng-version=|<app-root'),
+    'svelte': re.compile(r'__sveltekit|data-svelte')
+}
+
+# IDs typischer Mount-Container von Single-Page-Apps
+MOUNT_IDS = ['root', 'app', '__next', '__nuxt', '___gatsby', 'svelte']
+
+# Zuweisungen eines globalen States in Inline-Skripten (window.__INITIAL_STATE__ = {...})
+STATE_ASSIGNMENT_RE = re.compile(r'window\.(__[A-Za-z0-9_]+__|[A-Za-z_]*(?:State|STATE|Data|DATA))\s*=\s*')
+
+# Ab dieser Größe gilt ein Inline-State als schwaches Signal (nur zusammen mit Marker oder Mount)
+MIN_STATE_BYTES = 2048
+
+# Strings im State gelten als Fließtext ab dieser Länge und Wortzahl
+MIN_STATE_STRING = 40
+MIN_STATE_WORDS = 6
+
+# Schlüssel, deren Werte nie Inhalt sind
+STATE_SKIP_KEYS = {
+    'id', 'uid', 'uuid', 'slug', 'url', 'href', 'src', 'srcset', 'path', 'link', 'image',
+    'classname', 'class', 'style', 'type', '__typename', 'locale', 'hash', 'key', 'buildid',
+    'template', 'component', 'layout', 'mimetype'
+}
+
+# Schutz vor sehr tief verschachtelten oder riesigen States
+MAX_STATE_DEPTH = 40
+MAX_STATE_NODES = 200000
+
+DEFAULT_QUEUE_PATH = 'ergebnisse/js_warteschlange.jsonl'
+
+TAG_RE = re.compile(r'<[^>]+>')
+URL_LIKE_RE = re.compile(r'^(?:https?:)?//|^/[\w\-./]*$')
+
+# ============================================================
+# JSON-STATE
+# ============================================================
+
+def iter_state_payloads(soup):
+    """Liefert (Name, Skript-Text) aller eingebetteten States einer Seite"""
+    for script in soup.find_all('script'):
+        text = script.string
+        if not text:
+            continue
+        text = str(text)
+        script_type = script.get('type', '').lower()
+        if script_type == 'application/ld+json':
+            continue
+        if script_type == 'application/json' or script.get('id') == '__NEXT_DATA__':
+            yield script.get('id') or 'application/json', text
+            continue
+        match = STATE_ASSIGNMENT_RE.search(text)
+        if match:
+            yield match.group(1), text[match.end():]
+
+def parse_state(text):
+    """JSON am Anfang des Textes (Rest wie ';' oder weitere Anweisungen wird ignoriert)"""
+    text = text.lstrip()
+    if not text or text[0] not in '{[':
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text)
+    except ValueError:
+        return None
+    return value
+
+def clean_state_string(value):
+    if '<' in value and '>' in value:
+        value = TAG_RE.sub(' ', value)
+    return re.sub(r'\s+', ' ', html_lib.unescape(value)).strip()
+
+def state_text(payloads):
+    """Fließtext aus eingebetteten States (dedupliziert, in Dokumentreihenfolge)"""
+    seen = set()
+    parts = []
+    budget = [MAX_STATE_NODES]
+
+    def walk(value, key, depth):
+        budget[0] -= 1
+        if budget[0] < 0 or depth > MAX_STATE_DEPTH:
+            return
+        if isinstance(value, dict):
+            for child_key, child in value.items():
+                walk(child, child_key.lower() if isinstance(child_key, str) else None, depth + 1)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child, key, depth + 1)
+        elif isinstance(value, str) and key not in STATE_SKIP_KEYS:
+            if len(value) < MIN_STATE_STRING or URL_LIKE_RE.match(value):
+                return
+            text = clean_state_string(value)
+            if len(text) >= MIN_STATE_STRING and text.count(' ') + 1 >= MIN_STATE_WORDS and text not in seen:
+                seen.add(text)
+                parts.append(text)
+
+    for name, raw in payloads:
+        state = parse_state(raw)
+        if state is not None:
+            walk(state, None, 0)
+    return ' '.join(parts)
+
+# ============================================================
+# ERKENNUNG
+# ============================================================
+
+class RenderDetector:
+    """Klassifiziert Seiten mit zu wenig Hauptinhalt als clientseitig gerendert oder leer"""
+
+    def __init__(self, min_text=100, min_state_bytes=MIN_STATE_BYTES):
+        self.min_text = min_text
+        self.min_state_bytes = min_state_bytes
+        self.stats = Counter()
+
+    def inspect(self, html_content):
+        """Signale einer Seite; parst das HTML neu, da die Extraktion Skripte entfernt hat"""
+        if isinstance(html_content, bytes):
+            html_content = html_content.decode('utf-8', errors='replace')
+        markers = [name for name, pattern in FRAMEWORK_MARKERS.items() if pattern.search(html_content)]
+        soup = BeautifulSoup(html_content, 'html.parser')
+        payloads = list(iter_state_payloads(soup))
+        empty_mounts = []
+        for mount_id in MOUNT_IDS:
+            element = soup.find(id=mount_id)
+            if element is not None and len(element.get_text(strip=True)) < self.min_text:
+                empty_mounts.append(mount_id)
+        noscript_hint = any('javascript' in tag.get_text().lower() for tag in soup.find_all('noscript'))
+        state_bytes = sum(len(raw) for name, raw in payloads)
+        # Große JSON-Skripte (Konfiguration, Tracking) und <noscript>-Hinweise gibt es auch
+        # auf serverseitig gerenderten Seiten – sie zählen nur zusammen mit Marker oder Mount
+        client_rendered = bool(markers or empty_mounts)
+        weak_only = not client_rendered and (state_bytes >= self.min_state_bytes or noscript_hint)
+        return {
+            'client_rendered': client_rendered,
+            'weak_only': weak_only,
+            'markers': markers,
+            'empty_mounts': empty_mounts,
+            'state_bytes': state_bytes,
+            'states': [name for name, raw in payloads],
+            'noscript_hint': noscript_hint,
+            'text': state_text(payloads) if client_rendered and payloads else ''
+        }
+
+    def check(self, html_content, text):
+        """None, wenn der Text reicht; sonst Signale inkl. 'recovered' (Text aus State nutzbar)"""
+        if len(text) >= self.min_text:
+            return None
+        result = self.inspect(html_content)
+        result['recovered'] = len(result['text']) >= self.min_text
+        if result['recovered']:
+            self.stats['aus_json_state'] += 1
+        elif result['client_rendered']:
+            self.stats['zurueckgestellt'] += 1
+        else:
+            self.stats['zu_wenig_text'] += 1
+            if result['weak_only']:
+                self.stats['nur_schwache_signale'] += 1
+        for marker in result['markers']:
+            self.stats[f"marker_{marker}"] += 1
+        return result
+
+# ============================================================
+# WARTESCHLANGE FÜR SPÄTERES RENDERING
+# ============================================================
+
+class DeferredQueue:
+    """JSONL-Warteschlange clientseitig gerenderter Seiten (z. B. für einen Headless-Lauf)"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        self.path = path
+        self.file = None
+        self.count = 0
+        self.by_site = Counter()
+
+    def add(self, url, sitemap_name, check):
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Jeder Lauf beginnt mit einer neuen Warteschlange
+            self.file = open(self.path, 'w', encoding='utf-8')
+        entry = {
+            'url': url,
+            'sitemap': sitemap_name,
+            'markers': check['markers'],
+            'empty_mounts': check['empty_mounts'],
+            'state_bytes': check['state_bytes'],
+            'noscript_hint': check['noscript_hint'],
+            'queued_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.count += 1
+        self.by_site[sitemap_name] += 1
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,126 @@
+# RESOURCE INVENTORY - Seitengewicht aus referenzierten Ressourcen
+# Skripte, Stylesheets, Bilder und Fonts pro Seite sammeln, Größen per HEAD
+# über einen seitenübergreifenden Cache ermitteln (Assets wiederholen sich siteweit)
+
+import re
+from urllib.parse import urljoin
+from http_probe import HeadCache
+
+FONT_URL_RE = re.compile(r'url\(\s*[\'"]?([^\'")]+\.(?:woff2?|ttf|otf|eot)(?:\?[^\'")]*)?)', re.I)
+FONT_EXT_RE = re.compile(r'\.(?:woff2?|ttf|otf|eot)(?:\?|$)', re.I)
+
+# Ab diesem Seitengewicht wird eine Empfehlung ausgegeben
+HEAVY_PAGE_BYTES = 3 * 1024 * 1024
+
+# ============================================================
+# RESSOURCEN SAMMELN
+# ============================================================
+
+def _in_head(element):
+    return element.find_parent('head') is not None
+
+def _is_render_blocking_script(element):
+    if not element.get('src'):
+        return False
+    if element.has_attr('async') or element.has_attr('defer'):
+        return False
+    if element.get('type', '').lower() == 'module':
+        return False
+    return _in_head(element)
+
+def _is_render_blocking_stylesheet(element):
+    media = element.get('media', 'all').lower()
+    return not element.has_attr('disabled') and media in ('', 'all', 'screen')
+
+def collect_resources(soup, base_url):
+    """Alle referenzierten Ressourcen einer Seite (muss vor dem Entfernen von <script>/<style> laufen)"""
+    resources = {}
+
+    def add(src, kind, blocking=False):
+        if not src or src.startswith(('data:', 'javascript:', '#')):
+            return
+        url = urljoin(base_url, src.strip())
+        if url in resources:
+            resources[url]['render_blocking'] |= blocking
+        else:
+            resources[url] = {'url': url, 'kind': kind, 'render_blocking': blocking}
+
+    for element in soup.find_all(['script', 'link', 'img', 'source', 'style']):
+        name = element.name
+        if name == 'script':
+            add(element.get('src'), 'script', _is_render_blocking_script(element))
+        elif name == 'link':
+            rel = [r.lower() for r in element.get('rel', [])]
+            href = element.get('href')
+            if 'stylesheet' in rel:
+                add(href, 'stylesheet', _is_render_blocking_stylesheet(element))
+            elif 'preload' in rel or 'prefetch' in rel:
+                kind = {'font': 'font', 'script': 'script', 'style': 'stylesheet', 'image': 'image'}.get(element.get('as', ''))
+                if kind:
+                    add(href, kind)
+            elif href and FONT_EXT_RE.search(href):
+                add(href, 'font')
+        elif name == 'img':
+            add(element.get('src') or element.get('data-src'), 'image')
+        elif name == 'source' and element.find_parent('picture') is None:
+            # <picture>-Quellen sind Alternativen zum <img>, nicht zusätzliche Requests
+            add(element.get('src'), 'image')
+        elif name == 'style':
+            for font_url in FONT_URL_RE.findall(element.get_text()):
+                add(font_url, 'font')
+    return list(resources.values())
+
+# ============================================================
+# SEITENGEWICHT
+# ============================================================
+
+class ResourceInventory:
+    """Ressourcen-Inventar mit seitenübergreifendem HEAD-Cache"""
+
+    def __init__(self, max_workers=16, per_host=4, timeout=10):
+        self.cache = HeadCache(max_workers=max_workers, per_host=per_host, timeout=timeout, need_size=True)
+
+    def analyze(self, soup, base_url, html_bytes=0):
+        resources = collect_resources(soup, base_url)
+        probes = self.cache.probe_many([r['url'] for r in resources])
+        return page_weight(resources, probes, html_bytes)
+
+    def close(self):
+        self.cache.close()
+
+def page_weight(resources, probes, html_bytes=0):
+    by_kind = {}
+    total_bytes = html_bytes
+    unknown = 0
+    largest_image = None
+    render_blocking = []
+    for resource in resources:
+        size = probes.get(resource['url'], {}).get('bytes')
+        kind = by_kind.setdefault(resource['kind'], {'count': 0, 'bytes': 0})
+        kind['count'] += 1
+        if size is None:
+            unknown += 1
+        else:
+            kind['bytes'] += size
+            total_bytes += size
+        if resource['render_blocking']:
+            render_blocking.append({'url': resource['url'], 'kind': resource['kind'], 'bytes': size})
+        if resource['kind'] == 'image' and size is not None and (largest_image is None or size > largest_image['bytes']):
+            largest_image = {'url': resource['url'], 'bytes': size}
+    return {
+        'total_bytes': total_bytes,
+        'html_bytes': html_bytes,
+        'requests': len(resources) + 1,
+        'by_kind': by_kind,
+        'render_blocking': render_blocking,
+        'largest_image': largest_image,
+        'unknown_sizes': unknown
+    }
+
+def format_bytes(size):
+    if size is None:
+        return '?'
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
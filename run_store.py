@@ -0,0 +1,242 @@
+# RUN STORE - Zeitreihe der Analyse-Läufe für das Migrations-Monitoring
+# Speichert pro Lauf Site-Aggregate und Metriken pro URL in SQLite
+# Diffs zwischen zwei Läufen laufen als indizierte Joins über (run_id, url)
+#
+# Verwendung auf der Kommandozeile:
+#   python run_store.py list
+#   python run_store.py diff [RUN_A] [RUN_B] [--top 10]
+
+import os
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+
+DEFAULT_STORE_PATH = 'ergebnisse/runs.sqlite'
+
+# Site-Kennzahlen aus dem Ergebnis-dict, die pro Lauf gespeichert werden
+SITE_METRICS = [
+    'total_articles', 'successful_analyses', 'failed_urls', 'deferred_urls', 'avg_word_count',
+    'avg_complexity', 'avg_hix', 'hix_percentiles', 'word_count_percentiles',
+    'complexity_distribution', 'content_types', 'top_themes', 'avg_internal_links'
+]
+
+# Metriken pro URL, die im Diff verglichen werden
+URL_METRICS = ['word_count', 'complexity', 'hix', 'link_count']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS site_metrics (
+    run_id INTEGER NOT NULL,
+    sitemap_name TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    PRIMARY KEY (run_id, sitemap_name)
+);
+CREATE TABLE IF NOT EXISTS url_metrics (
+    run_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    sitemap_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    word_count INTEGER,
+    complexity INTEGER,
+    hix REAL,
+    content_type TEXT,
+    link_count INTEGER,
+    PRIMARY KEY (run_id, url)
+) WITHOUT ROWID;
+"""
+
+class RunStore:
+    """SQLite-Speicher für Lauf-Snapshots"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, batch_size=1000):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.buffer = []
+
+    # --- Schreiben ---
+
+    def start_run(self, label=None):
+        cursor = self.conn.execute(
+            'INSERT INTO runs (started_at, label) VALUES (?, ?)',
+            (datetime.now().isoformat(timespec='seconds'), label)
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def add_record(self, run_id, record):
+        """ArticleRecord eines Artikels (fehlgeschlagene URLs ohne Metriken)"""
+        if record.ok:
+            row = (run_id, record.url, record.sitemap, record.status, record.word_count, record.complexity,
+                   record.hix, record.content_type, record.link_count)
+        else:
+            row = (run_id, record.url, record.sitemap, record.status, None, None, None, None, None)
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_site(self, run_id, results):
+        metrics = {key: results[key] for key in SITE_METRICS if key in results}
+        self.conn.execute(
+            'INSERT OR REPLACE INTO site_metrics (run_id, sitemap_name, metrics) VALUES (?, ?, ?)',
+            (run_id, results['sitemap_name'], json.dumps(metrics, ensure_ascii=False))
+        )
+        self.conn.commit()
+
+    def flush(self):
+        if self.buffer:
+            self.conn.executemany('INSERT OR REPLACE INTO url_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', self.buffer)
+            self.conn.commit()
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- Lesen ---
+
+    def runs(self):
+        return self.conn.execute(
+            'SELECT r.run_id, r.started_at, r.label, COUNT(u.url) FROM runs r '
+            'LEFT JOIN url_metrics u ON u.run_id = r.run_id GROUP BY r.run_id ORDER BY r.run_id'
+        ).fetchall()
+
+    def latest_runs(self, n=2):
+        rows = self.conn.execute('SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?', (n,)).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def site_metrics(self, run_id):
+        rows = self.conn.execute('SELECT sitemap_name, metrics FROM site_metrics WHERE run_id = ?', (run_id,))
+        return {name: json.loads(metrics) for name, metrics in rows}
+
+    # --- Diff ---
+
+    def diff(self, run_a, run_b, top=10):
+        """Vergleicht zwei Läufe: neue/entfernte URLs, Kennzahl-Deltas, größte Veränderungen"""
+        self.flush()
+        query = self.conn.execute
+        added = query(
+            'SELECT b.url, b.sitemap_name FROM url_metrics b '
+            'LEFT JOIN url_metrics a ON a.run_id = ? AND a.url = b.url '
+            'WHERE b.run_id = ? AND a.url IS NULL ORDER BY b.url', (run_a, run_b)
+        ).fetchall()
+        removed = query(
+            'SELECT a.url, a.sitemap_name FROM url_metrics a '
+            'LEFT JOIN url_metrics b ON b.run_id = ? AND b.url = a.url '
+            'WHERE a.run_id = ? AND b.url IS NULL ORDER BY a.url', (run_b, run_a)
+        ).fetchall()
+        status_changes = query(
+            'SELECT a.url, a.status, b.status FROM url_metrics a '
+            'JOIN url_metrics b ON b.run_id = ? AND b.url = a.url '
+            'WHERE a.run_id = ? AND a.status != b.status', (run_b, run_a)
+        ).fetchall()
+        type_changes = query(
+            'SELECT a.url, a.content_type, b.content_type FROM url_metrics a '
+            'JOIN url_metrics b ON b.run_id = ? AND b.url = a.url '
+            "WHERE a.run_id = ? AND a.status = 'ok' AND b.status = 'ok' AND a.content_type != b.content_type",
+            (run_b, run_a)
+        ).fetchall()
+        movers = {}
+        for metric in URL_METRICS:
+            movers[metric] = query(
+                f'SELECT a.url, a.{metric}, b.{metric}, b.{metric} - a.{metric} AS delta FROM url_metrics a '
+                f'JOIN url_metrics b ON b.run_id = ? AND b.url = a.url '
+                f"WHERE a.run_id = ? AND a.status = 'ok' AND b.status = 'ok' AND b.{metric} != a.{metric} "
+                f'ORDER BY ABS(delta) DESC LIMIT ?', (run_b, run_a, top)
+            ).fetchall()
+        changed = query(
+            'SELECT COUNT(*) FROM url_metrics a JOIN url_metrics b ON b.run_id = ? AND b.url = a.url '
+            "WHERE a.run_id = ? AND a.status = 'ok' AND b.status = 'ok' AND "
+            '(a.word_count != b.word_count OR a.hix != b.hix OR a.complexity != b.complexity '
+            'OR a.link_count != b.link_count OR a.content_type != b.content_type)', (run_b, run_a)
+        ).fetchone()[0]
+        return {
+            'run_a': run_a,
+            'run_b': run_b,
+            'added': added,
+            'removed': removed,
+            'changed': changed,
+            'status_changes': status_changes,
+            'type_changes': type_changes,
+            'movers': movers,
+            'sites': diff_site_metrics(self.site_metrics(run_a), self.site_metrics(run_b))
+        }
+
+def diff_site_metrics(sites_a, sites_b):
+    result = {}
+    for name in sorted(set(sites_a) | set(sites_b)):
+        a, b = sites_a.get(name, {}), sites_b.get(name, {})
+        metrics = {
+            key: (a.get(key, 0), b.get(key, 0))
+            for key in ('total_articles', 'successful_analyses', 'avg_word_count', 'avg_hix', 'avg_complexity', 'avg_internal_links')
+            if key in a or key in b
+        }
+        types_a, types_b = a.get('content_types', {}), b.get('content_types', {})
+        content_types = {t: (types_a.get(t, 0), types_b.get(t, 0)) for t in sorted(set(types_a) | set(types_b))}
+        result[name] = {'metrics': metrics, 'content_types': content_types}
+    return result
+
+# ============================================================
+# AUSGABE
+# ============================================================
+
+def print_run_diff(diff, limit=10):
+    print("\n" + "="*70)
+    print(f"🔄 VERÄNDERUNG: Lauf {diff['run_a']} → Lauf {diff['run_b']}")
+    print("="*70)
+    for name, deltas in diff['sites'].items():
+        print(f"\n   📁 {name}")
+        for key, (old, new) in deltas['metrics'].items():
+            if old != new:
+                print(f"      {key}: {old:.1f} → {new:.1f} ({new - old:+.1f})")
+        for content_type, (old, new) in deltas['content_types'].items():
+            if old != new:
+                print(f"      Content-Typ {content_type}: {old} → {new} ({new - old:+d})")
+    print(f"\n   ➕ Neue URLs: {len(diff['added'])}")
+    for url, site in diff['added'][:limit]:
+        print(f"      {url[:70]}")
+    print(f"   ➖ Entfernte URLs: {len(diff['removed'])}")
+    for url, site in diff['removed'][:limit]:
+        print(f"      {url[:70]}")
+    print(f"   ✏️  Geänderte URLs: {diff['changed']}")
+    if diff['status_changes']:
+        print(f"   ⚠️  Statuswechsel: {len(diff['status_changes'])}")
+        for url, old, new in diff['status_changes'][:limit]:
+            print(f"      {old} → {new}: {url[:60]}")
+    if diff['type_changes']:
+        print(f"   🏷️  Content-Typ geändert: {len(diff['type_changes'])}")
+    for metric, rows in diff['movers'].items():
+        if rows:
+            print(f"\n   📈 Größte Veränderungen ({metric}):")
+            for url, old, new, delta in rows[:limit]:
+                print(f"      {old:.1f} → {new:.1f} ({delta:+.1f}) {url[:55]}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Lauf-Snapshots auflisten und vergleichen')
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list')
+    diff_parser = sub.add_parser('diff')
+    diff_parser.add_argument('runs', nargs='*', type=int, help='RUN_A RUN_B (Standard: die letzten beiden Läufe)')
+    diff_parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    store = RunStore(args.store)
+    if args.command == 'list':
+        for run_id, started_at, label, urls in store.runs():
+            print(f"{run_id:>4}  {started_at}  {urls:>6} URLs  {label or ''}")
+    else:
+        runs = args.runs or store.latest_runs(2)
+        if len(runs) != 2:
+            parser.error('Zwei Läufe angeben (oder mindestens zwei Läufe speichern)')
+        print_run_diff(store.diff(runs[0], runs[1], top=args.top), limit=args.top)
+    store.close()
+
+if __name__ == '__main__':
+    main()
@@ -8,41 +8,232 @@ print("📦 Installiere Abhängigkeiten...")
 subprocess.run([sys.executable, "-m", "pip", "install", "requests", "beautifulsoup4", "spacy", "textstat", "--quiet"], check=True)
 subprocess.run([sys.executable, "-m", "spacy", "download", "de_core_news_sm", "--quiet"], check=True)
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import spacy
 import textstat
 import re
-import time
+import atexit
 from collections import Counter
 from urllib.parse import urlparse, urljoin
-import json
+from content_extraction import ContentExtractor, DEFAULT_CACHE_PATH
+from structured_data import extract_structured_data, top_level_types
+from resource_inventory import ResourceInventory, HEAVY_PAGE_BYTES, format_bytes
+from article_records import ArticleRecord, ArticleStore
+from render_detection import RenderDetector
+from content_index import IndexBuilder
+from fetch_policy import FetchPolicy
 
 nlp = spacy.load('de_core_news_sm')
+EXTRACTOR = ContentExtractor(cache_path=DEFAULT_CACHE_PATH)
+# Selektor-Cache einmal am Ende speichern statt nach jeder URL
+atexit.register(EXTRACTOR.save)
+# HEAD-Cache für Assets, geteilt über alle analysierten Seiten
+RESOURCES = ResourceInventory()
+# Kompakte Ergebnisse aller analysierten URLs (ARTICLES.save('ergebnisse/seo_artikel.npz'))
+ARTICLES = ArticleStore()
+# Erkennung clientseitig gerenderter Seiten (Text aus eingebettetem JSON-State)
+RENDER = RenderDetector(min_text=100)
+# Suchindex über alle analysierten URLs (INDEX.save('ergebnisse/seo_index.bin'))
+INDEX = IndexBuilder()
+# Abrufe mit adaptivem Timeout, Wiederholungen und Circuit Breaker pro Host
+FETCH = FetchPolicy(headers={'User-Agent': 'Mozilla/5.0'})
 print("✅ Setup abgeschlossen\n")
 
+# ============================================================
+# REGEL-ENGINE (ein DOM-Durchlauf + ein Text-Scan pro Seite)
+# ============================================================
+
+AUTHORITY_DOMAINS = ['wikipedia.org', 'gov', 'edu', 'destatis.de', 'bundesregierung.de']
+SOCIAL_DOMAINS = ['facebook', 'twitter', 'linkedin', 'instagram']
+GERMAN_CITIES = ['berlin', 'hamburg', 'münchen', 'köln', 'frankfurt', 'stuttgart', 'düsseldorf', 'dortmund', 'essen', 'leipzig', 'bremen', 'dresden', 'hannover', 'nürnberg', 'duisburg']
+LOCAL_SCHEMAS = ['LocalBusiness', 'Restaurant', 'Store', 'Organization', 'Place']
+
+ABOUT_RE = re.compile(r'(about|ueber|impressum)', re.I)
+AUTHOR_RE = re.compile('author', re.I)
+DATE_RE = re.compile('date', re.I)
+CONTACT_RE = re.compile(r'(kontakt|email|telefon)', re.I)
+MAPS_RE = re.compile(r'google.com/maps', re.I)
+LOGO_RE = re.compile(r'logo', re.I)
+
+def _has_class(element, pattern):
+    return any(pattern.search(c) for c in element.get('class', []))
+
+# DOM-Regeln: 'tags' (None = alle Tags), 'strings' (Textknoten),
+# optional 'match' (Prädikat), 'value' (Extraktor) und 'keep' (max. Werte, None = alle)
+DOM_RULES = [
+    {'name': 'title', 'tags': ['title'], 'value': lambda el: el.text, 'keep': 1},
+    {'name': 'meta_description', 'tags': ['meta'], 'match': lambda el: el.get('name') == 'description',
+     'value': lambda el: el.get('content', ''), 'keep': 1},
+    {'name': 'viewport', 'tags': ['meta'], 'match': lambda el: el.get('name') == 'viewport'},
+    *[{'name': f'h{i}', 'tags': [f'h{i}'], 'value': lambda el: el.text, 'keep': 3} for i in range(1, 7)],
+    {'name': 'images', 'tags': ['img']},
+    {'name': 'images_with_alt', 'tags': ['img'], 'match': lambda el: bool(el.get('alt'))},
+    {'name': 'logo', 'tags': ['img'], 'match': lambda el: bool(LOGO_RE.search(el.get('alt', '')))},
+    {'name': 'links', 'tags': ['a'], 'match': lambda el: el.has_attr('href'), 'value': lambda el: el['href'], 'keep': None},
+    {'name': 'authority_links', 'tags': ['a'],
+     'match': lambda el: any(d in el.get('href', '').lower() for d in AUTHORITY_DOMAINS) and el.has_attr('href')},
+    {'name': 'about_link', 'tags': ['a'], 'match': lambda el: bool(ABOUT_RE.search(el.get('href', '')))},
+    {'name': 'social_links', 'tags': ['a'],
+     'match': lambda el: el.has_attr('href') and any(s in el['href'] for s in SOCIAL_DOMAINS)},
+    {'name': 'author_class', 'tags': None, 'match': lambda el: _has_class(el, AUTHOR_RE)},
+    {'name': 'date_class', 'tags': None, 'match': lambda el: _has_class(el, DATE_RE)},
+    {'name': 'time_tag', 'tags': ['time']},
+    {'name': 'maps_embed', 'tags': ['iframe'], 'match': lambda el: bool(MAPS_RE.search(el.get('src', '')))},
+    {'name': 'lists', 'tags': ['ul', 'ol']},
+    {'name': 'tables', 'tags': ['table']},
+    {'name': 'videos', 'tags': ['video', 'iframe']},
+    {'name': 'contact_info', 'strings': True, 'match': lambda s: bool(CONTACT_RE.search(s))},
+]
+
+# Text-Regeln: 'pattern' (Regex) oder 'words' (Wortliste, Token-Lookup),
+# optional 'limit' (nur die ersten n Zeichen) und 'collect' (gefundene Wörter sammeln)
+TEXT_RULES = [
+    {'name': 'phone', 'pattern': r'(?:\+49|0)\s?\d{2,5}[\s/-]?\d{3,8}'},
+    {'name': 'address', 'pattern': r'\d{5}\s+[A-ZÄÖÜ][a-zäöüß]+'},
+    {'name': 'brand_mention', 'pattern': r'\b[A-ZÄÖÜ][a-zäöüß]{2,}\s(?:GmbH|AG|eV|e\.V\.)\b'},
+    {'name': 'explanations', 'words': ['ist', 'sind', 'bedeutet', 'bezeichnet', 'definiert'], 'limit': 2000},
+    {'name': 'cta', 'words': ['jetzt', 'hier', 'klicken', 'bestellen', 'kaufen', 'anmelden'], 'limit': 2000},
+    {'name': 'visit', 'words': ['adresse', 'telefon', 'öffnungszeiten', 'standort', 'weg'], 'limit': 2000},
+    {'name': 'opening_hours', 'words': ['öffnungszeiten', 'geöffnet', 'montag', 'dienstag']},
+    {'name': 'cities', 'words': GERMAN_CITIES, 'collect': True},
+    {'name': 'direct_answer', 'words': ['ist', 'sind', 'bedeutet', 'definition'], 'limit': 500, 'collect': True},
+]
+
+# Keyword-Dichte: alphabetische Wörter > 3 Zeichen in den ersten n Zeichen
+# (Regex-Tokenisierung statt eines eigenen spaCy-Durchlaufs)
+DENSITY_LIMIT = 10000
+
+WORD_RE = re.compile(r'\w+')
+
+class PageSignals:
+    """Zähler und gesammelte Werte aller Regeln einer Seite"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.values = {}
+        self.words = 0
+        self.word_freq = Counter()
+
+    def count(self, name):
+        return self.counts[name]
+
+    def has(self, name):
+        return self.counts[name] > 0
+
+    def all(self, name):
+        return self.values.get(name, [])
+
+    def first(self, name, default=None):
+        values = self.values.get(name)
+        return values[0] if values else default
+
+class RuleEngine:
+    """Wertet DOM- und Text-Regeln aus; neue Regeln kosten keinen weiteren Durchlauf"""
+
+    def __init__(self, dom_rules, text_rules):
+        self.tag_rules = {}
+        self.any_tag_rules = []
+        self.string_rules = []
+        for rule in dom_rules:
+            if rule.get('strings'):
+                self.string_rules.append(rule)
+            elif rule.get('tags') is None:
+                self.any_tag_rules.append(rule)
+            else:
+                for tag in rule['tags']:
+                    self.tag_rules.setdefault(tag, []).append(rule)
+        self.patterns = [(rule['name'], re.compile(rule['pattern'])) for rule in text_rules if 'pattern' in rule]
+        self.word_rules = [(rule, frozenset(rule['words'])) for rule in text_rules if 'words' in rule]
+
+    def _apply(self, rule, node, signals):
+        match = rule.get('match')
+        if match is not None and not match(node):
+            return
+        name = rule['name']
+        signals.counts[name] += 1
+        if 'value' in rule:
+            values = signals.values.setdefault(name, [])
+            keep = rule.get('keep', 1)
+            if keep is None or len(values) < keep:
+                values.append(rule['value'](node))
+
+    def scan_dom(self, soup, signals):
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                for rule in self.tag_rules.get(node.name, ()):
+                    self._apply(rule, node, signals)
+                for rule in self.any_tag_rules:
+                    self._apply(rule, node, signals)
+            else:
+                for rule in self.string_rules:
+                    # Textknoten-Regeln prüfen nur bis zum ersten Treffer
+                    if not signals.counts[rule['name']]:
+                        self._apply(rule, node, signals)
+
+    def scan_text(self, text, signals):
+        # Muster zählen per findall, Wörter einmal tokenisieren (pro Textlänge) und
+        # per Mengen-Lookup zuordnen – kein Python-Aufruf pro Wort
+        for name, pattern in self.patterns:
+            signals.counts[name] = len(pattern.findall(text))
+        tokens = {}
+        frequencies = {}
+
+        def words(limit):
+            if limit not in tokens:
+                tokens[limit] = WORD_RE.findall((text if limit is None else text[:limit]).lower())
+            return tokens[limit]
+
+        def frequency(limit):
+            if limit not in frequencies:
+                frequencies[limit] = Counter(words(limit))
+            return frequencies[limit]
+
+        signals.words = len(words(None))
+        signals.word_freq = Counter({w: n for w, n in frequency(DENSITY_LIMIT).items() if len(w) > 3 and w.isalpha()})
+        for rule, vocabulary in self.word_rules:
+            counts = frequency(rule.get('limit'))
+            signals.counts[rule['name']] = sum(counts[w] for w in vocabulary)
+            if rule.get('collect'):
+                # Gefundene Wörter in Dokumentreihenfolge
+                signals.values[rule['name']] = [w for w in words(rule.get('limit')) if w in vocabulary]
+
+    def evaluate(self, soup, main_text):
+        signals = PageSignals()
+        self.scan_dom(soup, signals)
+        self.scan_text(main_text, signals)
+        return signals
+
+RULES = RuleEngine(DOM_RULES, TEXT_RULES)
+
+def evaluate_rules(soup, main_text):
+    return RULES.evaluate(soup, main_text)
+
 # ============================================================
 # A. TECHNISCHE BASIS-SEO
 # ============================================================
 
-def analyze_technical_seo(url, soup, response):
+def analyze_technical_seo(url, soup, response, entities=None, signals=None, weight=None):
     """Technische SEO-Signale nach Google 2026"""
     results = {}
+    if weight is None:
+        weight = RESOURCES.analyze(soup, response.url, len(response.content))
+    if signals is None:
+        signals = evaluate_rules(soup, extract_main_content(soup, url))
     
     # Title
-    title = soup.find('title')
+    title = signals.first('title')
+    title_text = title.strip() if title is not None else ''
     results['title'] = {
         'exists': title is not None,
-        'text': title.text.strip() if title else '',
-        'length': len(title.text.strip()) if title else 0,
-        'optimal': 50 <= len(title.text.strip()) <= 60 if title else False
+        'text': title_text,
+        'length': len(title_text),
+        'optimal': 50 <= len(title_text) <= 60 if title else False
     }
     
     # Meta Description
-    meta_desc = soup.find('meta', attrs={'name': 'description'})
-    desc_text = meta_desc.get('content', '') if meta_desc else ''
+    desc_text = signals.first('meta_description', '')
     results['meta_description'] = {
-        'exists': meta_desc is not None,
+        'exists': signals.has('meta_description'),
         'text': desc_text,
         'length': len(desc_text),
         'optimal': 150 <= len(desc_text) <= 160
@@ -51,32 +242,29 @@ def analyze_technical_seo(url, soup, response):
     # Heading-Struktur
     headings = {}
     for i in range(1, 7):
-        h_tags = soup.find_all(f'h{i}')
         headings[f'h{i}'] = {
-            'count': len(h_tags),
-            'texts': [h.text.strip()[:50] for h in h_tags[:3]]
+            'count': signals.count(f'h{i}'),
+            'texts': [h.strip()[:50] for h in signals.all(f'h{i}')]
         }
     results['headings'] = headings
     
     # Wortanzahl Hauptinhalt
-    main_content = extract_main_content(soup)
-    word_count = len(re.findall(r'\b\w+\b', main_content))
-    results['word_count'] = word_count
+    results['word_count'] = signals.words
     
     # Bilder & Alt-Texte
-    images = soup.find_all('img')
-    images_with_alt = [img for img in images if img.get('alt')]
+    images = signals.count('images')
+    images_with_alt = signals.count('images_with_alt')
     results['images'] = {
-        'total': len(images),
-        'with_alt': len(images_with_alt),
-        'alt_ratio': len(images_with_alt) / len(images) * 100 if images else 0
+        'total': images,
+        'with_alt': images_with_alt,
+        'alt_ratio': images_with_alt / images * 100 if images else 0
     }
     
     # Links
-    all_links = soup.find_all('a', href=True)
+    all_links = signals.all('links')
     domain = urlparse(url).netloc
-    internal_links = [l for l in all_links if domain in l.get('href', '') or l.get('href', '').startswith('/')]
-    external_links = [l for l in all_links if domain not in l.get('href', '') and not l.get('href', '').startswith('/') and l.get('href', '').startswith('http')]
+    internal_links = [href for href in all_links if domain in href or href.startswith('/')]
+    external_links = [href for href in all_links if domain not in href and not href.startswith('/') and href.startswith('http')]
     results['links'] = {
         'internal': len(internal_links),
         'external': len(external_links),
@@ -87,24 +275,18 @@ def analyze_technical_seo(url, soup, response):
     results['https'] = url.startswith('https://')
     
     # Mobile-Freundlichkeit (viewport)
-    viewport = soup.find('meta', attrs={'name': 'viewport'})
-    results['mobile_friendly'] = viewport is not None
+    results['mobile_friendly'] = signals.has('viewport')
     
-    # Ladezeit
+    # Antwortzeit des HTML-Dokuments (nur bis zu den Response-Headern)
     results['load_time'] = response.elapsed.total_seconds()
     
-    # Structured Data
-    structured_data = []
-    # JSON-LD
-    for script in soup.find_all('script', type='application/ld+json'):
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, dict):
-                structured_data.append(data.get('@type', 'Unknown'))
-            elif isinstance(data, list):
-                structured_data.extend([d.get('@type', 'Unknown') for d in data if isinstance(d, dict)])
-        except:
-            pass
+    # Seitengewicht aus allen referenzierten Ressourcen
+    results['page_weight'] = weight
+    
+    # Structured Data (JSON-LD, Microdata, RDFa)
+    if entities is None:
+        entities = extract_structured_data(soup)
+    structured_data = top_level_types(entities)
     results['structured_data'] = structured_data
     
     return results
@@ -113,9 +295,11 @@ def analyze_technical_seo(url, soup, response):
 # B. CONTENT QUALITÄT & E-E-A-T
 # ============================================================
 
-def analyze_content_quality(soup, main_text):
+def analyze_content_quality(soup, main_text, signals=None):
     """Content-Qualität und E-E-A-T-Indikatoren"""
     results = {}
+    if signals is None:
+        signals = evaluate_rules(soup, main_text)
     
     # Lesbarkeit (deutsche Formeln)
     try:
@@ -134,6 +318,8 @@ def analyze_content_quality(soup, main_text):
         if ent.label_ in entities:
             entities[ent.label_].append(ent.text)
     
+    # Alle Nennungen (mit Label) für den Suchindex
+    results['entity_mentions'] = [(text, label) for label, texts in entities.items() for text in texts]
     results['entities'] = {
         'persons': len(set(entities['PER'])),
         'locations': len(set(entities['LOC'])),
@@ -146,17 +332,14 @@ def analyze_content_quality(soup, main_text):
     }
     
     # Externe Links zu Autoritäten
-    all_links = soup.find_all('a', href=True)
-    authority_domains = ['wikipedia.org', 'gov', 'edu', 'destatis.de', 'bundesregierung.de']
-    authority_links = [l for l in all_links if any(domain in l.get('href', '').lower() for domain in authority_domains)]
-    results['authority_links'] = len(authority_links)
+    results['authority_links'] = signals.count('authority_links')
     
     # E-A-T Signale
     eat_signals = {
-        'author_box': bool(soup.find(class_=re.compile('author', re.I))),
-        'about_page': bool(soup.find('a', href=re.compile(r'(about|ueber|impressum)', re.I))),
-        'contact_info': bool(soup.find(text=re.compile(r'(kontakt|email|telefon)', re.I))),
-        'date_published': bool(soup.find('time') or soup.find(class_=re.compile('date', re.I)))
+        'author_box': signals.has('author_class'),
+        'about_page': signals.has('about_link'),
+        'contact_info': signals.has('contact_info'),
+        'date_published': signals.has('time_tag') or signals.has('date_class')
     }
     results['eat_signals'] = eat_signals
     
@@ -166,62 +349,45 @@ def analyze_content_quality(soup, main_text):
 # C. SEARCH INTENT KLASSIFIKATION
 # ============================================================
 
-def classify_search_intent(soup, main_text):
+# Intent-Hinweise im Haupt-Keyword (Title + H1)
+INTENT_KEYWORD_RULES = {
+    'know_simple': ['was ist', 'definition', 'bedeutung', 'erkl'],
+    'know_complex': ['wie', 'warum', 'ratgeber', 'anleitung', 'guide'],
+    'do_transactional': ['kaufen', 'bestellen', 'download', 'anmelden', 'buchen'],
+    'website_navigational': ['login', 'kontakt', 'impressum', 'startseite'],
+    'visit_in_person': ['in', 'bei', 'nähe', 'adresse', 'öffnungszeiten']
+}
+
+# Content-basierte Hinweise: (Intent, Text-Regel, Mindesttreffer, Punkte)
+INTENT_TEXT_RULES = [
+    ('know_complex', 'explanations', 5, 2),
+    ('do_transactional', 'cta', 3, 2),
+    ('visit_in_person', 'visit', 3, 2)
+]
+
+def classify_search_intent(soup, main_text, signals=None):
     """Google Quality Rater Guidelines Intent-Klassifikation"""
     results = {}
+    if signals is None:
+        signals = evaluate_rules(soup, main_text)
     
     # Extrahiere Haupt-Keyword aus Title + H1
-    title = soup.find('title')
-    h1 = soup.find('h1')
-    title_text = title.text if title else ''
-    h1_text = h1.text if h1 else ''
+    title_text = signals.first('title', '')
+    h1_text = signals.first('h1', '')
     main_keyword = f"{title_text} {h1_text}".lower()
     
     results['estimated_keyword'] = title_text[:60] if title_text else 'Nicht erkennbar'
     
     # Intent-Klassifikation
-    intents = {
-        'know_simple': 0,
-        'know_complex': 0,
-        'do_transactional': 0,
-        'website_navigational': 0,
-        'visit_in_person': 0
-    }
+    intents = {intent: 0 for intent in INTENT_KEYWORD_RULES}
+    for intent, words in INTENT_KEYWORD_RULES.items():
+        if any(word in main_keyword for word in words):
+            intents[intent] += 3
     
-    # Know Simple: Fakten, Definitionen
-    if any(word in main_keyword for word in ['was ist', 'definition', 'bedeutung', 'erkl']):
-        intents['know_simple'] += 3
-    
-    # Know Complex: Tiefere Informationen
-    if any(word in main_keyword for word in ['wie', 'warum', 'ratgeber', 'anleitung', 'guide']):
-        intents['know_complex'] += 3
-    
-    # Do/Transactional: Handlungen, Käufe
-    if any(word in main_keyword for word in ['kaufen', 'bestellen', 'download', 'anmelden', 'buchen']):
-        intents['do_transactional'] += 3
-    
-    # Website/Navigational: Brand-Suchen
-    if any(word in main_keyword for word in ['login', 'kontakt', 'impressum', 'startseite']):
-        intents['website_navigational'] += 3
-    
-    # Visit-in-person: Lokale Suchen
-    if any(word in main_keyword for word in ['in', 'bei', 'nähe', 'adresse', 'öffnungszeiten']):
-        intents['visit_in_person'] += 3
-    
-    # Content-basierte Klassifikation
-    text_lower = main_text[:2000].lower()
-    
-    # Know: Viele Erklärungen
-    if len(re.findall(r'\b(ist|sind|bedeutet|bezeichnet|definiert)\b', text_lower)) > 5:
-        intents['know_complex'] += 2
-    
-    # Do: Call-to-Actions
-    if len(re.findall(r'\b(jetzt|hier|klicken|bestellen|kaufen|anmelden)\b', text_lower)) > 3:
-        intents['do_transactional'] += 2
-    
-    # Visit: Lokale Infos
-    if len(re.findall(r'\b(adresse|telefon|öffnungszeiten|standort|weg)\b', text_lower)) > 3:
-        intents['visit_in_person'] += 2
+    # Content-basierte Klassifikation (erste 2000 Zeichen)
+    for intent, rule_name, threshold, points in INTENT_TEXT_RULES:
+        if signals.count(rule_name) > threshold:
+            intents[intent] += points
     
     # Primärer Intent
     primary_intent = max(intents, key=intents.get)
@@ -239,34 +405,28 @@ def classify_search_intent(soup, main_text):
 # D. GEO / LOCAL SEO
 # ============================================================
 
-def analyze_geo_local(soup, main_text):
+def analyze_geo_local(soup, main_text, entities=None, signals=None):
     """Local SEO & GEO-Signale"""
     results = {}
+    if signals is None:
+        signals = evaluate_rules(soup, main_text)
     
     # NAP (Name, Address, Phone) Erkennung
-    phone_pattern = r'(\+49|0)\s?(\d{2,5})[\s/-]?\d{3,8}'
-    phones = re.findall(phone_pattern, main_text)
-    results['phone_found'] = len(phones) > 0
-    results['phone_count'] = len(phones)
+    results['phone_found'] = signals.has('phone')
+    results['phone_count'] = signals.count('phone')
     
     # Adressen (einfache Heuristik)
-    address_pattern = r'\d{5}\s+[A-ZÄÖÜ][a-zäöüß]+'
-    addresses = re.findall(address_pattern, main_text)
-    results['address_found'] = len(addresses) > 0
-    results['address_count'] = len(addresses)
+    results['address_found'] = signals.has('address')
+    results['address_count'] = signals.count('address')
     
     # Öffnungszeiten
-    opening_hours = bool(re.search(r'(öffnungszeiten|geöffnet|montag|dienstag)', main_text, re.I))
-    results['opening_hours_found'] = opening_hours
+    results['opening_hours_found'] = signals.has('opening_hours')
     
     # Google Maps Embed
-    maps_embed = bool(soup.find('iframe', src=re.compile(r'google.com/maps', re.I)))
-    results['google_maps_embed'] = maps_embed
+    results['google_maps_embed'] = signals.has('maps_embed')
     
     # Lokale Keywords
-    german_cities = ['berlin', 'hamburg', 'münchen', 'köln', 'frankfurt', 'stuttgart', 'düsseldorf', 'dortmund', 'essen', 'leipzig', 'bremen', 'dresden', 'hannover', 'nürnberg', 'duisburg']
-    text_lower = main_text.lower()
-    found_cities = [city for city in german_cities if city in text_lower]
+    found_cities = list(dict.fromkeys(signals.all('cities')))
     results['local_keywords'] = {
         'cities_found': found_cities[:5],
         'city_count': len(found_cities),
@@ -274,16 +434,16 @@ def analyze_geo_local(soup, main_text):
     }
     
     # Local Business Schema
-    local_schemas = ['LocalBusiness', 'Restaurant', 'Store', 'Organization', 'Place']
     results['local_schema_found'] = False
-    for script in soup.find_all('script', type='application/ld+json'):
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, dict) and data.get('@type') in local_schemas:
-                results['local_schema_found'] = True
-                results['local_schema_type'] = data.get('@type')
-        except:
-            pass
+    if entities is None:
+        entities = extract_structured_data(soup)
+    # Nur Typen auf oberster Ebene: Organization als publisher eines Article zählt nicht
+    page_types = set(top_level_types(entities))
+    for schema_type in LOCAL_SCHEMAS:
+        if schema_type in page_types:
+            results['local_schema_found'] = True
+            results['local_schema_type'] = schema_type
+            break
     
     # GEO-Score (0-10)
     geo_score = 0
@@ -308,40 +468,38 @@ def analyze_geo_local(soup, main_text):
 # E. ZUSÄTZLICHE MODERNE ANALYSEN
 # ============================================================
 
-def analyze_modern_seo(soup, main_text):
+def analyze_modern_seo(soup, main_text, signals=None):
     """2026-relevante SEO-Faktoren"""
     results = {}
+    if signals is None:
+        signals = evaluate_rules(soup, main_text)
     
-    # 1. AI Overview Gefährdung
-    first_para = main_text[:500]
-    direct_answer_patterns = ['ist', 'sind', 'bedeutet', 'definition']
-    ai_risk_score = sum(1 for p in direct_answer_patterns if p in first_para.lower())
+    # 1. AI Overview Gefährdung (direkte Antworten in den ersten 500 Zeichen)
+    ai_risk_score = len(set(signals.all('direct_answer')))
     results['ai_overview_risk'] = 'Hoch' if ai_risk_score >= 3 else 'Mittel' if ai_risk_score >= 2 else 'Niedrig'
     
     # 2. Brand Signals
     brand_indicators = {
-        'logo': bool(soup.find('img', alt=re.compile(r'logo', re.I))),
-        'brand_mention': len(re.findall(r'\b[A-ZÄÖÜ][a-zäöüß]{2,}\s(GmbH|AG|eV|e\.V\.)\b', main_text)),
-        'social_links': len([l for l in soup.find_all('a', href=True) if any(s in l.get('href', '') for s in ['facebook', 'twitter', 'linkedin', 'instagram'])])
+        'logo': signals.has('logo'),
+        'brand_mention': signals.count('brand_mention'),
+        'social_links': signals.count('social_links')
     }
     results['brand_signals'] = brand_indicators
     
     # 3. UX-Elemente
     ux_elements = {
-        'lists': len(soup.find_all(['ul', 'ol'])),
-        'tables': len(soup.find_all('table')),
-        'images': len(soup.find_all('img')),
-        'videos': len(soup.find_all(['video', 'iframe']))
+        'lists': signals.count('lists'),
+        'tables': signals.count('tables'),
+        'images': signals.count('images'),
+        'videos': signals.count('videos')
     }
     results['ux_elements'] = ux_elements
     
     # 4. Keyword Density (vermeidet Stuffing)
-    doc = nlp(main_text[:10000])
-    words = [token.text.lower() for token in doc if token.is_alpha and len(token.text) > 3]
-    if words:
-        word_freq = Counter(words)
+    word_freq = signals.word_freq
+    if word_freq:
         top_word = word_freq.most_common(1)[0]
-        density = (top_word[1] / len(words)) * 100
+        density = (top_word[1] / sum(word_freq.values())) * 100
         results['keyword_density'] = {
             'top_word': top_word[0],
             'density_percent': round(density, 2),
@@ -354,15 +512,9 @@ def analyze_modern_seo(soup, main_text):
 # HILFSFUNKTIONEN
 # ============================================================
 
-def extract_main_content(soup):
+def extract_main_content(soup, url=None):
     """Extrahiert Hauptinhalt ohne Nav/Footer"""
-    for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-        tag.decompose()
-    
-    main = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile('content', re.I))
-    if main:
-        return main.get_text(separator=' ', strip=True)
-    return soup.get_text(separator=' ', strip=True)
+    return EXTRACTOR.extract_from_soup(soup, url)
 
 def interpret_flesch(score):
     """Interpretiert Flesch Reading Ease"""
@@ -382,7 +534,7 @@ def interpret_flesch(score):
 # ============================================================
 
 def analyze_url(url):
-    """Führt vollständige SEO + GEO Analyse durch"""
+    """Führt vollständige SEO + GEO Analyse durch und liefert den ArticleRecord"""
     print(f"\n{'='*70}")
     print(f"🔍 ANALYSIERE: {url}")
     print(f"{'='*70}\n")
@@ -390,28 +542,65 @@ def analyze_url(url):
     try:
         # Seite abrufen
         print("📥 Lade Seite...")
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
-        response.raise_for_status()
+        fetched = FETCH.fetch(url, wait=True)
+        if not fetched.ok:
+            print(f"❌ FEHLER: Seite nicht geladen ({fetched.error}, {fetched.attempts} Versuch(e))")
+            record = ArticleRecord(url, status='fehlgeschlagen')
+            ARTICLES.append(record)
+            return record
+        response = fetched.response
         soup = BeautifulSoup(response.content, 'html.parser')
-        main_text = extract_main_content(soup)
+        # Structured Data einmal pro Seite, bevor <script>-Tags entfernt werden
+        entities = extract_structured_data(soup)
+        weight = RESOURCES.analyze(soup, response.url, len(response.content))
+        main_text = extract_main_content(soup, url)
+        render = RENDER.check(response.content, main_text)
+        if render and render['recovered']:
+            main_text = render['text']
+            print(f"⚠️  Clientseitig gerendert ({', '.join(render['markers']) or 'JSON-State'}): Text aus eingebettetem State übernommen")
+        elif render and render['client_rendered']:
+            print(f"⚠️  Clientseitig gerendert ({', '.join(render['markers']) or 'leerer Container'}): Inhalt nur mit Browser-Rendering vollständig")
+        signals = evaluate_rules(soup, main_text)
         
         # Analysen durchführen
         print("⚙️  Führe Analysen durch...\n")
         
-        tech_seo = analyze_technical_seo(url, soup, response)
-        content_quality = analyze_content_quality(soup, main_text)
-        search_intent = classify_search_intent(soup, main_text)
-        geo_local = analyze_geo_local(soup, main_text)
-        modern_seo = analyze_modern_seo(soup, main_text)
+        tech_seo = analyze_technical_seo(url, soup, response, entities, signals, weight)
+        content_quality = analyze_content_quality(soup, main_text, signals)
+        search_intent = classify_search_intent(soup, main_text, signals)
+        geo_local = analyze_geo_local(soup, main_text, entities, signals)
+        modern_seo = analyze_modern_seo(soup, main_text, signals)
         
         # Gesamt-Score berechnen
         score = calculate_overall_score(tech_seo, content_quality, geo_local)
         
         # Report ausgeben
         print_report(url, score, tech_seo, content_quality, search_intent, geo_local, modern_seo)
+        deferred = render and render['client_rendered'] and not render['recovered']
+        # Zurückgestellte Seiten enthalten nur die leere Hülle – nicht in den Suchindex
+        if not deferred:
+            INDEX.add_document(url, main_text, entities=content_quality['entity_mentions'])
+        record = ArticleRecord(
+            url,
+            word_count=tech_seo['word_count'],
+            flesch=content_quality['flesch_score'],
+            intent=search_intent['primary_intent'],
+            link_count=tech_seo['links']['internal'],
+            score=score,
+            status='zurückgestellt' if deferred else 'ok'
+        )
         
     except Exception as e:
         print(f"❌ FEHLER: {e}")
+        record = ArticleRecord(url, status='fehlgeschlagen')
+    ARTICLES.append(record)
+    return record
+
+def analyze_urls(urls):
+    """Analysiert mehrere URLs nacheinander und speichert den Selektor-Cache einmal am Ende"""
+    records = [analyze_url(url) for url in urls]
+    EXTRACTOR.save()
+    return records
 
 def calculate_overall_score(tech, content, geo):
     """Berechnet Gesamt-SEO-Score (0-100)"""
@@ -474,7 +663,19 @@ def print_report(url, score, tech, content, intent, geo, modern):
     print(f"Links: {tech['links']['internal']} intern, {tech['links']['external']} extern")
     print(f"HTTPS: {'✓' if tech['https'] else '✗'}")
     print(f"Mobile-Friendly: {'✓' if tech['mobile_friendly'] else '✗'}")
-    print(f"Ladezeit: {tech['load_time']:.2f}s")
+    print(f"Antwortzeit HTML: {tech['load_time']:.2f}s")
+    weight = tech['page_weight']
+    print(f"Seitengewicht: {format_bytes(weight['total_bytes'])} in {weight['requests']} Requests")
+    for kind, info in sorted(weight['by_kind'].items()):
+        print(f"   {kind}: {info['count']}x, {format_bytes(info['bytes'])}")
+    if weight['unknown_sizes']:
+        print(f"   ({weight['unknown_sizes']} Ressourcen ohne Größenangabe)")
+    if weight['render_blocking']:
+        print(f"Render-blockierend: {len(weight['render_blocking'])} Ressourcen")
+        for res in weight['render_blocking'][:3]:
+            print(f"   → {res['kind']} {format_bytes(res['bytes'])}: {res['url'][:60]}")
+    if weight['largest_image']:
+        print(f"Größtes Bild: {format_bytes(weight['largest_image']['bytes'])} → {weight['largest_image']['url'][:60]}")
     if tech['structured_data']:
         print(f"Structured Data: {', '.join(tech['structured_data'])}")
     
@@ -542,6 +743,10 @@ def print_report(url, score, tech, content, intent, geo, modern):
         recommendations.append(f"Meta Description optimieren (aktuell {tech['meta_description']['length']} Zeichen, optimal: 150-160)")
     if tech['word_count'] < 300:
         recommendations.append(f"Content erweitern (aktuell {tech['word_count']} Wörter, min. 300 empfohlen)")
+    if tech['page_weight']['total_bytes'] > HEAVY_PAGE_BYTES:
+        recommendations.append(f"Seitengewicht reduzieren (aktuell {format_bytes(tech['page_weight']['total_bytes'])}, Bilder komprimieren, Skripte bündeln)")
+    if len(tech['page_weight']['render_blocking']) > 3:
+        recommendations.append(f"Render-blockierende Ressourcen reduzieren ({len(tech['page_weight']['render_blocking'])} Skripte/Stylesheets im Head)")
     if tech['images']['alt_ratio'] < 80:
         recommendations.append("Alt-Texte für alle Bilder hinzufügen")
     if content['authority_links'] == 0:
@@ -568,6 +773,9 @@ print("\n🎯 SEO + GEO ANALYZER bereit!")
 print("="*70)
 print("\nVerwendung:")
 print("  analyze_url('https://example.com/seite')")
+print("  analyze_urls([...])                            # mehrere URLs, Cache einmal speichern")
+print("  ARTICLES.save('ergebnisse/seo_artikel.npz')  # alle Ergebnisse spaltenweise")
+print("  INDEX.save('ergebnisse/seo_index.bin')        # Suchindex (python content_index.py --index ...)")
 print("\n")
 
 # Demo-Analyse (auskommentiert - Sie können Ihre URL einsetzen)
@@ -0,0 +1,270 @@
+# SHARD QUEUE - Verteilte Analyse über mehrere Worker-Prozesse
+# URLs werden per Host-Hash auf Shards verteilt und in einer SQLite-Warteschlange
+# abgelegt. Worker (auf einem oder mehreren Rechnern mit gemeinsamem Dateisystem)
+# leasen jeweils einen ganzen Shard, damit jeder Host nur von einem Worker
+# abgefragt wird. Teilergebnisse (SiteAggregator/SchemaInventory als dict) werden
+# pro Batch in derselben Transaktion wie der URL-Status gespeichert und vom
+# Reducer zusammengeführt; ebenso pro Seite Linkziele und Termhäufigkeiten für
+# Link-Prüfung und Cross-Site-Überschneidungen sowie die Kennzahlen pro URL für
+# den Lauf-Vergleich.
+
+import os
+import json
+import time
+import zlib
+import socket
+import sqlite3
+from urllib.parse import urlparse
+from site_stats import SiteAggregator
+from structured_data import SchemaInventory
+
+DEFAULT_QUEUE_PATH = 'ergebnisse/warteschlange.sqlite'
+
+# Anzahl Shards (wird beim Anlegen der Warteschlange festgeschrieben)
+DEFAULT_SHARDS = 16
+
+# Lease-Dauer pro Shard in Sekunden; wird bei jedem Batch verlängert
+LEASE_SECONDS = 600
+
+# URLs pro Batch (Commit-Einheit für Status und Teilergebnisse)
+BATCH_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sites (
+    sitemap_name TEXT PRIMARY KEY,
+    base_domain TEXT NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    url TEXT PRIMARY KEY,
+    sitemap_name TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'offen',
+    attempts INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_shard_status ON items (shard, status);
+CREATE TABLE IF NOT EXISTS shards (
+    shard INTEGER PRIMARY KEY,
+    worker TEXT NOT NULL,
+    lease_until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shard INTEGER NOT NULL,
+    worker TEXT NOT NULL,
+    sitemap_name TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    schema TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    sitemap_name TEXT NOT NULL,
+    links TEXT NOT NULL,
+    terms TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS records (
+    url TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class ShardQueue:
+    """SQLite-Warteschlange mit Shard-Leases (ein Shard = eine Menge von Hosts)"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, num_shards=DEFAULT_SHARDS, lease_seconds=LEASE_SECONDS):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        # Autocommit; Schreibzugriffe laufen als BEGIN IMMEDIATE (serialisiert über die Dateisperre)
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('num_shards', ?)", (str(num_shards),))
+        self.num_shards = int(self.conn.execute("SELECT value FROM meta WHERE key = 'num_shards'").fetchone()[0])
+
+    def shard_for(self, url):
+        """Stabil über Prozesse und Rechner (kein Python-hash)"""
+        return zlib.crc32(urlparse(url).netloc.encode('utf-8')) % self.num_shards
+
+    def _transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+
+    # --- Befüllen ---
+
+    def enqueue(self, sitemap_name, base_domain, urls):
+        """Legt URLs einer Sitemap ab (bereits vorhandene URLs bleiben unverändert)"""
+        self._transaction()
+        try:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO items (url, sitemap_name, shard) VALUES (?, ?, ?)',
+                [(url, sitemap_name, self.shard_for(url)) for url in urls]
+            )
+            total = self.conn.execute('SELECT COUNT(*) FROM items WHERE sitemap_name = ?', (sitemap_name,)).fetchone()[0]
+            self.conn.execute('INSERT OR REPLACE INTO sites (sitemap_name, base_domain, total) VALUES (?, ?, ?)',
+                              (sitemap_name, base_domain, total))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return total
+
+    # --- Worker ---
+
+    def lease_shard(self, worker):
+        """Übernimmt einen Shard mit offenen URLs (eigener oder abgelaufener Lease zuerst)"""
+        now = time.time()
+        self._transaction()
+        try:
+            row = self.conn.execute(
+                "SELECT DISTINCT i.shard FROM items i LEFT JOIN shards s ON s.shard = i.shard "
+                "WHERE i.status IN ('offen', 'in_arbeit') "
+                "AND (s.shard IS NULL OR s.worker = ? OR s.lease_until < ?) "
+                "ORDER BY (s.worker = ?) DESC, i.shard LIMIT 1", (worker, now, worker)
+            ).fetchone()
+            if row is None:
+                self.conn.execute('COMMIT')
+                return None
+            shard = row[0]
+            self.conn.execute('INSERT OR REPLACE INTO shards (shard, worker, lease_until) VALUES (?, ?, ?)',
+                              (shard, worker, now + self.lease_seconds))
+            # URLs eines abgebrochenen Workers wieder freigeben
+            self.conn.execute("UPDATE items SET status = 'offen' WHERE shard = ? AND status = 'in_arbeit'", (shard,))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return shard
+
+    def _owns(self, worker, shard):
+        row = self.conn.execute('SELECT worker FROM shards WHERE shard = ?', (shard,)).fetchone()
+        return row is not None and row[0] == worker
+
+    def lease_items(self, worker, shard, limit=BATCH_SIZE):
+        """[(url, sitemap_name, base_domain)] des Shards; leer, wenn fertig oder Lease verloren"""
+        self._transaction()
+        try:
+            if not self._owns(worker, shard):
+                self.conn.execute('COMMIT')
+                return []
+            rows = self.conn.execute(
+                "SELECT i.url, i.sitemap_name, s.base_domain FROM items i JOIN sites s ON s.sitemap_name = i.sitemap_name "
+                "WHERE i.shard = ? AND i.status = 'offen' LIMIT ?", (shard, limit)
+            ).fetchall()
+            self.conn.executemany("UPDATE items SET status = 'in_arbeit', attempts = attempts + 1 WHERE url = ?",
+                                  [(url,) for url, _, _ in rows])
+            self.conn.execute('UPDATE shards SET lease_until = ? WHERE shard = ?', (time.time() + self.lease_seconds, shard))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return rows
+
+    def complete_batch(self, worker, shard, outcomes, deltas, pages=(), records=()):
+        """Status pro URL + Teilergebnisse pro Sitemap atomar speichern; False bei verlorenem Lease
+
+        pages: [(url, sitemap_name, [Linkziele], {Term: Anzahl})] der analysierten Seiten
+        records: [ArticleRecord.to_dict()] aller bearbeiteten URLs
+        """
+        self._transaction()
+        try:
+            if not self._owns(worker, shard):
+                self.conn.execute('ROLLBACK')
+                return False
+            self.conn.executemany('UPDATE items SET status = ? WHERE url = ?', [(status, url) for url, status in outcomes])
+            self.conn.executemany(
+                'INSERT INTO deltas (shard, worker, sitemap_name, stats, schema) VALUES (?, ?, ?, ?, ?)',
+                [(shard, worker, name, json.dumps(delta['stats'], ensure_ascii=False), json.dumps(delta['schema'], ensure_ascii=False))
+                 for name, delta in deltas.items()]
+            )
+            # Pro URL ersetzen: eine erneut bearbeitete URL zählt nur einmal
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO pages (url, sitemap_name, links, terms) VALUES (?, ?, ?, ?)',
+                [(url, name, json.dumps(links, ensure_ascii=False), json.dumps(terms, ensure_ascii=False))
+                 for url, name, links, terms in pages]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO records (url, record) VALUES (?, ?)',
+                [(record['url'], json.dumps(record, ensure_ascii=False)) for record in records]
+            )
+            self.conn.execute('UPDATE shards SET lease_until = ? WHERE shard = ?', (time.time() + self.lease_seconds, shard))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return True
+
+    def release_shard(self, worker, shard):
+        self.conn.execute('DELETE FROM shards WHERE shard = ? AND worker = ?', (shard, worker))
+
+    # --- Auswertung ---
+
+    def progress(self):
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM items GROUP BY status').fetchall())
+
+    def shard_sizes(self):
+        return dict(self.conn.execute('SELECT shard, COUNT(*) FROM items GROUP BY shard').fetchall())
+
+    def reduce(self):
+        """{Sitemap-Name: (SiteAggregator, SchemaInventory)} aus allen Teilergebnissen"""
+        totals = self.conn.execute('SELECT sitemap_name, total FROM sites ORDER BY rowid').fetchall()
+        merged = {name: (SiteAggregator(name), SchemaInventory()) for name, total in totals}
+        for name, stats, schema in self.conn.execute('SELECT sitemap_name, stats, schema FROM deltas ORDER BY batch_id'):
+            aggregator, inventory = merged[name]
+            aggregator.merge(SiteAggregator.from_dict(json.loads(stats)))
+            inventory.merge(SchemaInventory.from_dict(json.loads(schema)))
+        # Gesamtzahl aus der Warteschlange (inkl. noch offener URLs), nicht aus den Batches
+        for name, total in totals:
+            merged[name][0].total_articles = total
+        return merged
+
+    def pages(self):
+        """(url, sitemap_name, [Linkziele], {Term: Anzahl}) aller analysierten Seiten"""
+        for url, name, links, terms in self.conn.execute(
+                'SELECT p.url, p.sitemap_name, p.links, p.terms FROM pages p JOIN sites s ON s.sitemap_name = p.sitemap_name '
+                'ORDER BY s.rowid, p.url'):
+            yield url, name, json.loads(links), json.loads(terms)
+
+    def records(self):
+        """ArticleRecord.to_dict() aller bearbeiteten URLs in Reihenfolge der Sitemaps"""
+        for record, in self.conn.execute(
+                'SELECT r.record FROM records r JOIN items i ON i.url = r.url JOIN sites s ON s.sitemap_name = i.sitemap_name '
+                'ORDER BY s.rowid, r.url'):
+            yield json.loads(record)
+
+    def base_domains(self):
+        return {base_domain for base_domain, in self.conn.execute('SELECT base_domain FROM sites')}
+
+    def close(self):
+        self.conn.close()
+
+def run_worker(queue, process_batch, worker=None, batch_size=BATCH_SIZE):
+    """Arbeitet Shards ab, bis keine offenen URLs mehr da sind
+
+    process_batch([(url, sitemap_name, base_domain)]) liefert
+    ([(url, status)], {sitemap_name: {'stats': dict, 'schema': dict}}, pages, records)
+    mit pages und records wie bei complete_batch.
+    """
+    worker = worker or default_worker_id()
+    processed = 0
+    while True:
+        shard = queue.lease_shard(worker)
+        if shard is None:
+            break
+        print(f"   🧩 {worker}: Shard {shard} übernommen")
+        while True:
+            items = queue.lease_items(worker, shard, batch_size)
+            if not items:
+                break
+            outcomes, deltas, pages, records = process_batch(items)
+            if not queue.complete_batch(worker, shard, outcomes, deltas, pages, records):
+                print(f"   ⚠️  {worker}: Lease für Shard {shard} verloren, Batch verworfen")
+                break
+            processed += len(items)
+        queue.release_shard(worker, shard)
+    return processed
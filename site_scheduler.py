@@ -0,0 +1,167 @@
+# SITE SCHEDULER - Parallele Abarbeitung mehrerer Sitemaps
+# Verteilt Abrufe fair über alle Hosts (je Host ein Request gleichzeitig,
+# Mindestabstand REQUEST_DELAY), Analyse läuft im aufrufenden Thread
+
+import time
+import heapq
+import queue
+import threading
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# ============================================================
+# FORTSCHRITT & ETA
+# ============================================================
+
+class ProgressTracker:
+    """Gesamtfortschritt mit ETA aus dem gemessenen Durchsatz (gleitendes Fenster)"""
+
+    def __init__(self, total, window=30):
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+        self.timestamps = deque(maxlen=window)
+
+    def tick(self):
+        self.done += 1
+        self.timestamps.append(time.monotonic())
+
+    def throughput(self):
+        """Artikel pro Sekunde"""
+        if len(self.timestamps) >= 2:
+            span = self.timestamps[-1] - self.timestamps[0]
+            if span > 0:
+                return (len(self.timestamps) - 1) / span
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self):
+        rate = self.throughput()
+        if rate <= 0:
+            return None
+        return (self.total - self.done) / rate
+
+    def format(self):
+        percent = self.done / self.total * 100 if self.total else 100.0
+        line = f"{self.done}/{self.total} Artikel ({percent:.1f}%)"
+        rate = self.throughput()
+        eta = self.eta_seconds()
+        if rate > 0 and eta is not None:
+            line += f" – {rate:.2f} Artikel/s – Restzeit ~{eta / 60:.1f} Min."
+        return line
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class CrawlScheduler:
+    """Fair-Queueing über Hosts: Round-Robin nach frühestem erlaubten Zeitpunkt"""
+
+    def __init__(self, fetch, host_delay=0.5, max_workers=8, buffer_size=16):
+        self.fetch = fetch
+        self.host_delay = host_delay
+        self.max_workers = max_workers
+        self.queues = defaultdict(deque)
+        self.results = queue.Queue(maxsize=buffer_size)
+        self.cond = threading.Condition()
+        self.ready = []
+        self.seq = 0
+        self.active_hosts = 0
+        self.stopped = threading.Event()
+
+    def add(self, site, url):
+        host = urlparse(url).netloc
+        self.queues[host].append((site, url))
+
+    def total(self):
+        return sum(len(q) for q in self.queues.values())
+
+    def _schedule(self, host, not_before):
+        self.seq += 1
+        heapq.heappush(self.ready, (not_before, self.seq, host))
+        self.cond.notify()
+
+    def _put(self, item):
+        """Ergebnis übergeben; False, wenn der Verbraucher aufgehört hat"""
+        while not self.stopped.is_set():
+            try:
+                self.results.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch(self, host, site, url):
+        if self.stopped.is_set():
+            return
+        try:
+            html = self.fetch(url)
+        except Exception:
+            html = None
+        # Host pausiert (retry_at): URL vorne wieder einreihen, Host erst dann wieder einplanen
+        retry_at = getattr(html, 'retry_at', None)
+        if retry_at is not None:
+            with self.cond:
+                self.queues[host].appendleft((site, url))
+                self._schedule(host, retry_at)
+            return
+        # Ohne gesendeten Request (z. B. aufgegebener Host) ist kein Mindestabstand nötig
+        delay = 0 if getattr(html, 'attempts', 1) == 0 else self.host_delay
+        # Blockiert, falls die Analyse hinterherhängt (Rückstau statt HTML im Speicher)
+        if not self._put((site, url, html)):
+            return
+        with self.cond:
+            if self.queues[host]:
+                self._schedule(host, time.monotonic() + delay)
+            else:
+                self.active_hosts -= 1
+                self.cond.notify()
+
+    def _dispatch(self, executor):
+        with self.cond:
+            while self.active_hosts > 0 and not self.stopped.is_set():
+                if not self.ready:
+                    self.cond.wait()
+                    continue
+                not_before, _, host = self.ready[0]
+                wait = not_before - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                heapq.heappop(self.ready)
+                site, url = self.queues[host].popleft()
+                executor.submit(self._fetch, host, site, url)
+        self._put(None)
+
+    def run(self):
+        """Liefert (site, url, html) in Abschlussreihenfolge"""
+        hosts = [host for host, q in self.queues.items() if q]
+        if not hosts:
+            return
+        with self.cond:
+            self.active_hosts = len(hosts)
+            for host in hosts:
+                self._schedule(host, 0)
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(hosts)))
+        dispatcher = threading.Thread(target=self._dispatch, args=(executor,), daemon=True)
+        dispatcher.start()
+        try:
+            while True:
+                item = self.results.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            # Auch bei Abbruch durch den Verbraucher: nichts Neues starten, wartende
+            # Abrufe verwerfen und blockierte Übergaben freigeben
+            with self.cond:
+                self.stopped.set()
+                self.cond.notify_all()
+            executor.shutdown(wait=False, cancel_futures=True)
+            while True:
+                try:
+                    self.results.get_nowait()
+                except queue.Empty:
+                    break
+            dispatcher.join(timeout=1)
@@ -0,0 +1,321 @@
+# SITE STATS - Speicherbegrenzte Streaming-Aggregation pro Sitemap
+# Online-Mittelwert/Varianz, Quantil-Sketch (HIX, Wortanzahl),
+# Heavy-Hitter-Sketch (Themen), Top-k der am stärksten verlinkten Artikel
+# Alle Sketches sind zusammenführbar (merge) und als dict serialisierbar
+
+import heapq
+import random
+from collections import Counter
+
+# ============================================================
+# KONFIGURATION
+# ============================================================
+
+# Puffergröße pro Ebene im Quantil-Sketch (Genauigkeit ~1/k)
+QUANTILE_SKETCH_K = 200
+
+# Anzahl gleichzeitig gezählter Themen-Kandidaten
+THEME_SKETCH_SIZE = 1000
+
+TOP_THEMES = 15
+TOP_LINKED = 3
+
+# ============================================================
+# SKETCHES
+# ============================================================
+
+class RunningStats:
+    """Mittelwert und Varianz nach Welford"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = data['count'], data['mean'], data['m2']
+        stats.min, stats.max = data['min'], data['max']
+        return stats
+
+class QuantileSketch:
+    """KLL-artiger Quantil-Sketch: Ebene h hält Stichproben mit Gewicht 2^h"""
+
+    def __init__(self, k=QUANTILE_SKETCH_K, seed=0):
+        self.k = k
+        self.levels = [[]]
+        self.count = 0
+        self.rng = random.Random(seed)
+
+    def add(self, value):
+        self.levels[0].append(value)
+        self.count += 1
+        if len(self.levels[0]) >= self.k:
+            self._compress()
+
+    def _compress(self):
+        for h in range(len(self.levels)):
+            if len(self.levels[h]) < self.k:
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            items = sorted(self.levels[h])
+            # Bei ungerader Anzahl bleibt ein Element auf Ebene h (Gesamtgewicht bleibt exakt)
+            carry = [items.pop(-self.rng.randint(0, 1))] if len(items) % 2 else []
+            self.levels[h + 1].extend(items[self.rng.randint(0, 1)::2])
+            self.levels[h] = carry
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, q):
+        weighted = sorted((value, 1 << h) for h, items in enumerate(self.levels) for value in items)
+        if not weighted:
+            return 0
+        total = sum(weight for value, weight in weighted)
+        target = q * total
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data['k'])
+        sketch.count = data['count']
+        sketch.levels = [list(items) for items in data['levels']] or [[]]
+        return sketch
+
+class HeavyHitters:
+    """SpaceSaving: zählt höchstens `size` Kandidaten; Zählerstände sind nie zu niedrig
+
+    errors[item] ist die Obergrenze der Überschätzung (0 = exakt gezählt).
+    """
+
+    def __init__(self, size=THEME_SKETCH_SIZE):
+        self.size = size
+        self.counts = Counter()
+        self.errors = Counter()
+
+    def add(self, item, count=1):
+        if item in self.counts or len(self.counts) < self.size:
+            self.counts[item] += count
+            return
+        # Kleinsten Kandidaten ersetzen; dessen Stand wird zur Fehlerschranke des neuen
+        victim, floor = min(self.counts.items(), key=lambda entry: entry[1])
+        del self.counts[victim]
+        self.errors.pop(victim, None)
+        self.counts[item] = floor + count
+        self.errors[item] = floor
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def _floor(self):
+        """Höchstmögliche Anzahl eines nicht gezählten Eintrags"""
+        return min(self.counts.values()) if len(self.counts) >= self.size else 0
+
+    def merge(self, other):
+        floor, other_floor = self._floor(), other._floor()
+        counts, errors = Counter(), Counter()
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, floor) + other.counts.get(item, other_floor)
+            error = (self.errors.get(item, 0) if item in self.counts else floor) + \
+                    (other.errors.get(item, 0) if item in other.counts else other_floor)
+            if error:
+                errors[item] = error
+        keep = dict(counts.most_common(self.size))
+        self.counts = Counter(keep)
+        self.errors = Counter({item: error for item, error in errors.items() if item in keep})
+
+    def most_common(self, n):
+        return self.counts.most_common(n)
+
+    def error(self, item):
+        return self.errors.get(item, 0)
+
+    def to_dict(self):
+        return {'size': self.size, 'counts': dict(self.counts), 'errors': dict(self.errors)}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(size=data['size'])
+        sketch.counts = Counter(data['counts'])
+        sketch.errors = Counter(data.get('errors', {}))
+        return sketch
+
+class TopK:
+    """Behält die k größten (Wert, Schlüssel)-Paare"""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def add(self, value, key):
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (value, key))
+        elif value > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (value, key))
+
+    def merge(self, other):
+        for value, key in other.heap:
+            self.add(value, key)
+
+    def items(self):
+        return sorted(self.heap, reverse=True)
+
+# ============================================================
+# AGGREGATION PRO SITEMAP
+# ============================================================
+
+class SiteAggregator:
+    """Konstanter Speicher pro Sitemap, unabhängig von der Artikelanzahl"""
+
+    def __init__(self, sitemap_name, total_articles=0):
+        self.sitemap_name = sitemap_name
+        self.total_articles = total_articles
+        self.failed = 0
+        self.failure_reasons = Counter()
+        self.deferred = 0
+        self.word_count = RunningStats()
+        self.complexity = RunningStats()
+        self.hix = RunningStats()
+        self.links = RunningStats()
+        self.word_count_quantiles = QuantileSketch()
+        self.hix_quantiles = QuantileSketch()
+        self.complexity_distribution = Counter()
+        self.content_types = Counter()
+        self.themes = HeavyHitters()
+        self.top_linked = TopK(TOP_LINKED)
+
+    def add_article(self, url, word_count, complexity, hix, content_type, keywords, link_count):
+        self.word_count.add(word_count)
+        self.word_count_quantiles.add(word_count)
+        self.complexity.add(complexity)
+        self.complexity_distribution[complexity] += 1
+        self.hix.add(hix)
+        self.hix_quantiles.add(hix)
+        self.content_types[content_type] += 1
+        self.themes.update(keywords)
+        self.links.add(link_count)
+        self.top_linked.add(link_count, url)
+
+    def add_failure(self, reason='unbekannt'):
+        self.failed += 1
+        self.failure_reasons[reason] += 1
+
+    def add_deferred(self):
+        """Clientseitig gerenderte Seite, für späteres Rendering zurückgestellt (kein Fehler)"""
+        self.deferred += 1
+
+    def merge(self, other):
+        self.total_articles += other.total_articles
+        self.failed += other.failed
+        self.deferred += other.deferred
+        for name in ('word_count', 'complexity', 'hix', 'links', 'word_count_quantiles', 'hix_quantiles', 'themes', 'top_linked'):
+            getattr(self, name).merge(getattr(other, name))
+        self.complexity_distribution.update(other.complexity_distribution)
+        self.content_types.update(other.content_types)
+        self.failure_reasons.update(other.failure_reasons)
+
+    def to_dict(self):
+        return {
+            'sitemap_name': self.sitemap_name,
+            'total_articles': self.total_articles,
+            'failed': self.failed,
+            'failure_reasons': dict(self.failure_reasons),
+            'deferred': self.deferred,
+            'word_count': self.word_count.to_dict(),
+            'complexity': self.complexity.to_dict(),
+            'hix': self.hix.to_dict(),
+            'links': self.links.to_dict(),
+            'word_count_quantiles': self.word_count_quantiles.to_dict(),
+            'hix_quantiles': self.hix_quantiles.to_dict(),
+            'complexity_distribution': dict(self.complexity_distribution),
+            'content_types': dict(self.content_types),
+            'themes': self.themes.to_dict(),
+            'top_linked': self.top_linked.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls(data['sitemap_name'], data['total_articles'])
+        agg.failed = data['failed']
+        agg.failure_reasons = Counter(data.get('failure_reasons', {}))
+        agg.deferred = data.get('deferred', 0)
+        for name in ('word_count', 'complexity', 'hix', 'links'):
+            setattr(agg, name, RunningStats.from_dict(data[name]))
+        agg.word_count_quantiles = QuantileSketch.from_dict(data['word_count_quantiles'])
+        agg.hix_quantiles = QuantileSketch.from_dict(data['hix_quantiles'])
+        # JSON macht aus int-Schlüsseln Strings
+        agg.complexity_distribution = Counter({int(k): v for k, v in data['complexity_distribution'].items()})
+        agg.content_types = Counter(data['content_types'])
+        agg.themes = HeavyHitters.from_dict(data['themes'])
+        for value, key in data['top_linked']:
+            agg.top_linked.add(value, key)
+        return agg
+
+    def summary(self):
+        """Ergebnis-dict im Format der bisherigen analyze_sitemap-Rückgabe"""
+        return {
+            'sitemap_name': self.sitemap_name,
+            'total_articles': self.total_articles,
+            'successful_analyses': self.word_count.count,
+            'failed_urls': self.failed,
+            'failure_reasons': Counter(self.failure_reasons),
+            'deferred_urls': self.deferred,
+            'avg_word_count': self.word_count.mean,
+            'avg_complexity': self.complexity.mean,
+            'avg_hix': self.hix.mean,
+            'complexity_distribution': {c: self.complexity_distribution.get(c, 0) for c in (1, 2, 3)},
+            'hix_percentiles': {'p50': self.hix_quantiles.quantile(0.5), 'p90': self.hix_quantiles.quantile(0.9)},
+            'word_count_percentiles': {'p50': self.word_count_quantiles.quantile(0.5), 'p90': self.word_count_quantiles.quantile(0.9)},
+            'content_types': Counter(self.content_types),
+            'top_themes': self.themes.most_common(TOP_THEMES),
+            # Obergrenze der Überschätzung pro Thema (nur Themen, die nicht exakt gezählt sind)
+            'theme_errors': {theme: self.themes.error(theme) for theme, _ in self.themes.most_common(TOP_THEMES) if self.themes.error(theme)},
+            'internal_links': [{'url': url, 'link_count': count} for count, url in self.top_linked.items()],
+            'avg_internal_links': self.links.mean
+        }
@@ -0,0 +1,280 @@
+# SITEMAP WATCH - Änderungen an Sitemaps während des Migrations-Freeze beobachten
+# Fragt Sitemap-Dateien (mtime) und Sitemap-URLs (ETag/Last-Modified) zyklisch ab,
+# vergleicht loc/lastmod inkrementell und analysiert nur neue oder geänderte Seiten.
+# Ein lastmod gilt erst nach erfolgreicher Analyse als erledigt; fehlgeschlagene Seiten
+# bleiben offen und werden bei der nächsten Abfrage erneut versucht.
+# Ereignisse werden als JSONL geschrieben; zwischen zwei Abfragen schläft der Prozess.
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from fetch_policy import FetchPolicy
+from site_scheduler import CrawlScheduler
+
+DEFAULT_EVENTS_PATH = 'ergebnisse/aenderungen.jsonl'
+DEFAULT_STATE_PATH = 'ergebnisse/cache/watch_state.json'
+
+# Sekunden zwischen zwei Abfragen aller Sitemaps
+POLL_INTERVAL = 300
+
+# XML-Sitemap: <url><loc>…</loc><lastmod>…</lastmod></url>
+XML_ENTRY_RE = re.compile(r'<url>\s*(.*?)</url>', re.S | re.I)
+XML_LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>', re.I)
+XML_LASTMOD_RE = re.compile(r'<lastmod>\s*([^<]+?)\s*</lastmod>', re.I)
+
+# Gerenderte Sitemap (XSLT-Ansicht): <tr><td><a href="URL">…</a></td><td>LASTMOD</td>…
+HTML_ROW_RE = re.compile(r'<tr>\s*<td>\s*<a href="([^"]+)"[^>]*>.*?</a>\s*</td>\s*<td>([^<]*)</td>', re.S | re.I)
+
+URL_RE = re.compile(r'https?://[^\s<>"\'()]+')
+
+# ============================================================
+# SITEMAP LESEN
+# ============================================================
+
+def parse_sitemap_entries(content):
+    """{url: lastmod} aus XML-Sitemap, gerenderter HTML-Sitemap oder reiner URL-Liste"""
+    entries = {}
+    for block in XML_ENTRY_RE.findall(content):
+        loc = XML_LOC_RE.search(block)
+        if loc:
+            lastmod = XML_LASTMOD_RE.search(block)
+            entries[loc.group(1)] = lastmod.group(1) if lastmod else None
+    if entries:
+        return entries
+    for url, lastmod in HTML_ROW_RE.findall(content):
+        entries[url.replace('&amp;', '&')] = lastmod.strip() or None
+    if entries:
+        return entries
+    for url in URL_RE.findall(content):
+        if 'w3.org' not in url:
+            entries.setdefault(url, None)
+    return entries
+
+def diff_entries(old, new):
+    """(neu, geändert, entfernt) als sortierte URL-Listen"""
+    added = sorted(url for url in new if url not in old)
+    removed = sorted(url for url in old if url not in new)
+    changed = sorted(url for url in new if url in old and new[url] != old[url])
+    return added, changed, removed
+
+# ============================================================
+# BEDINGTE ABRUFE
+# ============================================================
+
+class ConditionalFetcher:
+    """GET mit If-None-Match/If-Modified-Since über eine FetchPolicy (Wiederholungen,
+    Backoff, Circuit Breaker); merkt sich die Validatoren pro URL"""
+
+    def __init__(self, policy=None, validators=None):
+        self.policy = policy or FetchPolicy()
+        self.validators = validators if validators is not None else {}
+        self.lock = threading.Lock()
+
+    def fetch(self, url):
+        """('ok', Text) | ('unveraendert', None) | ('fehler', Fehlerbeschreibung)"""
+        headers = {}
+        with self.lock:
+            etag, last_modified = self.validators.get(url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        # Pausierten Host abwarten: der Scheduler fragt jeden Host ohnehin nur einzeln ab
+        result = self.policy.fetch(url, wait=True, headers=headers)
+        if not result.ok:
+            return 'fehler', f"{result.error} (HTTP {result.status})" if result.status else result.error
+        response = result.response
+        if response.status_code == 304:
+            return 'unveraendert', None
+        with self.lock:
+            self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return 'ok', response.text
+
+class SitemapSource:
+    """Eine Sitemap als lokale Datei (mtime/Größe) oder URL (bedingter GET)"""
+
+    def __init__(self, name, location, fetcher):
+        self.name = name
+        self.location = location
+        self.fetcher = fetcher
+        self.is_remote = location.startswith(('http://', 'https://'))
+        self.file_signature = None
+        self.content_hash = None
+
+    def poll(self):
+        """Neuer Inhalt oder None, wenn sich nichts geändert hat"""
+        if self.is_remote:
+            status, content = self.fetcher.fetch(self.location)
+            if status == 'unveraendert':
+                return None
+            if status == 'fehler':
+                raise IOError(f"{self.location}: {content}")
+        else:
+            stat = os.stat(self.location)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self.file_signature:
+                return None
+            self.file_signature = signature
+            with open(self.location, 'r', encoding='utf-8') as f:
+                content = f.read()
+        # Gleicher Inhalt trotz neuem Zeitstempel (z. B. erneut exportiert)
+        content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        if content_hash == self.content_hash:
+            return None
+        self.content_hash = content_hash
+        return content
+
+# ============================================================
+# WATCHER
+# ============================================================
+
+class SitemapWatcher:
+    """Beobachtet Sitemaps und analysiert nur neue oder geänderte Seiten
+
+    analyze(sitemap_name, url, html) liefert ein dict mit Kennzahlen oder None.
+    """
+
+    def __init__(self, sitemaps, analyze, url_filter=None, interval=POLL_INTERVAL,
+                 events_path=DEFAULT_EVENTS_PATH, state_path=DEFAULT_STATE_PATH,
+                 host_delay=0.5, max_workers=8, fetch_policy=None):
+        self.analyze = analyze
+        self.url_filter = url_filter
+        self.interval = interval
+        self.events_path = events_path
+        self.state_path = state_path
+        self.host_delay = host_delay
+        self.max_workers = max_workers
+        self.entries = {}
+        self.metrics = {}
+        # Noch nicht erfolgreich analysierte Seiten: {url: [sitemap, ereignis, lastmod_alt, lastmod_neu]}
+        self.pending = {}
+        validators = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.entries = state.get('entries', {})
+            self.metrics = state.get('metrics', {})
+            self.pending = state.get('pending', {})
+            validators = {url: tuple(v) for url, v in state.get('validators', {}).items()}
+        self.fetcher = ConditionalFetcher(fetch_policy, validators=validators)
+        self.sources = [SitemapSource(name, location, self.fetcher) for name, location in sitemaps.items()]
+
+    # --- Persistenz & Ereignisse ---
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        state = {'entries': self.entries, 'metrics': self.metrics, 'pending': self.pending,
+                 'validators': self.fetcher.validators}
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def emit(self, event, **fields):
+        entry = {'zeit': datetime.now().isoformat(timespec='seconds'), 'ereignis': event}
+        entry.update(fields)
+        os.makedirs(os.path.dirname(self.events_path) or '.', exist_ok=True)
+        with open(self.events_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    # --- Abfrage ---
+
+    def poll_once(self):
+        """Eine Runde über alle Sitemaps; liefert die geschriebenen Ereignisse"""
+        events = []
+        for source in self.sources:
+            try:
+                content = source.poll()
+            except (IOError, OSError) as e:
+                events.append(self.emit('sitemap_fehler', sitemap=source.name, fehler=str(e)))
+                continue
+            if content is None:
+                continue
+            new = parse_sitemap_entries(content)
+            if self.url_filter:
+                new = {url: new[url] for url in self.url_filter(list(new))}
+            old = self.entries.get(source.name)
+            if old is None:
+                # Erster Lauf: nur Ausgangszustand merken, nichts neu analysieren
+                self.entries[source.name] = new
+                events.append(self.emit('ausgangszustand', sitemap=source.name, urls=len(new)))
+                continue
+            added, changed, removed = diff_entries(old, new)
+            # Neue/geänderte Einträge erst nach erfolgreicher Analyse übernehmen
+            committed = dict(new)
+            for url in added:
+                del committed[url]
+                self.pending[url] = [source.name, 'neu', None, new[url]]
+            for url in changed:
+                committed[url] = old[url]
+                self.pending[url] = [source.name, 'geaendert', old[url], new[url]]
+            self.entries[source.name] = committed
+            for url in removed:
+                self.pending.pop(url, None)
+                events.append(self.emit('entfernt', sitemap=source.name, url=url, lastmod_alt=old[url],
+                                        vorher=self.metrics.pop(url, None)))
+        # Offene Seiten, auch fehlgeschlagene aus früheren Abfragen
+        pages = [(sitemap, url, event, lastmod_old, lastmod_new)
+                 for url, (sitemap, event, lastmod_old, lastmod_new) in self.pending.items()]
+        events += self.analyze_pages(pages)
+        if events:
+            self.save_state()
+        return events
+
+    def analyze_pages(self, pages):
+        if not pages:
+            return []
+        details = {url: (event, lastmod_old, lastmod_new) for sitemap, url, event, lastmod_old, lastmod_new in pages}
+        scheduler = CrawlScheduler(self.fetcher.fetch, host_delay=self.host_delay, max_workers=self.max_workers)
+        for sitemap, url, *_ in pages:
+            scheduler.add(sitemap, url)
+        events = []
+        for sitemap, url, result in scheduler.run():
+            status, html = result or ('fehler', 'Abruf abgebrochen')
+            event, lastmod_old, lastmod_new = details[url]
+            fields = {'sitemap': sitemap, 'url': url, 'lastmod_alt': lastmod_old, 'lastmod_neu': lastmod_new}
+            if status == 'unveraendert':
+                events.append(self.emit(event, inhalt='unveraendert', **fields))
+                self._commit(sitemap, url, lastmod_new)
+                continue
+            if status == 'fehler':
+                events.append(self.emit(event, fehler=html, **fields))
+                continue
+            try:
+                metrics = self.analyze(sitemap, url, html)
+            except Exception as e:
+                events.append(self.emit(event, fehler=f"Analyse: {e}", **fields))
+                continue
+            if metrics is None:
+                # Analyse ohne Ergebnis: offen lassen und bei der nächsten Abfrage erneut versuchen
+                events.append(self.emit(event, fehler='Analyse ohne Ergebnis', **fields))
+                continue
+            events.append(self.emit(event, kennzahlen=metrics, vorher=self.metrics.get(url), **fields))
+            self.metrics[url] = metrics
+            self._commit(sitemap, url, lastmod_new)
+        return events
+
+    def _commit(self, sitemap, url, lastmod):
+        """Seite ist erledigt: lastmod übernehmen, nicht mehr offen"""
+        self.pending.pop(url, None)
+        self.entries.setdefault(sitemap, {})[url] = lastmod
+
+    def run(self, max_polls=None, on_events=None):
+        """Fragt alle interval Sekunden ab, bis max_polls erreicht ist (None = endlos)"""
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            started = time.monotonic()
+            events = self.poll_once()
+            polls += 1
+            if on_events and events:
+                on_events(events)
+            if max_polls is not None and polls >= max_polls:
+                break
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
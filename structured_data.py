@@ -0,0 +1,190 @@
+# STRUCTURED DATA - JSON-LD / Microdata / RDFa in einem Durchgang pro Seite
+# + siteweites Schema-Inventar (Typen, Properties, Verschachtelung)
+# für das Content-Model-Mapping der Migration
+
+import os
+import json
+from collections import Counter, defaultdict
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_ERRORS = (orjson.JSONDecodeError, ValueError, TypeError)
+except ImportError:
+    _loads = json.loads
+    JSON_ERRORS = (ValueError, TypeError)
+
+# ============================================================
+# EXTRAKTION
+# ============================================================
+
+def normalize_type(value):
+    """'https://schema.org/Article' / 'schema:Article' → 'Article'"""
+    value = str(value).strip()
+    for sep in ('/', '#', ':'):
+        if sep in value:
+            value = value.rsplit(sep, 1)[-1]
+    return value or 'Unknown'
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+def _walk_jsonld(node, parent, entities):
+    stack = [(node, parent)]
+    while stack:
+        node, parent = stack.pop()
+        if isinstance(node, list):
+            stack.extend((item, parent) for item in reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        current = parent
+        if '@type' in node:
+            types = [normalize_type(t) for t in _as_list(node['@type'])]
+            entities.append({
+                'format': 'json-ld',
+                'types': types,
+                'properties': [key for key in node if not key.startswith('@')],
+                'parent': parent
+            })
+            current = types[0]
+        if '@graph' in node:
+            stack.append((node['@graph'], parent))
+        for key, value in node.items():
+            if not key.startswith('@') and isinstance(value, (dict, list)):
+                stack.append((value, current))
+
+def extract_jsonld(soup, stats=None):
+    entities = []
+    for script in soup.find_all('script', type='application/ld+json'):
+        # orjson akzeptiert keine str-Unterklassen (bs4 NavigableString)
+        raw = str(script.string) if script.string is not None else script.get_text()
+        if not raw or not raw.strip():
+            continue
+        try:
+            data = _loads(raw)
+        except JSON_ERRORS:
+            if stats is not None:
+                stats['invalid_jsonld'] += 1
+            continue
+        _walk_jsonld(data, None, entities)
+    return entities
+
+def extract_microdata_rdfa(soup):
+    """Microdata (itemscope/itemprop) und RDFa (typeof/property) in einem DOM-Durchlauf"""
+    if soup.find(attrs={'itemscope': True}) is None and soup.find(attrs={'typeof': True}) is None:
+        return []
+    entities = []
+    stack = [(soup, None)]
+    while stack:
+        element, owner = stack.pop()
+        for child in element.find_all(True, recursive=False):
+            child_owner = owner
+            prop = child.get('itemprop') or child.get('property')
+            if prop and owner is not None:
+                owner['properties'].extend(normalize_type(p) for p in str(prop).split())
+            item_type = None
+            if child.has_attr('itemscope'):
+                item_type, fmt = child.get('itemtype') or 'Unknown', 'microdata'
+            elif child.has_attr('typeof'):
+                item_type, fmt = child.get('typeof') or 'Unknown', 'rdfa'
+            if item_type is not None:
+                child_owner = {
+                    'format': fmt,
+                    'types': [normalize_type(t) for t in str(item_type).split()],
+                    'properties': [],
+                    'parent': owner['types'][0] if owner else None
+                }
+                entities.append(child_owner)
+            stack.append((child, child_owner))
+    return entities
+
+def extract_structured_data(soup, stats=None):
+    """Alle Schema-Entitäten einer Seite (muss vor dem Entfernen der <script>-Tags laufen)"""
+    return extract_jsonld(soup, stats) + extract_microdata_rdfa(soup)
+
+def top_level_types(entities):
+    return [entity['types'][0] for entity in entities if entity['parent'] is None]
+
+def all_types(entities):
+    return {t for entity in entities for t in entity['types']}
+
+# ============================================================
+# SCHEMA-INVENTAR
+# ============================================================
+
+class SchemaInventory:
+    """Typen, Properties und Verschachtelung pro Site"""
+
+    def __init__(self):
+        self.pages = 0
+        self.pages_with_data = 0
+        self.type_counts = Counter()
+        self.type_pages = Counter()
+        self.properties = defaultdict(Counter)
+        self.parents = defaultdict(Counter)
+        self.formats = Counter()
+        self.stats = Counter()
+
+    def add_page(self, entities):
+        self.pages += 1
+        if entities:
+            self.pages_with_data += 1
+        for entity in entities:
+            self.formats[entity['format']] += 1
+            for schema_type in entity['types']:
+                self.type_counts[schema_type] += 1
+                self.properties[schema_type].update(entity['properties'])
+                if entity['parent']:
+                    self.parents[schema_type][entity['parent']] += 1
+        self.type_pages.update(all_types(entities))
+
+    def merge(self, other):
+        self.pages += other.pages
+        self.pages_with_data += other.pages_with_data
+        self.type_counts.update(other.type_counts)
+        self.type_pages.update(other.type_pages)
+        self.formats.update(other.formats)
+        self.stats.update(other.stats)
+        for schema_type, counter in other.properties.items():
+            self.properties[schema_type].update(counter)
+        for schema_type, counter in other.parents.items():
+            self.parents[schema_type].update(counter)
+
+    def to_dict(self):
+        return {
+            'pages': self.pages,
+            'pages_with_data': self.pages_with_data,
+            'formats': dict(self.formats),
+            'invalid_jsonld': self.stats['invalid_jsonld'],
+            'types': {
+                schema_type: {
+                    'count': count,
+                    'pages': self.type_pages[schema_type],
+                    'properties': dict(self.properties[schema_type].most_common()),
+                    'nested_in': dict(self.parents[schema_type])
+                }
+                for schema_type, count in self.type_counts.most_common()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        inventory = cls()
+        inventory.pages = data['pages']
+        inventory.pages_with_data = data['pages_with_data']
+        inventory.formats = Counter(data['formats'])
+        inventory.stats['invalid_jsonld'] = data['invalid_jsonld']
+        for schema_type, info in data['types'].items():
+            inventory.type_counts[schema_type] = info['count']
+            inventory.type_pages[schema_type] = info['pages']
+            inventory.properties[schema_type] = Counter(info['properties'])
+            inventory.parents[schema_type] = Counter(info['nested_in'])
+        return inventory
+
+def save_inventory(inventories, path='ergebnisse/schema_inventar.json'):
+    """Speichert {Sitemap-Name: SchemaInventory} als JSON"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({name: inv.to_dict() for name, inv in inventories.items()}, f, ensure_ascii=False, indent=2)
+    return path
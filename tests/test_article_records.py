@@ -0,0 +1,69 @@
+import os
+import sys
+import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from article_records import ArticleRecord, ArticleStore, Categories
+
+
+def sample_records():
+    return [
+        ArticleRecord('https://a.de/über-uns', sitemap='a', word_count=812, complexity=3, hix=12.5,
+                      flesch=55.0, content_type='ratgeber', intent='informational', link_count=14, score=71.0),
+        ArticleRecord('https://b.de/fehlt', sitemap='b', status='fehler'),
+        ArticleRecord('https://a.de/news', sitemap='a', word_count=300, complexity=1, hix=8.0,
+                      content_type='news', intent='informational', link_count=2, score=40.5),
+    ]
+
+
+def assert_same(a, b):
+    for name in ArticleRecord.__slots__:
+        x, y = getattr(a, name), getattr(b, name)
+        if isinstance(x, float) and math.isnan(x):
+            assert math.isnan(y), name
+        else:
+            assert x == y, name
+
+
+def test_categories_share_codes():
+    categories = Categories(['a', 'b'])
+    assert categories.code('a') == 0
+    assert categories.code('c') == 2
+    assert categories[1] == 'b'
+
+
+def test_store_roundtrip_in_memory():
+    store = ArticleStore()
+    records = sample_records()
+    for rec in records:
+        store.append(rec)
+    assert len(store) == 3
+    assert store.url(0) == 'https://a.de/über-uns'
+    assert store[-1].url == 'https://a.de/news'
+    for original, stored in zip(records, store):
+        assert_same(original, stored)
+    assert not store[1].ok
+    assert store.categories['sitemap'].values == ['a', 'b']
+    assert store.nbytes() < 400
+
+
+def test_store_npz_roundtrip(tmp_path):
+    store = ArticleStore()
+    for rec in sample_records():
+        store.append(rec)
+    path = store.save(str(tmp_path / 'artikel' / 'records.npz'))
+    loaded = ArticleStore.load(path)
+    assert len(loaded) == 3
+    for original, stored in zip(store, loaded):
+        assert_same(original, stored)
+    # Nach dem Laden weiter anhängbar, Kategorien behalten ihre Codes
+    loaded.append(ArticleRecord('https://c.de/', sitemap='c'))
+    assert loaded[3].sitemap == 'c'
+    assert loaded.categories['sitemap'].code('a') == 0
+
+
+def test_empty_store_npz_roundtrip(tmp_path):
+    loaded = ArticleStore.load(ArticleStore().save(str(tmp_path / 'leer.npz')))
+    assert len(loaded) == 0
+    assert list(loaded) == []
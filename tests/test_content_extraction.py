@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from content_extraction import ContentExtractor, FINGERPRINT_MAX_MISSES, SELECTOR_MAX_MISSES
+
+BODY = "Dies ist der eigentliche Artikeltext mit genug Inhalt, damit er als Hauptinhalt zählt. " * 4
+
+
+WORDS = ['Arbeit', 'Zukunft', 'Digitalisierung', 'Pflege', 'Rente', 'Bildung', 'Klima', 'Forschung']
+
+
+def page(i, template, wrapper='main'):
+    # Ziffern werden im Fingerprint normalisiert, daher unterscheiden sich Seiten über Wörter
+    topic = ' '.join(WORDS[(i + k) % len(WORDS)] + WORDS[(i * 3 + k) % len(WORDS)] for k in range(4))
+    blocks = ''.join(f"<p>{template} Hinweisblock {name} auf jeder Seite</p>" for name in ('eins', 'zwei', 'drei'))
+    return (f"<html><body><{wrapper}><h1>Artikel</h1><p>{BODY} {topic}.</p>{blocks}</{wrapper}>"
+            f"</body></html>")
+
+
+def extract_pages(extractor, template, pages, wrapper='main', host='https://a.de'):
+    return [extractor.extract(page(i, template, wrapper), f"{host}/{template}/{i}") for i in pages]
+
+
+def test_cache_roundtrip_and_corrupt_file(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    extractor = ContentExtractor(cache_path=path)
+    extract_pages(extractor, 'Alt', range(6))
+    extractor.save()
+    loaded = ContentExtractor(cache_path=path)
+    assert loaded.host_selectors == extractor.host_selectors
+    assert loaded.fingerprints.boilerplate['a.de'] == extractor.fingerprints.boilerplate['a.de']
+    with open(path, 'w') as f:
+        f.write('{"selectors": {"a.de": "ma')
+    assert ContentExtractor(cache_path=path).host_selectors == {}
+
+
+def test_expired_and_legacy_fingerprints_are_relearned(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    old = time.time() - 365 * 24 * 3600
+    with open(path, 'w') as f:
+        json.dump({'selectors': {}, 'fingerprints': {
+            'alt.de': {'fingerprints': ['x'], 'learned_at': old},
+            'liste.de': ['y'],
+            'neu.de': {'fingerprints': ['z'], 'learned_at': time.time()}
+        }}, f)
+    fingerprints = ContentExtractor(cache_path=path).fingerprints
+    assert set(fingerprints.boilerplate) == {'neu.de'}
+    assert fingerprints.warming_up('alt.de') and not fingerprints.warming_up('neu.de')
+
+
+def test_template_change_relearns_fingerprints(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    extractor = ContentExtractor(cache_path=path)
+    extract_pages(extractor, 'Alt', range(6))
+    extractor.save()
+    loaded = ContentExtractor(cache_path=path)
+    assert 'Alt Hinweisblock' not in extract_pages(loaded, 'Alt', [99])[0]
+    # Neues Template: alte Blöcke fehlen, nach FINGERPRINT_MAX_MISSES Seiten wird neu gelernt
+    texts = extract_pages(loaded, 'Neu', range(FINGERPRINT_MAX_MISSES + 6))
+    assert 'Neu Hinweisblock' in texts[0]
+    assert 'Neu Hinweisblock' not in texts[-1]
+
+
+def test_selector_relearned_after_misses():
+    extractor = ContentExtractor()
+    extract_pages(extractor, 'Alt', range(5))
+    assert extractor.host_selectors['a.de'] == 'main'
+    extract_pages(extractor, 'Neu', range(SELECTOR_MAX_MISSES + 5), wrapper='article')
+    assert extractor.stats['relearned'] == 1
+    assert extractor.host_selectors['a.de'] == 'article'
+
+
+def test_boilerplate_tags_removed_and_selector_learned_per_host():
+    extractor = ContentExtractor(learn_pages=3)
+    html = (f"<html><body><nav>Menü Startseite Kontakt</nav><article><p>{BODY}</p></article>"
+            f"<footer>Impressum Datenschutz</footer></body></html>")
+    for i in range(3):
+        text = extractor.extract(html, f"https://b.de/{i}")
+        assert 'Menü' not in text and 'Impressum' not in text
+        assert text.startswith('Dies ist der eigentliche Artikeltext')
+    assert extractor.host_selectors == {'b.de': 'article'}
+    # Gelernt: weitere Seiten gehen den direkten Pfad
+    extractor.extract(html, "https://b.de/3")
+    assert extractor.stats['cache_hit'] == 1
+    assert extractor.stats['evaluated'] == 3
+
+
+def test_density_fallback_without_semantic_container():
+    extractor = ContentExtractor()
+    html = (f"<html><body><div><a href='/'>Start</a> <a href='/x'>Links</a></div>"
+            f"<div><p>{BODY}</p><p>{BODY}</p></div></body></html>")
+    text = extractor.extract(html, "https://c.de/1")
+    assert 'eigentliche Artikeltext' in text
+    assert 'Start' not in text
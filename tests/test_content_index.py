@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from content_index import (ContentIndex, IndexBuilder, decode_postings, encode_varint,
+                           merge_indexes, ENTITY_PREFIX, KEYWORD_PREFIX)
+
+DOCS = [
+    ('https://a.de/ki', "Künstliche Intelligenz verändert die Zukunft der Arbeit. Die Zukunft der Arbeit ist digital.",
+     ['KI-Verordnung'], [('Bundesministerium für Arbeit und Soziales', 'ORG'), 'Hubertus Heil', 'Hubertus Heil']),
+    ('https://a.de/pflege', "Die Pflege braucht Fachkräfte. Arbeit in der Pflege ist anstrengend.",
+     ['Pflegereform'], ['Hubertus Heil']),
+    ('https://b.de/klima', "Klimaschutz und die Zukunft unserer Städte.", [], []),
+]
+
+
+def build(path, docs=DOCS):
+    builder = IndexBuilder()
+    for url, text, keywords, entities in docs:
+        builder.add_document(url, text, keywords, entities)
+    return builder.save(str(path))
+
+
+def test_varint_roundtrip():
+    out = bytearray()
+    values = [0, 1, 127, 128, 300, 2 ** 35]
+    for value in values:
+        encode_varint(value, out)
+    # Als (Dokument-Delta, Häufigkeit)-Paare ohne Positionen gelesen
+    decoded = list(decode_postings(out, has_positions=False))
+    assert [(doc, tf) for doc, tf, _ in decoded] == [(0, 1), (127, 128), (427, 2 ** 35)]
+
+
+def test_index_roundtrip_and_queries(tmp_path):
+    index = ContentIndex(build(tmp_path / 'index.bin'))
+    assert len(index) == 3
+    assert index.urls == [url for url, _, _, _ in DOCS]
+    assert [url for url, _ in index.search('Zukunft Arbeit')][0] == 'https://a.de/ki'
+    assert [url for url, _ in index.phrase('Zukunft der Arbeit')] == ['https://a.de/ki']
+    assert index.phrase('Arbeit der Zukunft') == []
+    assert [url for url, _ in index.entity('Hubertus Heil')] == ['https://a.de/ki', 'https://a.de/pflege']
+    assert [url for url, _ in index.keyword('ki verordnung')] == ['https://a.de/ki']
+    positions = {doc: pos for doc, tf, pos in index._postings('zukunft', with_positions=True)}
+    assert positions == {0: [4, 8], 2: [3]}
+    assert index.terms(ENTITY_PREFIX)[0] == (ENTITY_PREFIX + 'hubertus heil', 2)
+    index.close()
+
+
+def test_merge_indexes_renumbers_and_skips_duplicates(tmp_path):
+    first = build(tmp_path / 'w1.bin', DOCS[:2])
+    # Zweiter Worker hat eine URL ebenfalls bearbeitet
+    second = build(tmp_path / 'w2.bin', DOCS[1:])
+    path, count = merge_indexes([first, second], str(tmp_path / 'gesamt.bin'))
+    assert count == 3
+    merged = ContentIndex(path)
+    reference = ContentIndex(build(tmp_path / 'referenz.bin'))
+    assert merged.urls == reference.urls
+    assert merged.lengths == reference.lengths
+    for term in reference.lexicon:
+        with_positions = not term.startswith((KEYWORD_PREFIX, ENTITY_PREFIX))
+        assert list(merged._postings(term, with_positions)) == list(reference._postings(term, with_positions))
+        assert merged.lexicon[term][2] == reference.lexicon[term][2]
+    assert merged.search('Pflege') == reference.search('Pflege')
+    merged.close()
+    reference.close()
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'kein_index.bin'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        ContentIndex(str(path))
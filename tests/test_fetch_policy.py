@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import fetch_policy
+from fetch_policy import (FetchPolicy, HOST_GIVEN_UP, HOST_PAUSED, NOT_FOUND, SERVER_ERROR,
+                          classify_status)
+
+# Antwort des Servers pro Pfad: fester Status oder Liste (nacheinander, letzter bleibt)
+RESPONSES = {}
+HITS = Counter()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        HITS[self.path] += 1
+        status = RESPONSES.get(self.path, 200)
+        if isinstance(status, list):
+            status = status.pop(0) if len(status) > 1 else status[0]
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    RESPONSES.clear()
+    HITS.clear()
+    monkeypatch.setattr(FetchPolicy, 'backoff', lambda self, attempt: 0.0)
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def breaker_policy(**kwargs):
+    return FetchPolicy(max_retries=0, breaker_threshold=2, breaker_cooldown=0.2, max_probes=2, **kwargs)
+
+
+def open_breaker(policy, server):
+    RESPONSES['/kaputt'] = 500
+    for _ in range(2):
+        assert policy.fetch(f"{server}/kaputt").error == SERVER_ERROR
+    return policy.hosts[server.split('//')[1]]
+
+
+def test_classify_status():
+    assert classify_status(404) == NOT_FOUND
+    assert classify_status(503) == SERVER_ERROR
+    assert classify_status(429) == fetch_policy.RATE_LIMITED
+
+
+def test_transient_errors_are_retried(server):
+    RESPONSES['/wackelt'] = [503, 502, 200]
+    result = FetchPolicy(max_retries=2).fetch(f"{server}/wackelt")
+    assert result.ok and result.attempts == 3 and result.text == 'ok'
+    assert HITS['/wackelt'] == 3
+
+
+def test_url_errors_are_not_retried(server):
+    RESPONSES['/fehlt'] = 404
+    policy = FetchPolicy(max_retries=2)
+    result = policy.fetch(f"{server}/fehlt")
+    assert (result.error, result.status, result.attempts) == (NOT_FOUND, 404, 1)
+    assert policy.hosts[server.split('//')[1]].consecutive_failures == 0
+
+
+def test_open_breaker_pauses_host(server):
+    policy = breaker_policy()
+    open_breaker(policy, server)
+    result = policy.fetch(f"{server}/ok")
+    assert result.error == HOST_PAUSED and result.retry_at is not None
+    assert result.attempts == 0
+    assert policy.paused_hosts() == [server.split('//')[1]]
+    assert HITS['/ok'] == 0
+
+
+def test_half_open_probe_success_closes(server):
+    policy = breaker_policy()
+    state = open_breaker(policy, server)
+    time.sleep(0.25)
+    # Während der Probe-Request läuft, warten alle anderen
+    state.probing = True
+    assert policy.fetch(f"{server}/ok").error == HOST_PAUSED
+    state.probing = False
+    assert policy.fetch(f"{server}/ok").ok
+    assert (state.open_until, state.consecutive_failures, state.probing) == (0.0, 0, False)
+    assert policy.fetch(f"{server}/ok").ok
+
+
+def test_half_open_probe_url_error_closes(server):
+    policy = breaker_policy()
+    state = open_breaker(policy, server)
+    time.sleep(0.25)
+    RESPONSES['/fehlt'] = 404
+    assert policy.fetch(f"{server}/fehlt").error == NOT_FOUND
+    assert state.open_until == 0.0
+
+
+def test_failed_probes_reopen_then_give_up(server):
+    policy = breaker_policy()
+    state = open_breaker(policy, server)
+    time.sleep(0.25)
+    assert policy.fetch(f"{server}/kaputt").error == SERVER_ERROR
+    assert state.failed_probes == 1 and state.open_until > time.monotonic()
+    assert policy.fetch(f"{server}/ok").error == HOST_PAUSED
+    time.sleep(0.25)
+    assert policy.fetch(f"{server}/kaputt").error == SERVER_ERROR
+    assert state.given_up
+    result = policy.fetch(f"{server}/ok")
+    assert result.error == HOST_GIVEN_UP and result.retry_at is None
+    assert policy.report()['failures'][HOST_GIVEN_UP] == 1
+
+
+def test_wait_sleeps_through_pause(server):
+    policy = breaker_policy()
+    open_breaker(policy, server)
+    started = time.monotonic()
+    result = policy.fetch(f"{server}/ok", wait=True, headers={'If-None-Match': '"x"'})
+    assert result.ok
+    assert time.monotonic() - started >= 0.15
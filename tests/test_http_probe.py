@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from http_probe import HeadCache
+from resource_inventory import ResourceInventory, collect_resources
+
+HITS = Counter()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        HITS[('HEAD', self.path)] += 1
+        if self.path == '/kein-head.js':
+            self.send_response(405)
+            self.send_header('Content-Length', '0')
+        else:
+            self.send_response(200)
+            self.send_header('Content-Length', '500')
+        self.end_headers()
+
+    def do_GET(self):
+        HITS[('GET', self.path)] += 1
+        # Ohne Content-Length: Größe muss per GET mitgezählt werden
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'x' * 1000)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    HITS.clear()
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_head_size_and_get_fallback(server):
+    cache = HeadCache(need_size=True, timeout=5)
+    results = cache.probe_many([f"{server}/bild.png", f"{server}/kein-head.js"])
+    cache.close()
+    assert results[f"{server}/bild.png"]['bytes'] == 500
+    assert results[f"{server}/bild.png"]['method'] == 'HEAD'
+    fallback = results[f"{server}/kein-head.js"]
+    assert (fallback['method'], fallback['status'], fallback['bytes']) == ('GET', 200, 1000)
+
+
+def test_each_url_probed_once(server):
+    cache = HeadCache(timeout=5)
+    url = f"{server}/bild.png"
+    cache.probe_many([url, url, url])
+    cache.probe_many([url])
+    cache.close()
+    assert HITS[('HEAD', '/bild.png')] == 1
+    assert not cache.pending
+
+
+def test_invalid_url_is_error_result():
+    cache = HeadCache(timeout=1)
+    results = cache.probe_many(["http://[::1", "http://"])
+    cache.close()
+    assert all(result['error'] and result['status'] is None for result in results.values())
+    assert not cache.pending
+
+
+def test_page_weight_counts_shared_assets_once(server):
+    html = f"""<html><head><script src="/kein-head.js"></script>
+    <link rel="stylesheet" href="/style.css" media="print"></head>
+    <body><img src="/bild.png"><picture><source src="/alt.png"><img src="/bild.png"></picture>
+    <script src="/spaet.js" defer></script></body></html>"""
+    resources = collect_resources(BeautifulSoup(html, 'html.parser'), f"{server}/seite")
+    assert sorted(r['url'].rsplit('/', 1)[1] for r in resources) == ['bild.png', 'kein-head.js', 'spaet.js', 'style.css']
+    inventory = ResourceInventory(timeout=5)
+    weight = inventory.analyze(BeautifulSoup(html, 'html.parser'), f"{server}/seite", html_bytes=100)
+    inventory.close()
+    assert weight['total_bytes'] == 100 + 1000 + 500 + 500 + 500
+    assert weight['requests'] == 5
+    assert [r['kind'] for r in weight['render_blocking']] == ['script']
+    assert weight['largest_image']['bytes'] == 500
@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from link_checker import LinkRegistry, LinkChecker, normalize_link
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _respond(self):
+        if self.path == '/alt':
+            self.send_response(301)
+            self.send_header('Location', '/ok')
+        else:
+            self.send_response(200 if self.path == '/ok' else 404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_HEAD = _respond
+    do_GET = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_normalize_link_keeps_invalid_url():
+    assert normalize_link('https://a.de/seite', 'http://[kaputt/') == 'http://[kaputt/'
+    assert normalize_link('https://a.de/seite', 'mailto:x@a.de') is None
+    assert normalize_link('https://a.de/seite', '/b#abschnitt') == 'https://a.de/b'
+
+
+def test_registry_deduplicates_targets():
+    registry = LinkRegistry()
+    registry.add_page('https://a.de/1', ['/x', '/x#oben', 'https://b.de/', 'javascript:void(0)'])
+    registry.add_page('https://a.de/2', ['/x'])
+    assert len(registry) == 2
+    assert registry.occurrences == 4
+    assert registry.source_pages('https://a.de/x') == ['https://a.de/1', 'https://a.de/2']
+    assert registry.source_pages('https://c.de/') == []
+    assert dict(registry.page_links()) == {'https://a.de/1': ['https://a.de/x', 'https://b.de/'],
+                                           'https://a.de/2': ['https://a.de/x']}
+
+
+def test_invalid_urls_do_not_abort_batch(server):
+    registry = LinkRegistry()
+    registry.add_page(f"{server}/seite1", ['/ok', '/fehlt', '/alt', 'http://[kaputt/', 'http://a..b/'])
+    registry.add_page(f"{server}/seite2", ['/fehlt', '/alt'])
+    checker = LinkChecker(timeout=2)
+    report = checker.check(registry, internal_hosts=[server.split('//')[1]], progress=False)
+    checker.close()
+    assert report['unique_targets'] == 5
+    assert report['status']['intern_ok'] == 1
+    broken = {item['url']: item for item in report['broken']}
+    assert broken[f"{server}/fehlt"]['status'] == 404
+    assert broken['http://[kaputt/']['error'] == 'ValueError'
+    assert broken['http://a..b/']['error']
+    # Weiterleitungen und defekte Ziele: verlinkende Seiten jeweils als Liste
+    assert broken[f"{server}/fehlt"]['sources'] == [f"{server}/seite1", f"{server}/seite2"]
+    assert report['redirects'][0]['sources'] == [f"{server}/seite1", f"{server}/seite2"]
+    assert report['redirects'][0]['final_url'] == f"{server}/ok"
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from overlap_engine import OverlapCorpus, article_pairs, block_rows, compute_overlap, tfidf
+
+
+THEMEN = [
+    "garten pflanzen rosen tulpen erde giessen",
+    "auto motor reifen bremse getriebe werkstatt",
+    "kochen rezept pfanne nudeln sosse gewuerze",
+]
+
+
+def build_corpus():
+    corpus = OverlapCorpus()
+    for site in ('a.de', 'b.de', 'c.de'):
+        for k, thema in enumerate(THEMEN):
+            corpus.add_document(site, f"https://{site}/{k}", f"{thema} {site.split('.')[0]}seite")
+    return corpus
+
+
+def test_block_rows_bounded_by_cells():
+    assert block_rows(1000, max_cells=10_000) == 10
+    assert block_rows(10**9, max_cells=10_000) == 1
+    assert block_rows(0) >= 1
+
+
+def test_article_pairs_independent_of_block_size():
+    corpus = build_corpus()
+    articles, _ = tfidf(corpus.count_matrix(), max_df_share=1.0)
+    doc_sites = np.frombuffer(corpus.doc_sites, dtype=np.uint16)
+    reference = article_pairs(articles, doc_sites, 3, min_similarity=0.3, block_size=len(corpus))
+    for block_size in (None, 1, 2, 4):
+        best, counts = article_pairs(articles, doc_sites, 3, min_similarity=0.3, block_size=block_size)
+        assert [(i, j) for _, i, j in best] == [(i, j) for _, i, j in reference[0]]
+        assert (counts == reference[1]).all()
+
+
+def test_compute_overlap_pairs_same_topic_across_sites():
+    corpus = build_corpus()
+    report = compute_overlap(corpus, min_similarity=0.3, block_size=2, max_df_share=1.0)
+    assert report['articles'] == 9
+    # Nur gleiche Themen auf verschiedenen Sites: 3 Themen × 3 Site-Paare
+    assert len(report['article_pairs']) == 9
+    for pair in report['article_pairs']:
+        assert pair['a'].rsplit('/', 1)[1] == pair['b'].rsplit('/', 1)[1]
+        assert pair['a'].split('/')[2] != pair['b'].split('/')[2]
+    assert all(pair['similar_articles'] == 3 for pair in report['pairs'])
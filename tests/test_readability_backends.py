@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from readability_backends import split_sentences, count_sentences
+
+
+def test_ordinal_before_abbreviation():
+    text = "Im 20. Jh. war das anders. Heute nicht."
+    assert split_sentences(text) == ["Im 20. Jh. war das anders.", "Heute nicht."]
+
+
+def test_ordinal_before_month():
+    assert count_sentences("Am 3. Oktober ist Feiertag. Dann ruhen die Geschäfte.") == 2
+
+
+def test_single_letter_ends_sentence_before_uppercase():
+    text = "Der Mangel betrifft Vitamin A. Danach folgt die Behandlung."
+    assert split_sentences(text) == ["Der Mangel betrifft Vitamin A.", "Danach folgt die Behandlung."]
+
+
+def test_initial_before_name_keeps_sentence():
+    text = "A. Merkel sagte das. Dann ging sie."
+    assert split_sentences(text) == ["A. Merkel sagte das.", "Dann ging sie."]
+    assert count_sentences("Gestern sprach Kanzlerin A. Merkel im Bundestag.") == 1
+
+
+def test_single_letter_before_lowercase():
+    assert count_sentences("Es gibt Typ A. und Typ B. als Varianten.") == 1
+
+
+def test_multi_part_abbreviation():
+    assert count_sentences("Große Städte, z. B. Berlin, wachsen. Das ist bekannt.") == 2
+    assert count_sentences("Das gilt u. a. für Pflegekräfte.") == 1
+
+
+def test_abbreviation_before_name():
+    assert count_sentences("Laut Prof. Müller stimmt das. Andere widersprechen.") == 2
+
+
+def test_count_matches_split():
+    text = "Im 20. Jh. gab es z. B. Vitamin A. Danach kam mehr. Ende"
+    assert count_sentences(text) == len(split_sentences(text))
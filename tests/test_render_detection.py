@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from render_detection import DeferredQueue, RenderDetector, parse_state
+
+ARTICLE = "Die Pflegereform bringt ab dem kommenden Jahr höhere Leistungen für Angehörige mit sich."
+
+NEXT_PAGE = f"""<html><body><div id="__next"></div>
+<script id="__NEXT_DATA__" type="application/json">{json.dumps({
+    "props": {"pageProps": {"slug": "/pflege/reform-und-leistungen-fuer-angehoerige-im-ueberblick",
+                            "title": "Kurz", "body": f"<p>{ARTICLE}</p>", "teaser": ARTICLE + " Mehr dazu im Text."}},
+    "buildId": "abcdefghijklmnopqrstuvwxyz0123456789abcdefghijklmnop"})}</script>
+</body></html>"""
+
+EMPTY_MOUNT = '<html><body><div id="root"></div><script src="/bundle.js"></script></body></html>'
+
+SERVER_RENDERED = f"""<html><body><main><p>Kurz.</p></main>
+<script>window.appConfig = {{}}; window.__CONFIG__ = {json.dumps({"x": "y" * 3000})};</script>
+<noscript>Bitte JavaScript aktivieren</noscript></body></html>"""
+
+
+def test_parse_state_ignores_trailing_code():
+    assert parse_state('{"a": [1, 2]}; init();') == {"a": [1, 2]}
+    assert parse_state('function() {}') is None
+    assert parse_state('{kaputt') is None
+
+
+def test_text_recovered_from_next_data():
+    detector = RenderDetector(min_text=50)
+    result = detector.check(NEXT_PAGE, '')
+    assert result['client_rendered'] and result['recovered']
+    assert result['markers'] == ['next.js']
+    assert result['empty_mounts'] == ['__next']
+    # HTML entfernt, Dubletten und Slugs/IDs übersprungen
+    assert result['text'].count('Pflegereform') == 2
+    assert '<p>' not in result['text'] and 'abcdefghij' not in result['text']
+    assert detector.stats['aus_json_state'] == 1
+
+
+def test_empty_mount_is_deferred():
+    detector = RenderDetector()
+    result = detector.check(EMPTY_MOUNT, '')
+    assert result['client_rendered'] and not result['recovered']
+    assert detector.stats['zurueckgestellt'] == 1
+
+
+def test_weak_signals_alone_do_not_defer():
+    detector = RenderDetector()
+    result = detector.check(SERVER_RENDERED, 'Kurz.')
+    assert not result['client_rendered']
+    assert result['weak_only'] and result['noscript_hint']
+    assert result['state_bytes'] > 2048
+    assert detector.stats['nur_schwache_signale'] == 1
+
+
+def test_enough_text_skips_detection():
+    assert RenderDetector(min_text=10).check(EMPTY_MOUNT, ARTICLE) is None
+
+
+def test_deferred_queue_writes_jsonl(tmp_path):
+    path = str(tmp_path / 'queue' / 'js.jsonl')
+    queue = DeferredQueue(path)
+    check = RenderDetector().check(EMPTY_MOUNT, '')
+    queue.add('https://a.de/1', 'a', check)
+    queue.add('https://a.de/2', 'a', check)
+    queue.close()
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry['url'] for entry in entries] == ['https://a.de/1', 'https://a.de/2']
+    assert entries[0]['empty_mounts'] == ['root']
+    assert len(queue) == 2 and queue.by_site['a'] == 2
@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from article_records import ArticleRecord
+from run_store import RunStore, print_run_diff
+
+
+def record(url, status='ok', words=100, hix=10.0, content_type='ratgeber'):
+    return ArticleRecord(url, sitemap='site', status=status, word_count=words, complexity=2,
+                         hix=hix, content_type=content_type, link_count=3)
+
+
+def fill_runs(store):
+    run_a = store.start_run('vorher')
+    for rec in (record('https://a.de/bleibt'), record('https://a.de/weg'),
+                record('https://a.de/text', words=100), record('https://a.de/kaputt')):
+        store.add_record(run_a, rec)
+    store.add_site(run_a, {'sitemap_name': 'site', 'total_articles': 4, 'avg_hix': 10.0,
+                           'content_types': {'ratgeber': 4}})
+    run_b = store.start_run('nachher')
+    for rec in (record('https://a.de/bleibt'), record('https://a.de/neu'),
+                record('https://a.de/text', words=400, content_type='news'),
+                record('https://a.de/kaputt', status='fehler')):
+        store.add_record(run_b, rec)
+    store.add_site(run_b, {'sitemap_name': 'site', 'total_articles': 4, 'avg_hix': 12.5,
+                           'content_types': {'ratgeber': 2, 'news': 1}})
+    return run_a, run_b
+
+
+def test_diff_between_runs(tmp_path, capsys):
+    store = RunStore(str(tmp_path / 'runs.sqlite'), batch_size=2)
+    run_a, run_b = fill_runs(store)
+    assert store.latest_runs(2) == [run_a, run_b]
+    diff = store.diff(run_a, run_b)
+    assert diff['added'] == [('https://a.de/neu', 'site')]
+    assert diff['removed'] == [('https://a.de/weg', 'site')]
+    assert diff['status_changes'] == [('https://a.de/kaputt', 'ok', 'fehler')]
+    assert diff['type_changes'] == [('https://a.de/text', 'ratgeber', 'news')]
+    assert diff['changed'] == 1
+    assert diff['movers']['word_count'] == [('https://a.de/text', 100, 400, 300)]
+    assert diff['movers']['hix'] == []
+    site = diff['sites']['site']
+    assert site['metrics']['avg_hix'] == (10.0, 12.5)
+    assert site['content_types'] == {'news': (0, 1), 'ratgeber': (4, 2)}
+    print_run_diff(diff)
+    assert 'Lauf 1 → Lauf 2' in capsys.readouterr().out
+    store.close()
+
+
+def test_runs_persist_and_failed_urls_have_no_metrics(tmp_path):
+    path = str(tmp_path / 'runs.sqlite')
+    store = RunStore(path)
+    run_a, run_b = fill_runs(store)
+    store.close()
+    reopened = RunStore(path)
+    assert [(run_id, label, urls) for run_id, _, label, urls in reopened.runs()] == [
+        (run_a, 'vorher', 4), (run_b, 'nachher', 4)]
+    row = reopened.conn.execute('SELECT word_count, hix FROM url_metrics WHERE run_id = ? AND url = ?',
+                                (run_b, 'https://a.de/kaputt')).fetchone()
+    assert row == (None, None)
+    assert reopened.site_metrics(run_b)['site']['avg_hix'] == 12.5
+    reopened.close()
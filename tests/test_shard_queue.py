@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shard_queue import ShardQueue, run_worker
+from site_stats import SiteAggregator
+from structured_data import SchemaInventory
+
+URLS_A = [f"https://a.de/{i}" for i in range(5)]
+URLS_B = [f"https://b.de/{i}" for i in range(3)]
+
+
+def make_queue(tmp_path, **kwargs):
+    queue = ShardQueue(str(tmp_path / 'queue.sqlite'), num_shards=4, **kwargs)
+    queue.enqueue('a', 'a.de', URLS_A)
+    queue.enqueue('b', 'b.de', URLS_B)
+    return queue
+
+
+def process_batch(items):
+    """Analyse-Stub: jede URL gelingt mit 100 Wörtern"""
+    deltas = {}
+    for url, name, base_domain in items:
+        if name not in deltas:
+            deltas[name] = (SiteAggregator(name), SchemaInventory())
+        deltas[name][0].add_article(url, 100, 2, 10.0, 'ratgeber', ['pflege'], 1)
+        deltas[name][1].add_page([])
+    outcomes = [(url, 'ok') for url, _, _ in items]
+    pages = [(url, name, [f"https://{base}/"], {'pflege': 1}) for url, name, base in items]
+    records = [{'url': url, 'sitemap': name, 'status': 'ok'} for url, name, _ in items]
+    return (outcomes, {name: {'stats': agg.to_dict(), 'schema': inv.to_dict()} for name, (agg, inv) in deltas.items()},
+            pages, records)
+
+
+def test_enqueue_is_idempotent_and_shards_by_host(tmp_path):
+    queue = make_queue(tmp_path)
+    assert queue.enqueue('a', 'a.de', URLS_A[:2]) == 5
+    assert queue.progress() == {'offen': 8}
+    assert len({queue.shard_for(url) for url in URLS_A}) == 1
+    assert sum(queue.shard_sizes().values()) == 8
+    queue.close()
+
+
+def test_shard_lease_is_exclusive(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.lease_shard('w1')
+    second = queue.lease_shard('w2')
+    assert first != second
+    assert queue.lease_items('w2', first) == []
+    # Eigener Lease wird bevorzugt wieder übernommen
+    assert queue.lease_shard('w1') == first
+    queue.close()
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0.2)
+    shard = queue.lease_shard('w1')
+    items = queue.lease_items('w1', shard, limit=2)
+    assert len(items) == 2
+    time.sleep(0.3)
+    # Lease abgelaufen: w2 übernimmt, begonnene URLs werden wieder offen
+    other = ShardQueue(queue.path)
+    other.lease_seconds = 60
+    assert other.lease_shard('w2') == shard
+    assert other.progress().get('in_arbeit', 0) == 0
+    outcomes, deltas, pages, records = process_batch(items)
+    assert not queue.complete_batch('w1', shard, outcomes, deltas, pages, records)
+    assert queue.progress().get('ok', 0) == 0
+    queue.close()
+    other.close()
+
+
+def test_run_worker_and_reduce(tmp_path):
+    queue = make_queue(tmp_path)
+    assert run_worker(queue, process_batch, worker='w1', batch_size=2) == 8
+    assert queue.progress() == {'ok': 8}
+    assert queue.lease_shard('w2') is None
+    merged = queue.reduce()
+    assert list(merged) == ['a', 'b']
+    aggregator, inventory = merged['a']
+    assert aggregator.total_articles == 5
+    assert aggregator.word_count.count == 5
+    assert inventory.pages == 5
+    assert [url for url, _, _, _ in queue.pages()] == sorted(URLS_A) + sorted(URLS_B)
+    assert [record['url'] for record in queue.records()] == sorted(URLS_A) + sorted(URLS_B)
+    assert queue.base_domains() == {'a.de', 'b.de'}
+    queue.close()
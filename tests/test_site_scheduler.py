@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from site_scheduler import CrawlScheduler, ProgressTracker
+
+
+class Recorder:
+    """Zählt Abrufe und prüft, dass pro Host nie zwei gleichzeitig laufen"""
+
+    def __init__(self, pause=0.0):
+        self.pause = pause
+        self.lock = threading.Lock()
+        self.active = {}
+        self.calls = []
+        self.overlap = False
+
+    def __call__(self, url):
+        host = url.split('/')[2]
+        with self.lock:
+            if self.active.get(host):
+                self.overlap = True
+            self.active[host] = True
+            self.calls.append((url, time.monotonic()))
+        time.sleep(self.pause)
+        with self.lock:
+            self.active[host] = False
+        return f"<html>{url}</html>"
+
+
+def fill(scheduler, hosts=3, per_host=4):
+    for h in range(hosts):
+        for k in range(per_host):
+            scheduler.add(f"site{h}", f"https://host{h}.de/{k}")
+
+
+def test_run_yields_every_url_once_host_serialized():
+    fetch = Recorder(pause=0.01)
+    scheduler = CrawlScheduler(fetch, host_delay=0.0, max_workers=4)
+    fill(scheduler)
+    assert scheduler.total() == 12
+    results = list(scheduler.run())
+    assert sorted(url for _, url, _ in results) == sorted(url for url, _ in fetch.calls)
+    assert len(results) == 12
+    assert all(html == f"<html>{url}</html>" for _, url, html in results)
+    assert not fetch.overlap
+
+
+def test_host_delay_between_requests():
+    fetch = Recorder()
+    scheduler = CrawlScheduler(fetch, host_delay=0.05)
+    fill(scheduler, hosts=1, per_host=3)
+    list(scheduler.run())
+    times = [t for _, t in fetch.calls]
+    assert all(b - a >= 0.045 for a, b in zip(times, times[1:]))
+
+
+def test_early_break_stops_fetching():
+    fetch = Recorder(pause=0.01)
+    scheduler = CrawlScheduler(fetch, host_delay=0.0, max_workers=2, buffer_size=1)
+    fill(scheduler, hosts=2, per_host=50)
+    for count, _ in enumerate(scheduler.run(), 1):
+        if count == 3:
+            break
+    assert scheduler.stopped.is_set()
+    time.sleep(0.3)
+    fetched = len(fetch.calls)
+    time.sleep(0.3)
+    # Nach dem Abbruch startet kein neuer Abruf mehr
+    assert len(fetch.calls) == fetched
+    assert fetched < 100
+
+
+def test_retry_at_requeues_url():
+    class Paused:
+        def __init__(self, retry_at):
+            self.retry_at = retry_at
+
+    attempts = []
+
+    def fetch(url):
+        attempts.append(url)
+        if len(attempts) == 1:
+            return Paused(time.monotonic() + 0.05)
+        return "ok"
+
+    scheduler = CrawlScheduler(fetch, host_delay=0.0)
+    scheduler.add("site", "https://host.de/a")
+    results = list(scheduler.run())
+    assert results == [("site", "https://host.de/a", "ok")]
+    assert attempts == ["https://host.de/a", "https://host.de/a"]
+
+
+def test_fetch_exception_yields_none():
+    def fetch(url):
+        raise RuntimeError("kaputt")
+
+    scheduler = CrawlScheduler(fetch, host_delay=0.0)
+    scheduler.add("site", "https://host.de/a")
+    assert list(scheduler.run()) == [("site", "https://host.de/a", None)]
+
+
+def test_progress_tracker_eta():
+    tracker = ProgressTracker(total=10)
+    assert tracker.format().startswith("0/10 Artikel")
+    for _ in range(5):
+        tracker.tick()
+        time.sleep(0.01)
+    assert tracker.throughput() > 0
+    assert tracker.eta_seconds() > 0
+    assert "Restzeit" in tracker.format()
@@ -0,0 +1,125 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sitemap_watch import ConditionalFetcher, SitemapWatcher, parse_sitemap_entries, diff_entries
+
+
+def sitemap(entries):
+    return '<urlset>' + ''.join(f"<url><loc>{url}</loc><lastmod>{lastmod}</lastmod></url>" for url, lastmod in entries.items()) + '</urlset>'
+
+
+class StubFetcher:
+    """Liefert HTML pro URL; URLs in fail scheitern"""
+
+    def __init__(self):
+        self.fail = set()
+        self.validators = {}
+
+    def fetch(self, url):
+        if url in self.fail:
+            return 'fehler', 'timeout'
+        return 'ok', f"<html>{url}</html>"
+
+
+def make_watcher(tmp_path, entries):
+    path = tmp_path / 'sitemap.xml'
+    path.write_text(sitemap(entries), encoding='utf-8')
+    analyzed = []
+
+    def analyze(name, url, html):
+        analyzed.append(url)
+        return {'word_count': len(html)}
+
+    watcher = SitemapWatcher({'A': str(path)}, analyze, events_path=str(tmp_path / 'events.jsonl'),
+                             state_path=str(tmp_path / 'state.json'), host_delay=0)
+    watcher.fetcher = StubFetcher()
+    return watcher, path, analyzed
+
+
+def rewrite(path, entries):
+    path.write_text(sitemap(entries), encoding='utf-8')
+    # mtime-Auflösung des Dateisystems umgehen
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_parse_and_diff():
+    entries = parse_sitemap_entries(sitemap({'https://a.de/1': '2026-01-01', 'https://a.de/2': '2026-01-02'}))
+    assert entries == {'https://a.de/1': '2026-01-01', 'https://a.de/2': '2026-01-02'}
+    assert diff_entries(entries, {'https://a.de/2': '2026-02-01', 'https://a.de/3': None}) == (
+        ['https://a.de/3'], ['https://a.de/2'], ['https://a.de/1'])
+
+
+def test_failed_page_stays_pending_until_analyzed(tmp_path):
+    watcher, path, analyzed = make_watcher(tmp_path, {'https://a.de/1': '2026-01-01'})
+    events = watcher.poll_once()
+    assert [e['ereignis'] for e in events] == ['ausgangszustand']
+
+    rewrite(path, {'https://a.de/1': '2026-02-01', 'https://a.de/2': '2026-02-01'})
+    watcher.fetcher.fail = {'https://a.de/2'}
+    events = watcher.poll_once()
+    assert {e['url']: ('fehler' in e) for e in events} == {'https://a.de/1': False, 'https://a.de/2': True}
+    assert watcher.entries['A'] == {'https://a.de/1': '2026-02-01'}
+    assert list(watcher.pending) == ['https://a.de/2']
+
+    # Sitemap unverändert: die offene Seite wird trotzdem erneut versucht
+    watcher.fetcher.fail = set()
+    events = watcher.poll_once()
+    assert [(e['ereignis'], e['url']) for e in events] == [('neu', 'https://a.de/2')]
+    assert watcher.entries['A'] == {'https://a.de/1': '2026-02-01', 'https://a.de/2': '2026-02-01'}
+    assert watcher.pending == {}
+    assert watcher.poll_once() == []
+
+
+def test_pending_survives_restart(tmp_path):
+    watcher, path, analyzed = make_watcher(tmp_path, {'https://a.de/1': '2026-01-01'})
+    watcher.poll_once()
+    rewrite(path, {'https://a.de/1': '2026-03-01'})
+    watcher.fetcher.fail = {'https://a.de/1'}
+    watcher.poll_once()
+    restarted, _, analyzed = make_watcher(tmp_path, {'https://a.de/1': '2026-03-01'})
+    assert restarted.entries['A'] == {'https://a.de/1': '2026-01-01'}
+    assert restarted.pending == {'https://a.de/1': ['A', 'geaendert', '2026-01-01', '2026-03-01']}
+    events = restarted.poll_once()
+    assert [(e['ereignis'], e['url']) for e in events] == [('geaendert', 'https://a.de/1')]
+    assert restarted.entries['A'] == {'https://a.de/1': '2026-03-01'}
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/fehlt':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', '5')
+        self.end_headers()
+        self.wfile.write(b'hallo')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_conditional_fetcher_uses_validators():
+    httpd = HTTPServer(('127.0.0.1', 0), ETagHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    try:
+        fetcher = ConditionalFetcher()
+        assert fetcher.fetch(f"{base}/seite") == ('ok', 'hallo')
+        assert fetcher.validators[f"{base}/seite"] == ('"v1"', None)
+        assert fetcher.fetch(f"{base}/seite") == ('unveraendert', None)
+        assert fetcher.fetch(f"{base}/fehlt") == ('fehler', 'nicht_gefunden (HTTP 404)')
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+from collections import Counter
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from structured_data import (SchemaInventory, extract_structured_data, normalize_type,
+                             save_inventory, top_level_types)
+
+JSONLD = {
+    "@context": "https://schema.org",
+    "@graph": [
+        {"@type": "https://schema.org/NewsArticle", "headline": "Titel",
+         "author": {"@type": "Person", "name": "A. Merkel"}},
+        {"@type": ["BreadcrumbList"], "itemListElement": []}
+    ]
+}
+
+HTML = f"""<html><head>
+<script type="application/ld+json">{json.dumps(JSONLD)}</script>
+<script type="application/ld+json">{{ kaputt </script>
+</head><body>
+<div itemscope itemtype="https://schema.org/Product"><span itemprop="name">Rad</span>
+  <div itemprop="offers" itemscope itemtype="https://schema.org/Offer"><span itemprop="price">9</span></div>
+</div>
+<div vocab="https://schema.org/" typeof="Event"><span property="name">Fest</span></div>
+</body></html>"""
+
+
+def entities_and_stats():
+    stats = Counter()
+    return extract_structured_data(BeautifulSoup(HTML, 'html.parser'), stats), stats
+
+
+def test_normalize_type():
+    assert normalize_type('https://schema.org/Article') == 'Article'
+    assert normalize_type('schema:Article') == 'Article'
+    assert normalize_type('') == 'Unknown'
+
+
+def test_all_formats_and_nesting():
+    entities, stats = entities_and_stats()
+    assert stats['invalid_jsonld'] == 1
+    by_type = {entity['types'][0]: entity for entity in entities}
+    assert by_type['NewsArticle']['format'] == 'json-ld'
+    assert by_type['Person']['parent'] == 'NewsArticle'
+    assert by_type['Offer']['parent'] == 'Product'
+    assert set(by_type['Product']['properties']) == {'name', 'offers'}
+    assert by_type['Event']['format'] == 'rdfa'
+    assert by_type['Event']['properties'] == ['name']
+    assert sorted(top_level_types(entities)) == ['BreadcrumbList', 'Event', 'NewsArticle', 'Product']
+
+
+def test_inventory_merge_and_roundtrip(tmp_path):
+    entities, stats = entities_and_stats()
+    first, second = SchemaInventory(), SchemaInventory()
+    first.add_page(entities)
+    first.stats.update(stats)
+    second.add_page([])
+    first.merge(second)
+    assert (first.pages, first.pages_with_data) == (2, 1)
+    assert first.parents['Person'] == {'NewsArticle': 1}
+    data = first.to_dict()
+    assert SchemaInventory.from_dict(data).to_dict() == data
+    path = save_inventory({'site': first}, str(tmp_path / 'inventar.json'))
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['site']['invalid_jsonld'] == 1